@@ -5,9 +5,11 @@ from fastapi.responses import JSONResponse
 
 
 class InvalidInputException(Exception):
-    def __init__(self, name: str, value: str):
+    def __init__(self, name: str, value: str, cacheable: bool = True):
         self.name = name
         self.value = value
+        # False when a toolkit failed rather than rejected the input
+        self.cacheable = cacheable
 
 
 async def input_exception_handler(request: Request, exc: InvalidInputException):
@@ -24,3 +26,27 @@ async def input_exception_handler(request: Request, exc: InvalidInputException):
         status_code=422,
         content={"detail": f"Error reading {exc.name}, check again: {exc.value}"},
     )
+
+
+class ToolkitTimeoutException(Exception):
+    def __init__(self, toolkit: str, timeout: float):
+        self.toolkit = toolkit
+        self.timeout = timeout
+
+
+async def timeout_exception_handler(request: Request, exc: ToolkitTimeoutException):
+    """Custom exception handler for ToolkitTimeoutException.
+
+    Args:
+        request (Request): The FastAPI Request object.
+        exc (ToolkitTimeoutException): The ToolkitTimeoutException instance.
+
+    Returns:
+        JSONResponse: A JSON response containing error details.
+    """
+    return JSONResponse(
+        status_code=504,
+        content={
+            "detail": f"{exc.toolkit} computation timed out after {exc.timeout} seconds"
+        },
+    )
@@ -4,6 +4,7 @@ import os
 from fastapi import FastAPI
 from fastapi import status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.responses import RedirectResponse
 from fastapi_versioning import VersionedFastAPI
 from prometheus_fastapi_instrumentator import Instrumentator
@@ -14,6 +15,13 @@ from .routers import depict
 from .routers import tools
 from app.exception_handlers import input_exception_handler
 from app.exception_handlers import InvalidInputException
+from app.exception_handlers import timeout_exception_handler
+from app.exception_handlers import ToolkitTimeoutException
+from app.modules.batch import shutdown_process_pool
+from app.modules.toolkits.jvm_executor import shutdown_executor
+from app.modules.warmup import get_warmup_status
+from app.modules.warmup import is_ready
+from app.modules.warmup import start_warmup
 from app.schemas import HealthCheck
 
 # Import OCSR router if necessary
@@ -92,6 +100,21 @@ for sub_app in app.routes:
             InvalidInputException,
             input_exception_handler,
         )
+        sub_app.app.add_exception_handler(
+            ToolkitTimeoutException,
+            timeout_exception_handler,
+        )
+
+
+@app.on_event("startup")
+def start_warmup_thread():
+    start_warmup()
+
+
+@app.on_event("shutdown")
+def shutdown_cdk_executor():
+    shutdown_executor()
+    shutdown_process_pool()
 
 
 @app.get("/", include_in_schema=False)
@@ -118,3 +141,29 @@ def get_health() -> HealthCheck:
         HealthCheck: Returns a JSON response with the health status
     """
     return HealthCheck(status="OK")
+
+
+@app.get(
+    "/ready",
+    tags=["healthcheck"],
+    summary="Perform a Readiness Check",
+    response_description="Return HTTP Status Code 200 (OK) once warm-up is done",
+    status_code=status.HTTP_200_OK,
+    response_model=HealthCheck,
+)
+def get_ready():
+    """## Perform a Readiness Check.
+
+    Endpoint to check whether the service has finished its startup warm-up
+    (enabled with WARMUP=true) and can serve requests at full speed. Returns
+    503 (Service Unavailable) while the warm-up is still running. Use /health
+    for liveness checks.
+    Returns:
+        HealthCheck: Returns a JSON response with the readiness status
+    """
+    if not is_ready():
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "WARMING UP", "steps": get_warmup_status()},
+        )
+    return HealthCheck(status="OK")
@@ -1,23 +1,25 @@
 from __future__ import annotations
 
+import io
+import json
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
 from typing import Union
 
+import numpy as np
 from rdkit.Chem import Descriptors
 from rdkit.Chem import Lipinski
 from rdkit.Chem import QED
 from rdkit.Chem import rdMolDescriptors
 from rdkit.Chem import rdmolops
 
-from app.modules.toolkits.cdk_wrapper import cdk_base
-from app.modules.toolkits.cdk_wrapper import get_aromatic_ring_count
-from app.modules.toolkits.cdk_wrapper import get_CDK_SDG
-from app.modules.toolkits.cdk_wrapper import get_tanimoto_similarity_CDK
-from app.modules.toolkits.cdk_wrapper import get_vander_waals_volume
-from app.modules.toolkits.cdk_wrapper import JClass
-from app.modules.toolkits.helpers import parse_input
+from app.modules.similarity import iter_similarity_edges
+from app.modules.similarity import iter_similarity_rows
+from app.modules.toolkits.cdk_wrapper import get_CDK_descriptor_values
+from app.modules.toolkits.context import MoleculeContext
 from app.modules.toolkits.rdkit_wrapper import check_RO5_violations
 from app.modules.toolkits.rdkit_wrapper import get_MolVolume
-from app.modules.toolkits.rdkit_wrapper import get_tanimoto_similarity_rdkit
 
 
 def get_all_rdkit_descriptors(molecule: any) -> Union[tuple, str]:
@@ -90,103 +92,28 @@ def get_all_cdk_descriptors(molecule: any) -> Union[tuple, str]:
     Returns:
         tuple: A tuple containing calculated molecular descriptors. If an error occurs during processing, an error message is returned.
     """
-    SDGMol = get_CDK_SDG(molecule)
-    if SDGMol:
-        AtomCountDescriptor = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.AtomCountDescriptor")()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        BondCountDescriptor = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.BondCountDescriptor")()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        HeavyAtomsC = SDGMol.getAtomCount()
-        WeightDescriptor = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.WeightDescriptor")()
-            .calculate(SDGMol)
-            .getValue()
-            .toString()
-        )
-        TotalExactMass = JClass(
-            cdk_base + ".tools.manipulator.AtomContainerManipulator",
-        ).getTotalExactMass(SDGMol)
-        ALogP = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.ALOGPDescriptor")()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        NumRotatableBonds = (
-            JClass(
-                cdk_base + ".qsar.descriptors.molecular.RotatableBondsCountDescriptor",
-            )()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        TPSADescriptor = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.TPSADescriptor")()
-            .calculate(SDGMol)
-            .getValue()
-            .toString()
-        )
-        HBondAcceptorCountDescriptor = (
-            JClass(
-                cdk_base + ".qsar.descriptors.molecular.HBondAcceptorCountDescriptor",
-            )()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        HBondDonorCountDescriptor = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.HBondDonorCountDescriptor")()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        RuleOfFiveDescriptor = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.RuleOfFiveDescriptor")()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        AromaticRings = get_aromatic_ring_count(SDGMol)
-        QEDWeighted = None
-        FormalCharge = JClass(
-            cdk_base + ".tools.manipulator.AtomContainerManipulator",
-        ).getTotalFormalCharge(SDGMol)
-        FractionalCSP3Descriptor = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.FractionalCSP3Descriptor")()
-            .calculate(SDGMol)
-            .getValue()
-            .toString()
-        )
-        NumRings = (
-            JClass(
-                cdk_base + ".graph.Cycles",
-            )
-            .mcb(SDGMol)
-            .numberOfCycles()
-        )
-        VABCVolume = get_vander_waals_volume(SDGMol)
-
+    if molecule:
+        values = get_CDK_descriptor_values(molecule)
         return (
-            int(str(AtomCountDescriptor)),
-            int(str(BondCountDescriptor)),
-            HeavyAtomsC,
-            float("{:.2f}".format(float(str(WeightDescriptor)))),
-            float("{:.5f}".format(float(str(TotalExactMass)))),
-            float("{:.2f}".format(float(str(ALogP).split(",")[0]))),
-            int(str(NumRotatableBonds)),
-            float("{:.2f}".format(float(str(TPSADescriptor)))),
-            int(str(HBondAcceptorCountDescriptor)),
-            int(str(HBondDonorCountDescriptor)),
-            int(str(HBondAcceptorCountDescriptor)),
-            int(str(HBondDonorCountDescriptor)),
-            int(str(RuleOfFiveDescriptor)),
-            AromaticRings,
-            str(QEDWeighted),
-            FormalCharge,
-            float("{:.2f}".format(float(str(FractionalCSP3Descriptor)))),
-            NumRings,
-            float(str(VABCVolume)),
+            values["AtomCount"],
+            values["BondCount"],
+            values["HeavyAtomCount"],
+            round(values["MolecularWeight"], 2),
+            round(values["ExactMass"], 5),
+            round(values["ALogP"], 2),
+            values["RotatableBondCount"],
+            round(values["TPSA"], 2),
+            values["HBondAcceptorCount"],
+            values["HBondDonorCount"],
+            values["HBondAcceptorCount"],
+            values["HBondDonorCount"],
+            values["RuleOfFiveViolations"],
+            values["AromaticRingCount"],
+            str(None),
+            values["FormalCharge"],
+            round(values["FractionCSP3"], 2),
+            values["RingCount"],
+            values["VABCVolume"],
         )
     else:
         return "Error reading SMILES string, check again."
@@ -194,6 +121,7 @@ def get_all_cdk_descriptors(molecule: any) -> Union[tuple, str]:
 
 def get_cdk_rdkit_combined_descriptors(
     smiles: str,
+    context: Optional[MoleculeContext] = None,
 ) -> Union[dict, str]:
     """Calculate a selected set of molecular descriptors using CDK and RDKit.
 
@@ -201,6 +129,7 @@ def get_cdk_rdkit_combined_descriptors(
 
     Args:
         smiles (str): A SMILES string representing a chemical compound.
+        context (MoleculeContext, optional): Already parsed representations of the SMILES. Defaults to None.
 
     Returns:
         Union[Dict[str, Tuple[float, float]], str]:
@@ -208,11 +137,12 @@ def get_cdk_rdkit_combined_descriptors(
               mapped to a tuple of its values calculated by RDKit and CDK.
             - If unsuccessful due to descriptor calculation errors, returns an error message as a string.
     """
+    if context is None:
+        context = MoleculeContext(smiles)
+
     # Calculate RDKit and CDK descriptors
-    rdkitMol = parse_input(smiles, "rdkit", False)
-    rdkit_descriptors = get_all_rdkit_descriptors(rdkitMol)
-    cdkMol = parse_input(smiles, "cdk", False)
-    cdk_descriptors = get_all_cdk_descriptors(cdkMol)
+    rdkit_descriptors = get_all_rdkit_descriptors(context.rdkit_mol)
+    cdk_descriptors = get_all_cdk_descriptors(context.cdk_mol)
 
     # List of descriptors to calculate
     all_descriptors = (
@@ -251,70 +181,175 @@ def get_cdk_rdkit_combined_descriptors(
         return "Error: Dictionary length is invalid"
 
 
-def get_table(tanimoto_values: list) -> str:
-    """Convert a list of Tanimoto similarity values into an HTML table.
+SIMILARITY_MEDIA_TYPES = {
+    "html": "text/html",
+    "json": "application/json",
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "npy": "application/octet-stream",
+}
+SIMILARITY_EDGE_FORMATS = ("json", "csv", "ndjson")
+
+
+def iter_table(tanimoto_values: Iterable[list], size: int) -> Iterator[str]:
+    """Generate an HTML table of Tanimoto similarity values row by row.
 
     Args:
-        tanimoto_values (list): A list of lists containing Tanimoto similarity values.
+        tanimoto_values (Iterable[list]): The rows of Tanimoto similarity values.
+        size (int): The number of columns.
 
     Returns:
-        str: HTML representation of the table.
+        Iterator[str]: The header row, one string per table row and the closing tag.
     """
-    table_html = "<table>"
-
     # Add header row with column indexes
-    table_html += "<tr><th></th>"
-    for j in range(len(tanimoto_values[0])):
-        table_html += f"<th>{j}</th>"
-    table_html += "</tr>"
+    yield "<table><tr><th></th>" + "".join(
+        f"<th>{j}</th>" for j in range(size)
+    ) + "</tr>"
 
     # Add data rows with row indexes
     for i, row in enumerate(tanimoto_values):
-        table_html += "<tr>"
-        table_html += f"<td>{i}</td>"
-        for cell in row:
-            table_html += f"<td>{cell}</td>"
-        table_html += "</tr>"
-
-    table_html += "</table>"
-    return table_html
+        yield f"<tr><td>{i}</td>" + "".join(
+            f"<td>{cell}</td>" for cell in row
+        ) + "</tr>"
 
+    yield "</table>"
 
-def get_tanimoto_similarity(smileslist: str, toolkit: str = "cdk") -> list:
-    """Calculate the Tanimoto similarity index between pairs of SMILES strings.
 
-    This function takes a list of SMILES strings, splits them, and calculates
-    the Tanimoto similarity index between every pair of SMILES strings.
+def iter_tanimoto_edges(
+    fingerprints: np.ndarray,
+    toolkit: str = "rdkit",
+    fingerprinter: str = "ECFP",
+    format: str = "json",
+    threshold: float = 0.0,
+) -> Iterator[str]:
+    """Generate the pairs of molecules with at least a given Tanimoto similarity.
 
     Args:
-        smileslist (str): A comma-separated list of SMILES strings.
-        toolkit (str, optional): The toolkit to use for calculating similarity.Can be "cdk" (Chemistry Development Kit) or "rdkit" (RDKit). Defaults to "cdk".
+        fingerprints (np.ndarray): Fingerprint rows from get_fingerprint_matrix.
+        toolkit (str, optional): The toolkit the fingerprints were computed with. Defaults to "rdkit".
+        fingerprinter (str, optional): The fingerprint type. Defaults to "ECFP".
+        format (str, optional): "json" (list of [i, j, similarity]), "csv" (one "i,j,similarity" per line) or "ndjson" (one {"i", "j", "similarity"} object per line). Defaults to "json".
+        threshold (float, optional): The similarity cutoff, inclusive. Defaults to 0.0.
 
     Returns:
-        list: A matrix containing Tanimoto similarity scores.Rows and columns correspond to SMILES strings in the input list.
+        Iterator[str]: The encoded edge list in chunks, each pair once with i < j.
 
     Raises:
-        ValueError: If an unsupported toolkit is provided.
+        ValueError: If an unsupported format is provided.
     """
-
-    # Parse comma-separated list of SMILES into a list of SMILES strings
-    smiles_list = smileslist.split(",")
-
-    # Create an empty matrix to store similarity scores
-    matrix = [[0.0] * len(smiles_list) for _ in range(len(smiles_list))]
-
-    # Populate the matrix with similarity scores
-    for i in range(len(smiles_list)):
-        for j in range(len(smiles_list)):
-            if toolkit == "rdkit":
-                mol1 = parse_input(smiles_list[i], "rdkit", False)
-                mol2 = parse_input(smiles_list[j], "rdkit", False)
-                matrix[i][j] = get_tanimoto_similarity_rdkit(mol1, mol2)
-            elif toolkit == "cdk":
-                mol1 = parse_input(smiles_list[i], "cdk", False)
-                mol2 = parse_input(smiles_list[j], "cdk", False)
-                matrix[i][j] = get_tanimoto_similarity_CDK(mol1, mol2)
+    if format not in SIMILARITY_EDGE_FORMATS:
+        raise ValueError(f"Unsupported format for an edge list: {format}")
+
+    first = True
+    if format == "json":
+        yield "["
+    for first_indices, second_indices, similarities in iter_similarity_edges(
+        fingerprints,
+        fingerprinter,
+        threshold,
+    ):
+        if toolkit == "cdk" and fingerprinter == "PubChem":
+            # CDK reports BitSet similarities in single precision
+            similarities = similarities.astype(np.float32)
+        similarities = similarities.tolist()
+        if toolkit == "cdk":
+            if format == "csv":
+                similarities = ["{:.5f}".format(value) for value in similarities]
             else:
-                raise ValueError("Unsupported toolkit:", toolkit)
+                similarities = [round(value, 5) for value in similarities]
+        edges = zip(first_indices.tolist(), second_indices.tolist(), similarities)
+        if format == "csv":
+            chunk = "".join(f"{i},{j},{similarity}\n" for i, j, similarity in edges)
+        elif format == "ndjson":
+            chunk = "".join(
+                json.dumps({"i": i, "j": j, "similarity": similarity}) + "\n"
+                for i, j, similarity in edges
+            )
+        else:
+            chunk = ",".join(json.dumps(list(edge)) for edge in edges)
+            if chunk and not first:
+                chunk = "," + chunk
+        if chunk:
+            first = False
+            yield chunk
+    if format == "json":
+        yield "]"
+
+
+def iter_tanimoto_similarity(
+    fingerprints: np.ndarray,
+    toolkit: str = "rdkit",
+    fingerprinter: str = "ECFP",
+    format: str = "html",
+    threshold: Optional[float] = None,
+) -> Iterator[Union[str, bytes]]:
+    """Generate a Tanimoto similarity matrix in the given output format.
+
+    The matrix is computed and encoded a tile of rows at a time, on the
+    batch process pool for large inputs, so it is never held in memory as a
+    whole. CDK similarities are rounded to 5 decimal places, as reported by
+    the pairwise CDK functions.
+
+    Args:
+        fingerprints (np.ndarray): Fingerprint rows from get_fingerprint_matrix.
+        toolkit (str, optional): The toolkit the fingerprints were computed with. Defaults to "rdkit".
+        fingerprinter (str, optional): The fingerprint type. Defaults to "ECFP".
+        format (str, optional): "html", "json" (list of rows), "csv" (one row per line), "ndjson" (one {"index", "similarities"} object per line) or "npy" (float32 NumPy array). Defaults to "html".
+        threshold (float, optional): Return the sparse edge list of iter_tanimoto_edges instead of the matrix. Defaults to None.
 
-    return get_table(matrix)
+    Returns:
+        Iterator[Union[str, bytes]]: The encoded matrix in chunks, bytes for "npy".
+
+    Raises:
+        ValueError: If an unsupported format is provided.
+    """
+    if threshold is not None:
+        yield from iter_tanimoto_edges(
+            fingerprints,
+            toolkit,
+            fingerprinter,
+            format,
+            threshold,
+        )
+        return
+    if format not in SIMILARITY_MEDIA_TYPES:
+        raise ValueError(f"Unsupported format: {format}")
+
+    n = len(fingerprints)
+    rows = iter_similarity_rows(fingerprints, fingerprinter)
+    if toolkit == "cdk" and fingerprinter == "PubChem":
+        # CDK reports BitSet similarities in single precision
+        rows = (row.astype(np.float32) for row in rows)
+
+    if format == "npy":
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(
+            header,
+            {"descr": "<f4", "fortran_order": False, "shape": (n, n)},
+        )
+        yield header.getvalue()
+        for row in rows:
+            yield row.astype("<f4").tobytes()
+        return
+
+    if toolkit == "cdk":
+        if format in ("html", "csv"):
+            cells = (["{:.5f}".format(value) for value in row.tolist()] for row in rows)
+        else:
+            cells = ([round(value, 5) for value in row.tolist()] for row in rows)
+    else:
+        cells = (row.tolist() for row in rows)
+
+    if format == "html":
+        yield from iter_table(cells, n)
+    elif format == "csv":
+        for row in cells:
+            yield ",".join(map(str, row)) + "\n"
+    elif format == "ndjson":
+        for index, row in enumerate(cells):
+            yield json.dumps({"index": index, "similarities": row}) + "\n"
+    else:
+        yield "["
+        for index, row in enumerate(cells):
+            yield ("," if index else "") + json.dumps(row)
+        yield "]"
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import codecs
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from tempfile import SpooledTemporaryFile
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+from fastapi import Request
+
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", str(os.cpu_count() or 1)))
+BATCH_PARALLEL_THRESHOLD = int(os.getenv("BATCH_PARALLEL_THRESHOLD", "256"))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "4096"))
+BATCH_SPOOL_SIZE = 16 * 1024 * 1024
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the process-wide pool used for large batch requests.
+
+    Workers are started from a fork server, so they never inherit the JVM
+    or other threads of the web worker, and stay alive between requests so
+    that toolkit objects created in them are reused. The pool size is
+    configured with the BATCH_WORKERS environment variable.
+
+    Returns:
+        ProcessPoolExecutor: The batch process pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=BATCH_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the batch process pool if it has been started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def map_batch(
+    func: Callable[[Any], Any],
+    items: Sequence[Any],
+    chunksize: Optional[int] = None,
+) -> List[Any]:
+    """Apply a function to every item of a batch, in parallel for large batches.
+
+    Batches smaller than BATCH_PARALLEL_THRESHOLD run in the calling
+    process, where the cost of sending them to the pool would outweigh the
+    gain. ``func`` must be picklable, i.e. a module level function or a
+    functools.partial of one.
+
+    Args:
+        func (Callable): The function to apply.
+        items (Sequence): The batch items.
+        chunksize (int, optional): Items sent to a worker at a time. Defaults to about four chunks per worker.
+
+    Returns:
+        List[Any]: The results, in the order of the items.
+    """
+    if len(items) < BATCH_PARALLEL_THRESHOLD or BATCH_WORKERS <= 1:
+        return [func(item) for item in items]
+    chunksize = chunksize or max(1, math.ceil(len(items) / (BATCH_WORKERS * 4)))
+    return list(get_process_pool().map(func, items, chunksize=chunksize))
+
+
+def map_chunks(
+    func: Callable[[List[Any]], List[Any]],
+    items: Sequence[Any],
+) -> List[Any]:
+    """Apply a vectorized function to a batch, split into chunks for large batches.
+
+    Like map_batch, but ``func`` takes and returns a list, so each worker
+    processes a whole chunk at once.
+
+    Args:
+        func (Callable): The function to apply to a list of items.
+        items (Sequence): The batch items.
+
+    Returns:
+        List[Any]: The results, in the order of the items.
+    """
+    if len(items) < BATCH_PARALLEL_THRESHOLD or BATCH_WORKERS <= 1:
+        return func(list(items))
+    size = max(1, math.ceil(len(items) / (BATCH_WORKERS * 4)))
+    bounds = range(0, len(items) + size, size)
+    chunks = [list(items[start:stop]) for start, stop in zip(bounds, bounds[1:])]
+    return [
+        result for chunk in get_process_pool().map(func, chunks) for result in chunk
+    ]
+
+
+async def spool_request(request: Request) -> SpooledTemporaryFile:
+    """Copy a request body into a temporary text file as it arrives.
+
+    Small bodies stay in memory, larger ones spill to disk, so arbitrarily
+    large inputs can be processed without holding them in memory. The body
+    has to be read before a streaming response starts, as the response
+    listens on the same channel for client disconnects.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        SpooledTemporaryFile: The body as a text file, positioned at the start.
+    """
+    spool = SpooledTemporaryFile(max_size=BATCH_SPOOL_SIZE, mode="w+")
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for data in request.stream():
+        spool.write(decoder.decode(data))
+    spool.write(decoder.decode(b"", final=True))
+    spool.seek(0)
+    return spool
+
+
+def iter_chunks(
+    lines: Iterable[str], size: int = BATCH_CHUNK_SIZE
+) -> Iterator[List[str]]:
+    """Group the non-empty lines of a text stream into chunks.
+
+    Args:
+        lines (Iterable[str]): The lines, e.g. an open text file.
+        size (int, optional): Number of lines per chunk. Defaults to BATCH_CHUNK_SIZE.
+
+    Returns:
+        Iterator[List[str]]: Chunks of at most ``size`` stripped lines.
+    """
+    chunk: List[str] = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            chunk.append(line)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Hashable
+from typing import Optional
+
+from prometheus_client import Counter
+from prometheus_client import Gauge
+
+CACHE_EVENTS = Counter(
+    "cms_cache_events_total",
+    "Number of cache lookups and evictions by cache and event type.",
+    ["cache", "event"],
+)
+CACHE_SIZE = Gauge(
+    "cms_cache_entries",
+    "Number of entries currently held by the cache.",
+    ["cache"],
+)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """A thread-safe, size-bounded least-recently-used cache.
+
+    Entries are evicted in least-recently-used order once ``maxsize`` is
+    reached. Optionally, entries expire ``ttl`` seconds after insertion.
+    Hit, miss and eviction counts are kept on the instance and exported as
+    Prometheus metrics labelled with the cache ``name``.
+
+    Args:
+        name (str): Name of the cache, used as the metrics label.
+        maxsize (int): Maximum number of entries. A value <= 0 disables caching.
+        ttl (float, optional): Time to live of an entry in seconds. Defaults to None (no expiry).
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value stored for ``key``, or ``default`` if it is missing.
+
+        Expired entries count as missing.
+
+        Args:
+            key (Hashable): Cache key.
+            default (Any, optional): Value returned on a miss. Defaults to None.
+
+        Returns:
+            Any: The cached value or ``default``.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    CACHE_EVENTS.labels(self.name, "hit").inc()
+                    return value
+                del self._data[key]
+                self.evictions += 1
+                CACHE_EVENTS.labels(self.name, "expired").inc()
+                CACHE_SIZE.labels(self.name).set(len(self._data))
+            self.misses += 1
+            CACHE_EVENTS.labels(self.name, "miss").inc()
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` under ``key``.
+
+        The least recently used entries are evicted if the cache is full.
+
+        Args:
+            key (Hashable): Cache key.
+            value (Any): Value to store.
+        """
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+                CACHE_EVENTS.labels(self.name, "eviction").inc()
+            CACHE_SIZE.labels(self.name).set(len(self._data))
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+            CACHE_SIZE.labels(self.name).set(0)
+
+    def stats(self) -> dict:
+        """Return the current cache statistics.
+
+        Returns:
+            dict: Size, capacity, hits, misses and evictions of the cache.
+        """
+        with self._lock:
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
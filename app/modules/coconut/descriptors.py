@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import Dict
+from typing import Optional
 from typing import Union
 
 from app.modules.all_descriptors import get_cdk_rdkit_combined_descriptors
@@ -8,24 +9,28 @@ from app.modules.npscorer import get_np_score
 from app.modules.toolkits.cdk_wrapper import get_CDK_descriptors
 from app.modules.toolkits.cdk_wrapper import get_CDK_MolecularFormula
 from app.modules.toolkits.cdk_wrapper import get_murko_framework
-from app.modules.toolkits.helpers import parse_input
+from app.modules.toolkits.context import MoleculeContext
 from app.modules.toolkits.rdkit_wrapper import get_rdkit_descriptors
 from app.modules.tools.sugar_removal import get_sugar_info
 
 
-def get_descriptors(smiles: str, toolkit: str) -> Union[tuple, str]:
+def get_descriptors(
+    smiles: str, toolkit: str, context: Optional[MoleculeContext] = None
+) -> Union[tuple, str]:
     """Calculate descriptors using RDKit or CDK toolkit for the given SMILES.
 
     Args:
         smiles (str): SMILES input.
         toolkit (str): Toolkit choice ("rdkit" or "cdk").
+        context (MoleculeContext, optional): Already parsed representations of the SMILES. Defaults to None.
 
     Returns:
         dict or str: Dictionary of descriptors and their values if successful,
                      or an error message if the toolkit choice is invalid or SMILES is invalid.
     """
-
-    mol = parse_input(smiles, toolkit, False)
+    if context is None:
+        context = MoleculeContext(smiles)
+    mol = context.get_mol(toolkit)
     if mol:
         if toolkit == "rdkit":
             Descriptors = get_rdkit_descriptors(mol)
@@ -35,7 +40,9 @@ def get_descriptors(smiles: str, toolkit: str) -> Union[tuple, str]:
             return Descriptors
 
 
-def get_COCONUT_descriptors(smiles: str, toolkit: str) -> Union[Dict[str, float], str]:
+def get_COCONUT_descriptors(
+    smiles: str, toolkit: str, context: Optional[MoleculeContext] = None
+) -> Union[Dict[str, float], str]:
     """Calculate COCONUT descriptors using RDKit or CDK toolkit for the given.
 
     SMILES.
@@ -43,21 +50,25 @@ def get_COCONUT_descriptors(smiles: str, toolkit: str) -> Union[Dict[str, float]
     Args:
         smiles (str): SMILES input.
         toolkit (str): Toolkit choice ("rdkit" or "cdk").
+        context (MoleculeContext, optional): Already parsed representations of the SMILES. Defaults to None.
 
     Returns:
         dict or str: Dictionary of COCONUT descriptors and their values if successful,
                      or an error message if the toolkit choice is invalid or SMILES is invalid.
     """
+    if context is None:
+        context = MoleculeContext(smiles)
+
     if toolkit == "all":
-        AllDescriptors = get_cdk_rdkit_combined_descriptors(smiles)
+        AllDescriptors = get_cdk_rdkit_combined_descriptors(smiles, context)
         return AllDescriptors
     else:
-        Descriptors = get_descriptors(smiles, toolkit)
+        Descriptors = get_descriptors(smiles, toolkit, context)
 
-        rdkitMolecule = parse_input(smiles, "rdkit", False)
+        rdkitMolecule = context.rdkit_mol
         nplikeliness = float(get_np_score(rdkitMolecule))
 
-        cdkMolecule = parse_input(smiles, "cdk", False)
+        cdkMolecule = context.cdk_mol
         hasLinearSugar, hasCircularSugars = get_sugar_info(cdkMolecule)
         framework = get_murko_framework(cdkMolecule)
         molFormula = get_CDK_MolecularFormula(cdkMolecule)
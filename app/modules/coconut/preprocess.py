@@ -7,6 +7,7 @@ from rdkit import Chem
 import app.modules.toolkits.cdk_wrapper as cdk
 import app.modules.toolkits.rdkit_wrapper as rdkitmodules
 from app.modules.coconut.descriptors import get_COCONUT_descriptors
+from app.modules.toolkits.context import MoleculeContext
 from app.modules.toolkits.helpers import InvalidInputException
 from app.modules.toolkits.helpers import parse_input
 
@@ -25,12 +26,7 @@ def get_mol_block(input_text: str) -> str:
     """
 
     try:
-        molecule = parse_input(input_text, "cdk", False)
-        mol_block = cdk.get_CDK_SDG_mol(
-            molecule,
-            V3000=False,
-        ).replace("$$$$\n", "")
-        return mol_block
+        return MoleculeContext(input_text).molblock
     except InvalidInputException:
         raise InvalidInputException(f"Invalid input SMILES: {input_text}")
 
@@ -151,11 +147,12 @@ def get_molecule_hash(molecule: Chem.Mol) -> dict:
         return {"Error": "Check input SMILES"}
 
 
-def get_representations(molecule: Chem.Mol) -> dict:
+def get_representations(molecule: Chem.Mol, cdkMolecule: any = None) -> dict:
     """Return COCONUT representations for the provided SMILES.
 
     Args:
         molecule (Chem.Mol): An RDKit molecule object representing the molecular structure.
+        cdkMolecule (IAtomContainer, optional): The same structure as a CDK molecule. Parsed from the RDKit SMILES if not given.
 
     Returns:
         dict: Dictionary containing InChI, InChi Key, and Murko framework.
@@ -163,7 +160,8 @@ def get_representations(molecule: Chem.Mol) -> dict:
     if molecule:
         InChI = Chem.inchi.MolToInchi(molecule)
         InChI_Key = Chem.inchi.MolToInchiKey(molecule)
-        cdkMolecule = parse_input(Chem.MolToSmiles(molecule), "cdk", False)
+        if cdkMolecule is None:
+            cdkMolecule = parse_input(Chem.MolToSmiles(molecule), "cdk", False)
         Murko = cdk.get_murko_framework(cdkMolecule)
         return {
             "standard_inchi": InChI,
@@ -195,32 +193,39 @@ def get_COCONUT_preprocessing(
         input_text = input_text.replace(" ", "+").replace("\\\\", "\\")
 
         # Original molecule
-        original_mol = parse_input(input_text, "rdkit", False)
+        original = MoleculeContext(input_text)
+        original_mol = original.rdkit_mol
 
-        original_mol_block = get_mol_block(input_text)
+        original_mol_block = original.molblock
         original_mol_hash = get_molecule_hash(original_mol)
-        original_representations = get_representations(original_mol)
+        original_representations = get_representations(original_mol, original.cdk_mol)
 
         # Standardized molecule
         standardized_mol_block = standardizer.standardize_molblock(original_mol_block)
         standardized_SMILES = get_standardized_smiles(standardized_mol_block)
-        standardized_mol = parse_input(standardized_SMILES, "rdkit", False)
-        standardized_representations = get_representations(standardized_mol)
+        standardized = MoleculeContext(standardized_SMILES)
+        standardized_mol = standardized.rdkit_mol
+        standardized_representations = get_representations(
+            standardized_mol, standardized.cdk_mol
+        )
 
         # Parent molecule
         parent_canonical_smiles = original_mol_hash["Parent_SMILES"]
-        parent_mol_block = get_mol_block(parent_canonical_smiles)
-        rdkitParentMol = parse_input(parent_canonical_smiles, "rdkit", False)
-        parent_representations = get_representations(rdkitParentMol)
+        parent = MoleculeContext(parent_canonical_smiles)
+        parent_mol_block = parent.molblock
+        rdkitParentMol = parent.rdkit_mol
+        parent_representations = get_representations(rdkitParentMol, parent.cdk_mol)
 
         # Compute descriptors if requested
         if descriptors:
-            original_descriptors = get_COCONUT_descriptors(input_text, "rdkit")
+            original_descriptors = get_COCONUT_descriptors(
+                input_text, "rdkit", original
+            )
             standardized_descriptors = get_COCONUT_descriptors(
-                standardized_SMILES, "rdkit"
+                standardized_SMILES, "rdkit", standardized
             )
             parent_descriptors = get_COCONUT_descriptors(
-                parent_canonical_smiles, "rdkit"
+                parent_canonical_smiles, "rdkit", parent
             )
         else:
             original_descriptors = {"descriptors": "Not computed, enable for computing"}
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import math
+import os
+import time
+from typing import Optional
+
+import numpy as np
+from rdkit import Chem
+from rdkit.Chem import AllChem
+from rdkit.Geometry import Point3D
+
+from app.exception_handlers import ToolkitTimeoutException
+from app.modules.cache import LRUCache
+
+CONFORMER_THREADS = int(
+    os.getenv("CONFORMER_THREADS", str(min(4, os.cpu_count() or 1)))
+)
+CONFORMER_TIMEOUT = float(os.getenv("CONFORMER_TIMEOUT", "30"))
+CONFORMER_SEED = int(os.getenv("CONFORMER_SEED", "0xF00D"), 0)
+CONFORMER_MAX_ATTEMPTS = 5000
+
+# Coordinates indexed by canonical atom rank, keyed by canonical SMILES
+conformer_cache = LRUCache(
+    "conformer",
+    maxsize=int(os.getenv("CONFORMER_CACHE_SIZE", "1024")),
+)
+
+
+def get_embed_parameters(
+    seed: int = CONFORMER_SEED,
+    timeout: int = 0,
+) -> AllChem.EmbedParameters:
+    """Return the ETKDGv3 embedding parameters used by the conformer service.
+
+    Args:
+        seed (int, optional): Random seed, a fixed seed makes embedding deterministic. Defaults to CONFORMER_SEED.
+        timeout (int, optional): RDKit's per conformer timeout in whole seconds, 0 disables it. Defaults to 0.
+
+    Returns:
+        AllChem.EmbedParameters: The embedding parameters.
+    """
+    params = AllChem.ETKDGv3()
+    params.randomSeed = seed
+    params.useRandomCoords = True
+    params.maxIterations = CONFORMER_MAX_ATTEMPTS
+    params.numThreads = CONFORMER_THREADS
+    params.timeout = timeout
+    return params
+
+
+def _optimize(molecule: Chem.Mol) -> Optional[list]:
+    """Force field optimize all conformers, MMFF94 with a UFF fallback.
+
+    Returns:
+        list: The (not_converged, energy) tuple of each conformer, or None if neither force field covers the molecule.
+    """
+    if AllChem.MMFFHasAllMoleculeParams(molecule):
+        return AllChem.MMFFOptimizeMoleculeConfs(
+            molecule,
+            numThreads=CONFORMER_THREADS,
+        )
+    if AllChem.UFFHasAllMoleculeParams(molecule):
+        return AllChem.UFFOptimizeMoleculeConfs(
+            molecule,
+            numThreads=CONFORMER_THREADS,
+        )
+    return None
+
+
+def _embed(
+    molecule: Chem.Mol,
+    num_confs: int,
+    seed: int,
+    optimize: bool,
+    timeout: float,
+) -> Optional[np.ndarray]:
+    """Embed a molecule with hydrogens in place and keep its best conformer.
+
+    Returns:
+        np.ndarray: The coordinates of the conformer, or None if embedding failed.
+
+    Raises:
+        ToolkitTimeoutException: If no conformer could be embedded within the timeout.
+    """
+    # RDKit limits the time spent on each conformer, checked between embedding
+    # stages, so the total is spread over the conformers
+    per_conformer = max(1, math.ceil(timeout / num_confs)) if timeout > 0 else 0
+    started = time.monotonic()
+    conf_ids = [
+        conf_id
+        for conf_id in AllChem.EmbedMultipleConfs(
+            molecule,
+            num_confs,
+            get_embed_parameters(seed, per_conformer),
+        )
+        if conf_id >= 0
+    ]
+    if not conf_ids:
+        if per_conformer and time.monotonic() - started >= per_conformer:
+            raise ToolkitTimeoutException("rdkit", timeout)
+        return None
+    # renumber the embedded conformers, the force fields expect consecutive ids
+    conformers = [Chem.Conformer(molecule.GetConformer(i)) for i in conf_ids]
+    molecule.RemoveAllConformers()
+    for conformer in conformers:
+        molecule.AddConformer(conformer, assignId=True)
+    best = 0
+    if optimize:
+        results = _optimize(molecule)
+        if results:
+            best = min(range(len(results)), key=lambda index: results[index][1])
+    conformer = Chem.Conformer(molecule.GetConformer(best))
+    molecule.RemoveAllConformers()
+    molecule.AddConformer(conformer, assignId=True)
+    return conformer.GetPositions()
+
+
+def get_conformer(
+    molecule: Chem.Mol,
+    num_confs: int = 1,
+    seed: int = CONFORMER_SEED,
+    optimize: bool = True,
+    timeout: Optional[float] = None,
+) -> Chem.Mol:
+    """Generate a 3D conformer with ETKDGv3, optionally force field optimized.
+
+    The molecule keeps its atom order, explicit hydrogens and properties,
+    hydrogens are added after the existing atoms. Embedding uses a fixed
+    seed and results are cached by canonical SMILES and parameters, with
+    the coordinates stored by canonical atom rank, so the same structure
+    written in any atom order gets the same geometry. When several
+    conformers are requested they are embedded and optimized on
+    CONFORMER_THREADS threads and the lowest energy one is returned.
+
+    Args:
+        molecule (Chem.Mol): RDKit molecule object.
+        num_confs (int, optional): Number of conformers to embed. Defaults to 1.
+        seed (int, optional): Random seed. Defaults to CONFORMER_SEED.
+        optimize (bool, optional): Optimize with MMFF94 (UFF as fallback). Defaults to True.
+        timeout (float, optional): Timeout in seconds, rounded up to whole seconds per conformer by RDKit. Defaults to CONFORMER_TIMEOUT, a value <= 0 disables it.
+
+    Returns:
+        Chem.Mol: A copy of the molecule with explicit hydrogens and one conformer, or without a conformer if embedding failed.
+
+    Raises:
+        ToolkitTimeoutException: If embedding does not finish within the timeout.
+    """
+    key = (Chem.MolToSmiles(molecule), num_confs, seed, optimize)
+    molecule = Chem.AddHs(Chem.Mol(molecule))
+    ranks = list(Chem.CanonicalRankAtoms(molecule, breakTies=True))
+    entry = conformer_cache.get(key)
+    if entry is None:
+        timeout = CONFORMER_TIMEOUT if timeout is None else timeout
+        positions = _embed(molecule, num_confs, seed, optimize, timeout)
+        entry = np.empty((0, 3))
+        if positions is not None:
+            entry = np.empty_like(positions)
+            entry[ranks] = positions
+        conformer_cache.set(key, entry)
+        return molecule
+
+    molecule.RemoveAllConformers()
+    if len(entry):
+        conformer = Chem.Conformer(molecule.GetNumAtoms())
+        for index, rank in enumerate(ranks):
+            conformer.SetAtomPosition(index, Point3D(*entry[rank]))
+        conformer.Set3D(True)
+        molecule.AddConformer(conformer, assignId=True)
+    return molecule
@@ -2,13 +2,53 @@ from __future__ import annotations
 
 import xml.etree.ElementTree as ET
 
-from jpype import JClass
 from rdkit import Chem
 from rdkit.Chem import rdDepictor
 from rdkit.Chem.Draw import rdMolDraw2D
 
+from app.modules.toolkits.cdk_wrapper import cdk_base
+from app.modules.toolkits.cdk_wrapper import get_builder
 from app.modules.toolkits.cdk_wrapper import get_CDK_SDG
 from app.modules.toolkits.cdk_wrapper import get_cip_annotation
+from app.modules.toolkits.cdk_wrapper import get_engine
+from app.modules.toolkits.cdk_wrapper import get_JClass
+
+
+def _get_depiction_generator(molSize=(512, 512), unicolor=False):
+    """Build a CDK DepictionGenerator with the service's default styling.
+
+    Args:
+        molSize (tuple): Width and height of the depiction.
+        unicolor (bool): Draw all atoms in black instead of element colors.
+
+    Returns:
+        DepictionGenerator: The configured depiction generator.
+    """
+    StandardGenerator = get_JClass(
+        cdk_base + ".renderer.generators.standard.StandardGenerator",
+    )
+    Color = get_JClass("java.awt.Color")
+
+    if unicolor:
+        UniColor = get_JClass(cdk_base + ".renderer.color.UniColor")
+        return (
+            get_JClass(cdk_base + ".depict.DepictionGenerator")()
+            .withSize(molSize[0], molSize[1])
+            .withParam(StandardGenerator.StrokeRatio.class_, 1.0)
+            .withAnnotationColor(Color.BLACK)
+            .withParam(StandardGenerator.AtomColor.class_, UniColor(Color.BLACK))
+            .withBackgroundColor(Color.WHITE)
+            .withFillToFit()
+        )
+    CDK2DAtomColors = get_JClass(cdk_base + ".renderer.color.CDK2DAtomColors")()
+    return (
+        get_JClass(cdk_base + ".depict.DepictionGenerator")()
+        .withAtomColors(CDK2DAtomColors)
+        .withSize(molSize[0], molSize[1])
+        .withParam(StandardGenerator.StrokeRatio.class_, 1.0)
+        .withFillToFit()
+        .withBackgroundColor(Color.WHITE)
+    )
 
 
 def get_cdk_depiction(
@@ -32,36 +72,15 @@ def get_cdk_depiction(
     """
     print(unicolor)
 
-    cdk_base = "org.openscience.cdk"
-    StandardGenerator = JClass(
-        cdk_base + ".renderer.generators.standard.StandardGenerator",
-    )
-    Color = JClass("java.awt.Color")
-    UniColor = JClass(cdk_base + ".renderer.color.UniColor")
-    CDK2DAtomColors = JClass(cdk_base + ".renderer.color.CDK2DAtomColors")()
-    Kekulization = JClass(cdk_base + ".aromaticity.Kekulization")
-    SmartsPattern = JClass(cdk_base + ".smarts.SmartsPattern")
-    SCOB = JClass(cdk_base + ".silent.SilentChemObjectBuilder")
+    Color = get_JClass("java.awt.Color")
+    Kekulization = get_JClass(cdk_base + ".aromaticity.Kekulization")
+    SmartsPattern = get_JClass(cdk_base + ".smarts.SmartsPattern")
+    GeometryTools = get_JClass(cdk_base + ".geometry.GeometryTools")
 
-    if unicolor:
-        DepictionGenerator = (
-            JClass(cdk_base + ".depict.DepictionGenerator")()
-            .withSize(molSize[0], molSize[1])
-            .withParam(StandardGenerator.StrokeRatio.class_, 1.0)
-            .withAnnotationColor(Color.BLACK)
-            .withParam(StandardGenerator.AtomColor.class_, UniColor(Color.BLACK))
-            .withBackgroundColor(Color.WHITE)
-            .withFillToFit()
-        )
-    else:
-        DepictionGenerator = (
-            JClass(cdk_base + ".depict.DepictionGenerator")()
-            .withAtomColors(CDK2DAtomColors)
-            .withSize(molSize[0], molSize[1])
-            .withParam(StandardGenerator.StrokeRatio.class_, 1.0)
-            .withFillToFit()
-            .withBackgroundColor(Color.WHITE)
-        )
+    DepictionGenerator = get_engine(
+        ("DepictionGenerator", molSize[0], molSize[1], bool(unicolor)),
+        lambda: _get_depiction_generator(molSize, unicolor),
+    )
 
     if CIP:
         SDGMol = get_cip_annotation(molecule)
@@ -76,17 +95,15 @@ def get_cdk_depiction(
             except Exception as e:
                 print(e + "Can't Kekulize molecule")
 
-        point = JClass(
-            cdk_base + ".geometry.GeometryTools",
-        ).get2DCenter(SDGMol)
-        JClass(cdk_base + ".geometry.GeometryTools").rotate(
+        point = GeometryTools.get2DCenter(SDGMol)
+        GeometryTools.rotate(
             SDGMol,
             point,
-            (rotate * JClass("java.lang.Math").PI / 180.0),
+            (rotate * get_JClass("java.lang.Math").PI / 180.0),
         )
 
         if highlight and highlight.strip():
-            tmpPattern = SmartsPattern.create(highlight, SCOB.getInstance())
+            tmpPattern = SmartsPattern.create(highlight, get_builder())
             SmartsPattern.prepare(SDGMol)
             tmpMappings = tmpPattern.matchAll(SDGMol)
             tmpSubstructures = tmpMappings.toSubstructures()
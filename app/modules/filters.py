@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from rdkit import Chem
+from rdkit.Chem import Crippen
+from rdkit.Chem import Descriptors
+from rdkit.Chem import QED
+from rdkit.Chem import rdMolDescriptors
+from rdkit.Chem import rdmolops
+
+from app.modules.npscorer import score_mol
+from app.modules.scores import score_molecules_np_sa
+from app.modules.toolkits.rdkit_wrapper import get_filter_catalog
+from app.modules.toolkits.rdkit_wrapper import get_sas_score
+
+# Descriptors shared by the rule sets, each computed at most once per molecule
+DESCRIPTOR_FUNCTIONS: Dict[str, Callable[[Chem.Mol], float]] = {
+    "MolWt": Descriptors.MolWt,
+    "ExactMolWt": Descriptors.ExactMolWt,
+    "MolLogP": Descriptors.MolLogP,
+    "HBD": Descriptors.NumHDonors,
+    "HBA": Descriptors.NumHAcceptors,
+    "RotatableBonds": rdMolDescriptors.CalcNumRotatableBonds,
+    "TPSA": Descriptors.TPSA,
+    "FormalCharge": rdmolops.GetFormalCharge,
+    "HeavyAtoms": rdMolDescriptors.CalcNumHeavyAtoms,
+    "Atoms": rdMolDescriptors.CalcNumAtoms,
+    "MolarRefractivity": Crippen.MolMR,
+    "PAINS": lambda mol: get_filter_catalog("PAINS").HasMatch(mol),
+    "QED": QED.qed,
+    "SAScore": get_sas_score,
+    "NPScore": lambda mol: round(score_mol(mol), 2),
+}
+
+# Scores computed together for the whole batch from shared Morgan environments
+SHARED_SCORES = {
+    "SAScore": "sascore",
+    "NPScore": "nplikeness",
+}
+
+Columns = Dict[str, np.ndarray]
+
+# Rule sets as vectorized predicates over descriptor columns
+RULES: Dict[str, Tuple[Tuple[str, ...], Callable[[Columns], np.ndarray]]] = {
+    "pains": (("PAINS",), lambda d: d["PAINS"] > 0),
+    "lipinski": (
+        ("MolWt", "MolLogP", "HBD", "HBA"),
+        lambda d: (d["MolLogP"] <= 5)
+        & (d["MolWt"] <= 500)
+        & (d["HBA"] <= 10)
+        & (d["HBD"] <= 5),
+    ),
+    "veber": (
+        ("RotatableBonds", "TPSA"),
+        lambda d: (d["RotatableBonds"] <= 10) & (d["TPSA"] <= 140),
+    ),
+    "reos": (
+        (
+            "ExactMolWt",
+            "MolLogP",
+            "HBD",
+            "HBA",
+            "FormalCharge",
+            "RotatableBonds",
+            "HeavyAtoms",
+        ),
+        lambda d: (d["ExactMolWt"] >= 200)
+        & (d["ExactMolWt"] <= 500)
+        & (d["MolLogP"] >= -5)
+        & (d["MolLogP"] <= 5)
+        & (d["HBD"] >= 0)
+        & (d["HBD"] <= 5)
+        & (d["HBA"] >= 0)
+        & (d["HBA"] <= 10)
+        & (d["FormalCharge"] >= -2)
+        & (d["FormalCharge"] <= 2)
+        & (d["RotatableBonds"] >= 0)
+        & (d["RotatableBonds"] <= 8)
+        & (d["HeavyAtoms"] >= 15)
+        & (d["HeavyAtoms"] <= 50),
+    ),
+    "ghose": (
+        ("ExactMolWt", "MolLogP", "Atoms", "MolarRefractivity"),
+        lambda d: (d["ExactMolWt"] >= 160)
+        & (d["ExactMolWt"] <= 480)
+        & (d["MolLogP"] >= 0.4)
+        & (d["MolLogP"] <= 5.6)
+        & (d["Atoms"] >= 20)
+        & (d["Atoms"] <= 70)
+        & (d["MolarRefractivity"] >= 40)
+        & (d["MolarRefractivity"] <= 130),
+    ),
+    "ruleofthree": (
+        ("ExactMolWt", "MolLogP", "HBD", "HBA", "RotatableBonds"),
+        lambda d: (d["ExactMolWt"] <= 300)
+        & (d["MolLogP"] <= 3)
+        & (d["HBD"] <= 3)
+        & (d["HBA"] <= 3)
+        & (d["RotatableBonds"] <= 3),
+    ),
+}
+
+# Score range filters and the descriptor column they are evaluated on
+SCORE_RANGES = {
+    "qedscore": "QED",
+    "sascore": "SAScore",
+    "nplikeness": "NPScore",
+}
+
+
+def parse_range(value: str) -> Optional[Tuple[float, float]]:
+    """Parse a score range given as "start-end".
+
+    Args:
+        value (str): The range, e.g. "0-10".
+
+    Returns:
+        Tuple[float, float]: The range bounds, or None if the value is not a range.
+    """
+    parts = value.split("-") if value else []
+    if len(parts) != 2:
+        return None
+    return float(parts[0]), float(parts[1])
+
+
+def get_descriptor_matrix(
+    molecules: List[Chem.Mol],
+    names: List[str],
+    functions: Optional[Dict[str, Callable[[Chem.Mol], float]]] = None,
+) -> np.ndarray:
+    """Compute a set of descriptors for a batch of molecules.
+
+    Args:
+        molecules (List[Chem.Mol]): RDKit molecule objects.
+        names (List[str]): Descriptor names.
+        functions (Dict[str, Callable], optional): Descriptor functions by name. Defaults to DESCRIPTOR_FUNCTIONS.
+
+    Returns:
+        np.ndarray: A (molecules x descriptors) float matrix.
+    """
+    functions = functions or DESCRIPTOR_FUNCTIONS
+    matrix = np.empty((len(molecules), len(names)), dtype=np.float64)
+    shared = [name for name in names if name in SHARED_SCORES]
+    if shared:
+        scores = score_molecules_np_sa(molecules)
+        for name in shared:
+            column = names.index(name)
+            matrix[:, column] = [score[SHARED_SCORES[name]] for score in scores]
+
+    columns = [
+        (column, functions[name])
+        for column, name in enumerate(names)
+        if name not in SHARED_SCORES
+    ]
+    for row, molecule in enumerate(molecules):
+        for column, function in columns:
+            matrix[row, column] = function(molecule)
+    return matrix
+
+
+def filter_molecules(
+    molecules: List[Chem.Mol],
+    rules: List[str],
+    ranges: Optional[Dict[str, str]] = None,
+) -> Dict[str, np.ndarray]:
+    """Evaluate rule sets and score ranges over a batch of molecules.
+
+    The union of the descriptors needed by the selected filters is computed
+    once per molecule into a matrix, every filter is then evaluated as a
+    vectorized predicate over the whole batch.
+
+    Args:
+        molecules (List[Chem.Mol]): RDKit molecule objects.
+        rules (List[str]): Rule sets to apply, keys of RULES.
+        ranges (Dict[str, str], optional): Score ranges ("start-end") keyed by qedscore, sascore or nplikeness.
+
+    Returns:
+        Dict[str, np.ndarray]: One boolean column per applied filter, in the order rules then ranges.
+    """
+    parsed_ranges = {}
+    for name, value in (ranges or {}).items():
+        bounds = parse_range(value)
+        if bounds is not None:
+            parsed_ranges[name] = bounds
+
+    names = []
+    for rule in rules:
+        names.extend(RULES[rule][0])
+    names.extend(SCORE_RANGES[name] for name in parsed_ranges)
+    names = list(dict.fromkeys(names))
+
+    matrix = get_descriptor_matrix(molecules, names)
+    columns = {name: matrix[:, index] for index, name in enumerate(names)}
+
+    results = {rule: RULES[rule][1](columns) for rule in rules}
+    for name, (start, end) in parsed_ranges.items():
+        values = columns[SCORE_RANGES[name]]
+        results[name] = (values >= start) & (values <= end)
+    return results
+
+
+def _parse_bound(name: str, key: str, value: Any, default: float) -> float:
+    """Return a descriptor window bound as a float, or the default if it is unset."""
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Descriptor {name} needs a number as '{key}': {value!r}")
+    return float(value)
+
+
+class FilterPlan:
+    """A declarative filter specification compiled into an evaluation plan.
+
+    A specification is a nested dict made of the following nodes:
+
+    - ``{"descriptor": "MolWt", "min": 200, "max": 500}``: a descriptor window,
+      either bound may be omitted. Descriptor names are the keys of
+      DESCRIPTOR_FUNCTIONS.
+    - ``{"smarts": "[N+](=O)[O-]"}``: true if the SMARTS pattern matches.
+    - ``{"rule": "lipinski"}``: one of the built-in rule sets in RULES.
+    - ``{"all": [...]}``, ``{"any": [...]}`` and ``{"not": {...}}``: boolean
+      combinations of other nodes.
+
+    Compiling collects the descriptors and SMARTS patterns the specification
+    references, so evaluating it computes only those, once per molecule, and
+    applies the predicates vectorized across the batch.
+
+    Args:
+        spec (dict): The filter specification.
+
+    Raises:
+        ValueError: If the specification is invalid.
+    """
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.functions: Dict[str, Callable[[Chem.Mol], float]] = {}
+        self._predicate = self._compile(spec)
+
+    def _compile(self, node: dict) -> Callable[[Columns], np.ndarray]:
+        if not isinstance(node, dict):
+            raise ValueError(f"Invalid filter node: {node!r}")
+
+        if "all" in node or "any" in node:
+            operator = "all" if "all" in node else "any"
+            children = node[operator]
+            if not isinstance(children, list) or not children:
+                raise ValueError(f"'{operator}' needs a non-empty list of filters")
+            parts = [self._compile(child) for child in children]
+            combine = np.logical_and if operator == "all" else np.logical_or
+            return lambda d: combine.reduce([part(d) for part in parts])
+
+        if "not" in node:
+            part = self._compile(node["not"])
+            return lambda d: ~part(d)
+
+        if "descriptor" in node:
+            name = node["descriptor"]
+            if not isinstance(name, str) or name not in DESCRIPTOR_FUNCTIONS:
+                raise ValueError(f"Unknown descriptor: {name!r}")
+            low, high = node.get("min"), node.get("max")
+            if low is None and high is None:
+                raise ValueError(f"Descriptor {name} needs a 'min' and/or 'max'")
+            self.functions[name] = DESCRIPTOR_FUNCTIONS[name]
+            low = _parse_bound(name, "min", low, -np.inf)
+            high = _parse_bound(name, "max", high, np.inf)
+            return lambda d: (d[name] >= low) & (d[name] <= high)
+
+        if "smarts" in node:
+            if not isinstance(node["smarts"], str):
+                raise ValueError(f"Invalid SMARTS: {node['smarts']!r}")
+            query = Chem.MolFromSmarts(node["smarts"])
+            if query is None:
+                raise ValueError(f"Invalid SMARTS: {node['smarts']}")
+            key = "smarts:" + node["smarts"]
+            self.functions[key] = lambda mol: mol.HasSubstructMatch(query)
+            return lambda d: d[key] > 0
+
+        if "rule" in node:
+            rule = node["rule"]
+            if not isinstance(rule, str) or rule not in RULES:
+                raise ValueError(f"Unknown rule set: {rule!r}")
+            names, predicate = RULES[rule]
+            for name in names:
+                self.functions[name] = DESCRIPTOR_FUNCTIONS[name]
+            return predicate
+
+        raise ValueError(f"Invalid filter node: {node!r}")
+
+    @property
+    def descriptors(self) -> List[str]:
+        """Names of the descriptors and SMARTS columns the plan computes."""
+        return list(self.functions)
+
+    def evaluate(self, molecules: List[Chem.Mol]) -> np.ndarray:
+        """Evaluate the filter over a batch of molecules.
+
+        Args:
+            molecules (List[Chem.Mol]): RDKit molecule objects.
+
+        Returns:
+            np.ndarray: A boolean array, True for molecules passing the filter.
+        """
+        names = self.descriptors
+        matrix = get_descriptor_matrix(molecules, names, self.functions)
+        columns = {name: matrix[:, index] for index, name in enumerate(names)}
+        return np.broadcast_to(self._predicate(columns), (len(molecules),))
+
+
+_registered_filters: Dict[str, FilterPlan] = {}
+
+
+def register_filter(name: str, spec: dict) -> FilterPlan:
+    """Compile a filter specification and register it under a name.
+
+    Args:
+        name (str): The name the filter is requested by.
+        spec (dict): The filter specification.
+
+    Returns:
+        FilterPlan: The compiled plan.
+    """
+    plan = FilterPlan(spec)
+    _registered_filters[name] = plan
+    return plan
+
+
+def get_filter_plan(filter: Union[str, dict]) -> FilterPlan:
+    """Return the plan for a filter name, rule set or specification.
+
+    Args:
+        filter (Union[str, dict]): Filter name or specification.
+
+    Returns:
+        FilterPlan: The compiled plan.
+
+    Raises:
+        ValueError: If the name is unknown or the specification is invalid.
+    """
+    if isinstance(filter, str):
+        if filter in _registered_filters:
+            return _registered_filters[filter]
+        if filter in RULES:
+            return register_filter(filter, {"rule": filter})
+        raise ValueError(f"Unknown filter: {filter}")
+    return FilterPlan(filter)
+
+
+def get_filter_names() -> List[str]:
+    """Return the names of the built-in and registered filters."""
+    return sorted(set(RULES) | set(_registered_filters))
+
+
+def load_filter_definitions(path: str) -> None:
+    """Register the filters defined in a JSON file.
+
+    The file maps filter names to specifications.
+
+    Args:
+        path (str): Path to the JSON file.
+    """
+    with open(path) as file:
+        for name, spec in json.load(file).items():
+            register_filter(name, spec)
+
+
+if os.getenv("FILTER_DEFINITIONS"):
+    load_filter_definitions(os.getenv("FILTER_DEFINITIONS"))
@@ -4,9 +4,19 @@ import gzip
 import math
 import os
 import pickle
+import threading
+import time
+from itertools import chain
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
 
+import numpy as np
 import pystow
-from rdkit.Chem import rdMolDescriptors
+from prometheus_client import Gauge
+from rdkit import Chem
+from rdkit.Chem import rdFingerprintGenerator
 
 # Set path
 default_path = pystow.join("NP_model")
@@ -15,11 +25,21 @@ default_path = pystow.join("NP_model")
 model_url = "https://github.com/rdkit/rdkit/blob/master/Contrib/NP_Score/publicnp.model.gz?raw=true"
 model_path = str(default_path) + "/publicnp.model.gz"
 
-# Download models to a default location if not already present
-if not os.path.exists(model_path):
-    pystow.ensure("NP_model", url=model_url)
+# Compact model: sorted fingerprint keys and their scores, memory-mapped so
+# that all workers share the same pages. NP_MODEL_DIR may point to a
+# directory with pre-converted files, e.g. baked into the image.
+NP_MODEL_DIR = os.getenv("NP_MODEL_DIR", str(default_path))
+keys_path = os.path.join(NP_MODEL_DIR, "publicnp.keys.npy")
+values_path = os.path.join(NP_MODEL_DIR, "publicnp.values.npy")
 
-fscore = pickle.load(gzip.open(model_path))
+MODEL_LOAD_SECONDS = Gauge(
+    "cms_model_load_seconds",
+    "Time spent loading a model on first use.",
+    ["model"],
+)
+
+_np_model: Optional[Tuple[np.ndarray, np.ndarray]] = None
+_np_model_lock = threading.Lock()
 
 
 def get_np_model(model_path) -> dict:
@@ -35,53 +55,190 @@ def get_np_model(model_path) -> dict:
     return fscore
 
 
-def score_mol_with_confidence(molecule) -> dict:
-    """Calculate NP-likeness score and confidence for a molecule.
+def download_np_model() -> str:
+    """Download the pickled NP model to the default location if it is missing.
+
+    Returns:
+        str: Path to the gzipped, pickled model file.
+    """
+    if not os.path.exists(model_path):
+        pystow.ensure("NP_model", url=model_url)
+    return model_path
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    # Write to a temporary file first, workers may convert concurrently
+    temporary = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(temporary, array)
+    os.replace(temporary, path)
+
+
+def convert_np_model(source: Optional[str] = None) -> None:
+    """Convert the pickled NP model into the compact memory-mappable format.
+
+    The model is stored as a sorted int64 array of Morgan fingerprint keys
+    and a float32 array of their scores.
+
+    Parameters:
+        source (str, optional): Path to the gzipped, pickled model file. Defaults to the downloaded model.
+    """
+    with gzip.open(source or download_np_model()) as file:
+        model = pickle.load(file)
+    keys = np.fromiter(model.keys(), dtype=np.int64, count=len(model))
+    values = np.fromiter(model.values(), dtype=np.float32, count=len(model))
+    order = np.argsort(keys)
+    os.makedirs(NP_MODEL_DIR, exist_ok=True)
+    _save_array(values_path, values[order])
+    _save_array(keys_path, keys[order])
+
+
+def load_np_model() -> Tuple[np.ndarray, np.ndarray]:
+    """Memory-map the compact NP model, converting it if it does not exist.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The sorted fingerprint keys and their scores.
+    """
+    if not (os.path.exists(keys_path) and os.path.exists(values_path)):
+        convert_np_model()
+    return np.load(keys_path, mmap_mode="r"), np.load(values_path, mmap_mode="r")
+
+
+def get_np_model_arrays() -> Tuple[np.ndarray, np.ndarray]:
+    """Return the compact NP model, loading it on first use.
+
+    Loading is thread safe and happens once per process, its duration is
+    exported as the cms_model_load_seconds metric.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The sorted fingerprint keys and their scores.
+    """
+    global _np_model
+    if _np_model is None:
+        with _np_model_lock:
+            if _np_model is None:
+                start = time.perf_counter()
+                _np_model = load_np_model()
+                MODEL_LOAD_SECONDS.labels("np_likeness").set(
+                    time.perf_counter() - start,
+                )
+    return _np_model
+
+
+morgan_generator = rdFingerprintGenerator.GetMorganGenerator(radius=2)
+
+
+def get_morgan_environments(molecule: Chem.Mol) -> Dict[int, int]:
+    """Return the radius 2 Morgan environments of a molecule with their counts.
+
+    These are the features of both the NP-likeness and the synthetic
+    accessibility model, so they can be computed once and shared.
 
     Args:
         molecule (rdkit.Chem.rdchem.Mol): The input molecule.
 
     Returns:
-        dict: A dictionary containing NP-likeness score and confidence.
+        Dict[int, int]: Environment ids and their counts.
+    """
+    return morgan_generator.GetSparseCountFingerprint(molecule).GetNonzeroElements()
+
+
+def score_environments_with_confidence(
+    molecules: List[Chem.Mol],
+    environments: List[Dict[int, int]],
+) -> List[Optional[dict]]:
+    """Calculate NP-likeness scores and confidences from Morgan environments.
+
+    The environments of all molecules are looked up in the model with a
+    single binary search.
+
+    Args:
+        molecules (List[rdkit.Chem.rdchem.Mol]): The input molecules.
+        environments (List[Dict[int, int]]): The Morgan environments of each molecule.
+
+    Returns:
+        List[Optional[dict]]: For each molecule, a dictionary containing NP-likeness score and
+        confidence, None for a molecule without atoms.
             - 'nplikeness' (float): The NP-likeness score.
             - 'confidence' (float): The confidence in the score.
     """
-    if molecule is None:
+    counts = np.fromiter(map(len, environments), dtype=np.int64, count=len(molecules))
+    keys = np.fromiter(
+        chain.from_iterable(environments),
+        dtype=np.int64,
+        count=counts.sum(),
+    )
+    owners = np.repeat(np.arange(len(molecules)), counts)
+
+    np_keys, np_values = get_np_model_arrays()
+    index = np.minimum(np.searchsorted(np_keys, keys), len(np_keys) - 1)
+    found = np_keys[index] == keys
+    contributions = np.where(found, np_values[index], 0.0).astype(np.float64)
+    scores = np.bincount(owners, weights=contributions, minlength=len(molecules))
+    bits_found = np.bincount(owners, weights=found, minlength=len(molecules))
+
+    results = []
+    for molecule, score, hits, total in zip(molecules, scores, bits_found, counts):
+        n_atoms = molecule.GetNumAtoms()
+        if not n_atoms:
+            results.append(None)
+            continue
+        score = float(score) / float(n_atoms)
+        confidence = float(hits / total)
+
+        # Preventing score explosion for exotic molecules
+        if score > 4:
+            score = 4.0 + math.log10(score - 4.0 + 1.0)
+        elif score < -4:
+            score = -4.0 - math.log10(-4.0 - score + 1.0)
+        results.append({"nplikeness": score, "confidence": confidence})
+    return results
+
+
+def score_mols_with_confidence(molecules: List[Chem.Mol]) -> List[Optional[dict]]:
+    """Calculate NP-likeness scores and confidences for a batch of molecules.
+
+    Args:
+        molecules (List[rdkit.Chem.rdchem.Mol]): The input molecules.
+
+    Returns:
+        List[Optional[dict]]: For each molecule, a dictionary containing NP-likeness score and
+        confidence, None for a molecule without atoms.
+            - 'nplikeness' (float): The NP-likeness score.
+            - 'confidence' (float): The confidence in the score.
+    """
+    if any(molecule is None for molecule in molecules):
         raise ValueError("Invalid molecule")
-    fp = rdMolDescriptors.GetMorganFingerprint(molecule, 2)
-    bits = fp.GetNonzeroElements()
-
-    # Calculating the score
-    score = 0.0
-    bits_found = 0
-    for bit in bits:
-        if bit in fscore:
-            bits_found += 1
-            score += fscore[bit]
-
-    score /= float(molecule.GetNumAtoms())
-    confidence = float(bits_found / len(bits))
-
-    # Preventing score explosion for exotic molecules
-    if score > 4:
-        score = 4.0 + math.log10(score - 4.0 + 1.0)
-    elif score < -4:
-        score = -4.0 - math.log10(-4.0 - score + 1.0)
-    result = {"nplikeness": score, "confidence": confidence}
-    return result
-
-
-def score_mol(molecule) -> float:
+    environments = [get_morgan_environments(molecule) for molecule in molecules]
+    return score_environments_with_confidence(molecules, environments)
+
+
+def score_mol_with_confidence(molecule) -> Optional[dict]:
+    """Calculate NP-likeness score and confidence for a molecule.
+
+    Args:
+        molecule (rdkit.Chem.rdchem.Mol): The input molecule.
+
+    Returns:
+        dict: A dictionary containing NP-likeness score and confidence, None for a molecule without atoms.
+            - 'nplikeness' (float): The NP-likeness score.
+            - 'confidence' (float): The confidence in the score.
+    """
+    return score_mols_with_confidence([molecule])[0]
+
+
+def score_mol(molecule) -> Optional[float]:
     """Calculate the Natural Product Likeness score for a given molecule.
 
     Parameters:
         molecule (rdkit.Chem.Mol): RDKit molecule object.
 
     Returns:
-        float: NP-Likeness score in the range -5 to 5.
+        float: NP-Likeness score in the range -5 to 5, None for a molecule without atoms.
     """
-    score = score_mol_with_confidence(molecule)["nplikeness"]
-    return score
+    result = score_mol_with_confidence(molecule)
+    if result is None:
+        return None
+    return result["nplikeness"]
 
 
 def get_np_score(molecule: any) -> str:
@@ -95,8 +252,9 @@ def get_np_score(molecule: any) -> str:
     Returns:
         str: NP Score as a formatted string or "invalid" if conversion fails.
     """
-    if molecule:
-        npscore = "%.2f" % score_mol(molecule)
+    score = score_mol(molecule) if molecule else None
+    if score is not None:
+        npscore = "%.2f" % score
     else:
         npscore = "invalid"
 
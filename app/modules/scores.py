@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from itertools import chain
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+from rdkit import Chem
+from rdkit.Chem import QED
+from rdkit.Contrib.SA_Score import sascorer
+
+from app.exception_handlers import InvalidInputException
+from app.modules.batch import map_chunks
+from app.modules.npscorer import get_morgan_environments
+from app.modules.npscorer import score_environments_with_confidence
+from app.modules.toolkits.helpers import parse_input
+
+
+@lru_cache(maxsize=None)
+def get_sa_fragment_model() -> Tuple[np.ndarray, np.ndarray]:
+    """Return the SA score fragment contributions as sorted lookup arrays.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The sorted Morgan environment ids and their contributions.
+    """
+    if sascorer._fscores is None:
+        sascorer.readFragmentScores()
+    fscores = sascorer._fscores
+    keys = np.fromiter(fscores.keys(), dtype=np.int64, count=len(fscores))
+    values = np.fromiter(fscores.values(), dtype=np.float64, count=len(fscores))
+    order = np.argsort(keys)
+    return keys[order], values[order]
+
+
+def get_sa_scores(
+    molecules: List[Chem.Mol],
+    environments: List[Dict[int, int]],
+) -> List[Optional[float]]:
+    """Calculate Synthetic Accessibility Scores from Morgan environments.
+
+    Same score as sascorer.calculateScore, with the fragment contributions
+    of all molecules looked up at once.
+
+    Args:
+        molecules (List[Chem.Mol]): RDKit molecule objects.
+        environments (List[Dict[int, int]]): The Morgan environments of each molecule.
+
+    Returns:
+        List[Optional[float]]: The SA score of each molecule, None for a molecule without atoms.
+    """
+    fragment_keys, fragment_values = get_sa_fragment_model()
+    lengths = np.fromiter(map(len, environments), dtype=np.int64, count=len(molecules))
+    keys = np.fromiter(
+        chain.from_iterable(environments),
+        dtype=np.int64,
+        count=lengths.sum(),
+    )
+    counts = np.fromiter(
+        chain.from_iterable(environment.values() for environment in environments),
+        dtype=np.float64,
+        count=lengths.sum(),
+    )
+    owners = np.repeat(np.arange(len(molecules)), lengths)
+
+    index = np.minimum(
+        np.searchsorted(fragment_keys, keys),
+        len(fragment_keys) - 1,
+    )
+    contributions = np.where(fragment_keys[index] == keys, fragment_values[index], -4)
+    fragment_scores = np.bincount(
+        owners,
+        weights=contributions * counts,
+        minlength=len(molecules),
+    )
+    fragment_counts = np.bincount(owners, weights=counts, minlength=len(molecules))
+
+    scores = []
+    for molecule, score1, nf, bits in zip(
+        molecules,
+        fragment_scores,
+        fragment_counts,
+        lengths,
+    ):
+        n_atoms = molecule.GetNumAtoms()
+        if not n_atoms:
+            scores.append(None)
+            continue
+        score1 = float(score1) / float(nf)
+
+        # features score
+        n_chiral_centers = len(
+            Chem.FindMolChiralCenters(molecule, includeUnassigned=True),
+        )
+        ring_info = molecule.GetRingInfo()
+        n_bridgeheads, n_spiro = sascorer.numBridgeheadsAndSpiro(molecule, ring_info)
+        n_macrocycles = sum(1 for ring in ring_info.AtomRings() if len(ring) > 8)
+        score2 = (
+            0.0
+            - (n_atoms**1.005 - n_atoms)
+            - math.log10(n_chiral_centers + 1)
+            - math.log10(n_spiro + 1)
+            - math.log10(n_bridgeheads + 1)
+            - (math.log10(2) if n_macrocycles > 0 else 0.0)
+        )
+
+        # correction for the fingerprint density
+        score3 = math.log(float(n_atoms) / bits) * 0.5 if n_atoms > bits else 0.0
+
+        # transform the raw value into the range 1 to 10
+        sascore = 11.0 - (score1 + score2 + score3 + 4.0 + 1) / 6.5 * 9.0
+        if sascore > 8.0:
+            sascore = 8.0 + math.log(sascore + 1.0 - 9.0)
+        scores.append(min(10.0, max(1.0, sascore)))
+    return scores
+
+
+def score_molecules_np_sa(molecules: List[Chem.Mol]) -> List[dict]:
+    """Calculate NP-likeness and SA score for a batch of molecules.
+
+    The radius 2 Morgan environments used by the NP-likeness and the SA
+    model are computed once per molecule and shared by both.
+
+    Args:
+        molecules (List[Chem.Mol]): RDKit molecule objects.
+
+    Returns:
+        List[dict]: For each molecule, the NP-likeness score with its confidence and the SA
+        score, rounded to two decimal places.
+    """
+    environments = [get_morgan_environments(molecule) for molecule in molecules]
+    np_scores = score_environments_with_confidence(molecules, environments)
+    sa_scores = get_sa_scores(molecules, environments)
+    return [
+        {
+            "nplikeness": (
+                round(np_score["nplikeness"], 2) if np_score is not None else None
+            ),
+            "confidence": (
+                round(np_score["confidence"], 2) if np_score is not None else None
+            ),
+            "sascore": round(sa_score, 2) if sa_score is not None else None,
+        }
+        for np_score, sa_score in zip(np_scores, sa_scores)
+    ]
+
+
+def score_molecules(molecules: List[Chem.Mol]) -> List[dict]:
+    """Calculate NP-likeness, SA score and QED for a batch of molecules.
+
+    Args:
+        molecules (List[Chem.Mol]): RDKit molecule objects.
+
+    Returns:
+        List[dict]: For each molecule, the NP-likeness score with its confidence, the SA score
+        and the QED, rounded to two decimal places.
+    """
+    scores = score_molecules_np_sa(molecules)
+    for molecule, score in zip(molecules, scores):
+        score["qed"] = round(QED.qed(molecule), 2)
+    return scores
+
+
+def parse_SMILES_or_none(smiles: str) -> Optional[Chem.Mol]:
+    """Parse an input string of a batch, returning None if it is invalid.
+
+    Args:
+        smiles (str): The SMILES string or any other input accepted by parse_input.
+
+    Returns:
+        Chem.Mol: The RDKit molecule, or None if the input is invalid.
+    """
+    try:
+        return parse_input(smiles, "rdkit", False)
+    except InvalidInputException:
+        return None
+
+
+def score_SMILES(smiles_list: List[str]) -> List[Optional[dict]]:
+    """Calculate the scores of a list of molecules given as SMILES.
+
+    Used for batches, which may run in a worker process.
+
+    Args:
+        smiles_list (List[str]): The SMILES strings.
+
+    Returns:
+        List[Optional[dict]]: The scores of each molecule, None for an invalid SMILES string.
+    """
+    molecules = [parse_SMILES_or_none(smiles) for smiles in smiles_list]
+    valid = [molecule for molecule in molecules if molecule is not None]
+    scores = iter(score_molecules(valid))
+    return [next(scores) if molecule is not None else None for molecule in molecules]
+
+
+def get_scores(smiles_list: List[str]) -> List[Optional[dict]]:
+    """Calculate the scores of a list of SMILES strings.
+
+    Large lists are split into chunks that are scored on the batch process
+    pool.
+
+    Args:
+        smiles_list (List[str]): The SMILES strings.
+
+    Returns:
+        List[Optional[dict]]: The scores of each molecule, None for an invalid SMILES string.
+    """
+    return map_chunks(score_SMILES, smiles_list)
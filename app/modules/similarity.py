@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import os
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from mapchiral.mapchiral import encode
+from rdkit import DataStructs
+from rdkit.Chem import MACCSkeys
+from rdkit.Chem import rdFingerprintGenerator
+
+from app.modules.batch import BATCH_PARALLEL_THRESHOLD
+from app.modules.batch import BATCH_WORKERS
+from app.modules.batch import get_process_pool
+from app.modules.toolkits.cdk_wrapper import get_CDK_fingerprint
+from app.modules.toolkits.helpers import parse_input
+
+SIMILARITY_TILE_CELLS = int(os.getenv("SIMILARITY_TILE_CELLS", str(1 << 20)))
+# Upper bound on the cells of the temporary used to compare MAPC fingerprints
+MAPC_CHUNK_CELLS = 1 << 24
+
+RDKIT_FINGERPRINTERS = ("ECFP", "RDKit", "Atompairs", "MACCS", "MAPC")
+CDK_FINGERPRINTERS = ("PubChem", "ECFP")
+
+
+@lru_cache(maxsize=None)
+def get_rdkit_fingerprint_generator(fingerprinter: str, nBits: int, radius: int):
+    """Return a shared RDKit fingerprint generator.
+
+    Args:
+        fingerprinter (str): "ECFP", "RDKit" or "Atompairs".
+        nBits (int): The fingerprint size.
+        radius (int): The ECFP diameter, halved to get the Morgan radius.
+
+    Returns:
+        FingerprintGenerator64: The fingerprint generator.
+    """
+    if fingerprinter == "ECFP":
+        return rdFingerprintGenerator.GetMorganGenerator(
+            radius=int(radius / 2),
+            fpSize=nBits,
+            includeChirality=True,
+        )
+    if fingerprinter == "RDKit":
+        return rdFingerprintGenerator.GetRDKitFPGenerator(fpSize=nBits)
+    return rdFingerprintGenerator.GetAtomPairGenerator(fpSize=nBits)
+
+
+def _get_rdkit_bits(molecule, fingerprinter: str, nBits: int, radius: int):
+    if fingerprinter == "MACCS":
+        bits = np.zeros(0, dtype=np.uint8)
+        DataStructs.ConvertToNumpyArray(MACCSkeys.GenMACCSKeys(molecule), bits)
+        return bits
+    generator = get_rdkit_fingerprint_generator(fingerprinter, nBits, radius)
+    return generator.GetFingerprintAsNumPy(molecule)
+
+
+def _get_CDK_bits(molecule, fingerprinter: str, nBits: int, radius: int):
+    fingerprint = get_CDK_fingerprint(molecule, fingerprinter, radius, nBits)
+    return np.unpackbits(np.frombuffer(fingerprint, dtype=np.uint8), bitorder="little")
+
+
+def get_fingerprint_matrix(
+    smiles_list: List[str],
+    toolkit: str = "rdkit",
+    fingerprinter: str = "ECFP",
+    nBits: int = 2048,
+    radius: int = 2,
+) -> np.ndarray:
+    """Parse and fingerprint each molecule of a list exactly once.
+
+    Args:
+        smiles_list (List[str]): The SMILES strings.
+        toolkit (str, optional): "rdkit" or "cdk". Defaults to "rdkit".
+        fingerprinter (str, optional): The fingerprint type, "ECFP", "RDKit", "Atompairs", "MACCS" or "MAPC" for RDKit, "PubChem" or "ECFP" for CDK. Defaults to "ECFP".
+        nBits (int, optional): The fingerprint size, or number of permutations for MAPC. Ignored for MACCS and PubChem. Defaults to 2048.
+        radius (int, optional): The ECFP diameter (2, 4 or 6 for CDK), or the maximum radius for MAPC. Defaults to 2.
+
+    Returns:
+        np.ndarray: One row per molecule, 0/1 bits as uint8 or the MinHash values for MAPC.
+
+    Raises:
+        ValueError: If the toolkit or fingerprinter is not supported.
+    """
+    if toolkit == "rdkit" and fingerprinter in RDKIT_FINGERPRINTERS:
+        molecules = [parse_input(smiles, "rdkit", False) for smiles in smiles_list]
+        if fingerprinter == "MAPC":
+            return np.stack(
+                [
+                    encode(
+                        molecule,
+                        max_radius=radius,
+                        n_permutations=nBits,
+                        mapping=False,
+                    )
+                    for molecule in molecules
+                ],
+            )
+        rows = [
+            _get_rdkit_bits(molecule, fingerprinter, nBits, radius)
+            for molecule in molecules
+        ]
+    elif toolkit == "cdk" and fingerprinter in CDK_FINGERPRINTERS:
+        if fingerprinter == "ECFP" and radius not in (2, 4, 6):
+            raise ValueError("only ECFP 2/4/6 allowed")
+        rows = [
+            _get_CDK_bits(
+                parse_input(smiles, "cdk", False), fingerprinter, nBits, radius
+            )
+            for smiles in smiles_list
+        ]
+    else:
+        raise ValueError(
+            f"Unsupported toolkit or fingerprinter: {toolkit}, {fingerprinter}"
+        )
+
+    # CDK BitSets are only as long as their highest set bit
+    matrix = np.zeros(
+        (len(rows), max((len(row) for row in rows), default=0)), dtype=np.uint8
+    )
+    for index, row in enumerate(rows):
+        matrix[index, : len(row)] = row
+    return matrix
+
+
+def get_similarity_block(
+    fingerprints_a: np.ndarray,
+    fingerprints_b: np.ndarray,
+    fingerprinter: str = "ECFP",
+) -> np.ndarray:
+    """Calculate the similarities between two sets of fingerprints.
+
+    Tanimoto coefficients of bit fingerprints are computed with a matrix
+    product of the bit rows, MAPC fingerprints are compared by the fraction
+    of equal MinHash values.
+
+    Args:
+        fingerprints_a (np.ndarray): Fingerprint rows from get_fingerprint_matrix.
+        fingerprints_b (np.ndarray): Fingerprint rows from get_fingerprint_matrix.
+        fingerprinter (str, optional): The fingerprint type. Defaults to "ECFP".
+
+    Returns:
+        np.ndarray: The (a x b) similarity matrix, 0.0 for two empty fingerprints.
+    """
+    if fingerprinter == "MAPC":
+        # compare a slice of the permutations at a time to bound the
+        # (a x b x permutations) temporary
+        n_permutations = fingerprints_a.shape[1]
+        step = max(
+            1,
+            MAPC_CHUNK_CELLS // max(1, len(fingerprints_a) * len(fingerprints_b)),
+        )
+        equal = np.zeros((len(fingerprints_a), len(fingerprints_b)), dtype=np.int64)
+        for start in range(0, n_permutations, step):
+            stop = start + step
+            equal += np.count_nonzero(
+                fingerprints_a[:, None, start:stop]
+                == fingerprints_b[None, :, start:stop],
+                axis=2,
+            )
+        return equal / n_permutations
+
+    bits_a = np.asarray(fingerprints_a, dtype=np.float32)
+    bits_b = np.asarray(fingerprints_b, dtype=np.float32)
+    intersection = (bits_a @ bits_b.T).astype(np.float64)
+    union = bits_a.sum(axis=1)[:, None] + bits_b.sum(axis=1)[None, :] - intersection
+    return np.divide(
+        intersection,
+        union,
+        out=np.zeros_like(intersection),
+        where=union > 0,
+    )
+
+
+def get_similarity_tile(
+    fingerprints: np.ndarray,
+    fingerprinter: str,
+    start: int,
+    stop: int,
+    threshold: Optional[float] = None,
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Calculate the rows ``start:stop`` of a similarity matrix from the diagonal on.
+
+    Only the columns from ``start`` on are computed, the rest of the rows
+    follows by symmetry. The columns are compared a slice at a time, so only
+    about SIMILARITY_TILE_CELLS fingerprint bits are converted for the
+    matrix product at once.
+
+    Args:
+        fingerprints (np.ndarray): Fingerprint rows from get_fingerprint_matrix.
+        fingerprinter (str): The fingerprint type.
+        start (int): The first row.
+        stop (int): The row after the last row.
+        threshold (float, optional): Only return the pairs with at least this similarity. Defaults to None.
+
+    Returns:
+        Union[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray]]: The columns ``start:`` of the
+        rows, or with a threshold the row indices, column indices and similarities of the pairs above
+        the diagonal.
+    """
+    n = len(fingerprints)
+    rows = fingerprints[start:stop]
+    if fingerprinter != "MAPC":
+        rows = rows.astype(np.float32)
+    step = max(1, SIMILARITY_TILE_CELLS // max(1, fingerprints.shape[1]))
+    block = np.empty((stop - start, n - start), dtype=np.float64)
+    for column in range(start, n, step):
+        end = min(column + step, n)
+        first, last = column - start, end - start
+        block[:, first:last] = get_similarity_block(
+            rows,
+            fingerprints[column:end],
+            fingerprinter,
+        )
+    if threshold is None:
+        return block
+    rows, columns = np.nonzero(np.triu(block >= threshold, k=1))
+    return rows + start, columns + start, block[rows, columns]
+
+
+def _get_shared_similarity_tile(
+    name: str,
+    shape: Tuple[int, ...],
+    dtype: str,
+    fingerprinter: str,
+    start: int,
+    stop: int,
+    threshold: Optional[float],
+):
+    shm = SharedMemory(name=name)
+    try:
+        return get_similarity_tile(
+            np.ndarray(shape, dtype=dtype, buffer=shm.buf),
+            fingerprinter,
+            start,
+            stop,
+            threshold,
+        )
+    finally:
+        shm.close()
+
+
+def iter_similarity_tiles(
+    fingerprints: np.ndarray,
+    fingerprinter: str = "ECFP",
+    threshold: Optional[float] = None,
+    tile_size: Optional[int] = None,
+) -> Iterator[Union[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+    """Calculate a similarity matrix tile by tile, in parallel for large inputs.
+
+    The matrix is split into tiles of consecutive rows, see
+    get_similarity_tile. With BATCH_PARALLEL_THRESHOLD or more molecules the
+    fingerprints are copied once into shared memory, in their compact
+    get_fingerprint_matrix form, and the tiles are computed on the batch
+    process pool, with at most two tiles per worker in flight, so memory use
+    stays bounded however slowly the tiles are consumed.
+
+    Args:
+        fingerprints (np.ndarray): Fingerprint rows from get_fingerprint_matrix.
+        fingerprinter (str, optional): The fingerprint type. Defaults to "ECFP".
+        threshold (float, optional): Only return the pairs with at least this similarity. Defaults to None.
+        tile_size (int, optional): Rows per tile. Defaults to about SIMILARITY_TILE_CELLS cells per tile.
+
+    Returns:
+        Iterator: The tiles, in row order.
+    """
+    n = len(fingerprints)
+    tile_size = tile_size or max(1, SIMILARITY_TILE_CELLS // max(n, 1))
+    tiles = ((start, min(start + tile_size, n)) for start in range(0, n, tile_size))
+    if n < BATCH_PARALLEL_THRESHOLD or BATCH_WORKERS <= 1:
+        for start, stop in tiles:
+            yield get_similarity_tile(
+                fingerprints, fingerprinter, start, stop, threshold
+            )
+        return
+
+    shm = SharedMemory(create=True, size=max(fingerprints.nbytes, 1))
+    pending = deque()
+    try:
+        shared = np.ndarray(
+            fingerprints.shape, dtype=fingerprints.dtype, buffer=shm.buf
+        )
+        shared[:] = fingerprints
+        del shared
+
+        pool = get_process_pool()
+        arguments = (
+            shm.name,
+            fingerprints.shape,
+            fingerprints.dtype.str,
+            fingerprinter,
+        )
+
+        def submit(count: int) -> None:
+            for start, stop in islice(tiles, count):
+                pending.append(
+                    pool.submit(
+                        _get_shared_similarity_tile,
+                        *arguments,
+                        start,
+                        stop,
+                        threshold,
+                    ),
+                )
+
+        submit(BATCH_WORKERS * 2)
+        while pending:
+            tile = pending.popleft().result()
+            submit(1)
+            yield tile
+    finally:
+        for future in pending:
+            future.cancel()
+        shm.close()
+        shm.unlink()
+
+
+def iter_similarity_rows(
+    fingerprints: np.ndarray,
+    fingerprinter: str = "ECFP",
+    tile_size: Optional[int] = None,
+) -> Iterator[np.ndarray]:
+    """Generate the rows of the similarity matrix of a set of fingerprints.
+
+    Each tile only computes the columns from its first row on, see
+    iter_similarity_tiles. The columns before it are mirrored from the
+    tiles above, so the part of those tiles right of the current row is kept
+    until it has been used, at most about a quarter of the matrix.
+
+    Args:
+        fingerprints (np.ndarray): Fingerprint rows from get_fingerprint_matrix.
+        fingerprinter (str, optional): The fingerprint type. Defaults to "ECFP".
+        tile_size (int, optional): Rows per tile. Defaults to about SIMILARITY_TILE_CELLS cells per tile.
+
+    Returns:
+        Iterator[np.ndarray]: The similarities of each molecule to all molecules.
+    """
+    # the not yet mirrored columns of the tiles above, all starting at the
+    # first row of the next tile
+    above: List[np.ndarray] = []
+    for tile in iter_similarity_tiles(fingerprints, fingerprinter, tile_size=tile_size):
+        size = len(tile)
+        if above:
+            left = np.concatenate([part[:, :size] for part in above]).T
+            yield from np.hstack([left, tile])
+        else:
+            yield from tile
+        above.append(tile)
+        above = [_drop_columns(part, size) for part in above if part.shape[1] > size]
+
+
+def _drop_columns(part: np.ndarray, count: int) -> np.ndarray:
+    # copy once most of the underlying tile is unused, so it can be freed
+    part = part[:, count:]
+    if part.base is not None and part.size * 2 < part.base.size:
+        part = part.copy()
+    return part
+
+
+def iter_similarity_edges(
+    fingerprints: np.ndarray,
+    fingerprinter: str = "ECFP",
+    threshold: float = 0.0,
+    tile_size: Optional[int] = None,
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Generate the pairs of molecules with at least a given similarity.
+
+    Only the upper triangle of the matrix is computed, see
+    iter_similarity_tiles.
+
+    Args:
+        fingerprints (np.ndarray): Fingerprint rows from get_fingerprint_matrix.
+        fingerprinter (str, optional): The fingerprint type. Defaults to "ECFP".
+        threshold (float, optional): The similarity cutoff, inclusive. Defaults to 0.0.
+        tile_size (int, optional): Rows per tile. Defaults to about SIMILARITY_TILE_CELLS cells per tile.
+
+    Returns:
+        Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]: For each tile, the first indices,
+        second indices (always greater than the first) and similarities of the pairs.
+    """
+    yield from iter_similarity_tiles(fingerprints, fingerprinter, threshold, tile_size)
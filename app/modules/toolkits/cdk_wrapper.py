@@ -1,6 +1,15 @@
 from __future__ import annotations
 
 import os
+import resource
+import shlex
+import struct
+import threading
+import time
+from functools import lru_cache
+from typing import Any
+from typing import Callable
+from typing import Hashable
 from typing import List
 from typing import Union
 
@@ -8,9 +17,61 @@ import pystow
 from jpype import getDefaultJVMPath
 from jpype import isJVMStarted
 from jpype import JClass
-from jpype import JPackage
 from jpype import JVMNotFoundException
 from jpype import startJVM
+from prometheus_client import Gauge
+
+from app.modules.cache import LRUCache
+
+JVM_HEAP = os.getenv("JVM_HEAP", "4096M")
+JVM_GC = os.getenv("JVM_GC", "")
+JVM_OPTS = os.getenv("JVM_OPTS", "")
+
+JVM_STARTUP_SECONDS = Gauge(
+    "cms_jvm_startup_seconds",
+    "Time taken to start the JVM and load the CDK, OPSIN and SRU jars.",
+)
+PROCESS_RSS_BYTES = Gauge(
+    "cms_process_rss_bytes",
+    "Resident memory of the process before and after the JVM was started.",
+    ["stage"],
+)
+
+_jvm_lock = threading.Lock()
+
+fingerprint_cache = LRUCache(
+    "cdk_fingerprint",
+    maxsize=int(os.getenv("FINGERPRINT_CACHE_SIZE", "4096")),
+)
+
+
+def get_rss_bytes() -> int:
+    """Return the current resident set size of the process in bytes.
+
+    Falls back to the peak resident set size where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def get_jvm_options() -> List[str]:
+    """Build the JVM start options from the environment.
+
+    JVM_HEAP sets the maximum heap size (default 4096M), JVM_GC selects a
+    garbage collector by name (e.g. G1, Parallel, Serial, Z) and JVM_OPTS
+    holds any further options.
+
+    Returns:
+        List[str]: Options passed to startJVM.
+    """
+    options = ["-ea", f"-Xmx{JVM_HEAP}"]
+    if JVM_GC:
+        options.append(f"-XX:+Use{JVM_GC}GC")
+    options.extend(shlex.split(JVM_OPTS))
+    return options
 
 
 def setup_jvm():
@@ -41,14 +102,129 @@ def setup_jvm():
             if not os.path.exists(jar_paths[key]):
                 pystow.ensure("STOUT-V2", url=url)
 
-        startJVM("-ea", "-Xmx4096M", classpath=[jar_paths[key] for key in jar_paths])
+        rss_before = get_rss_bytes()
+        start = time.perf_counter()
+        startJVM(*get_jvm_options(), classpath=[jar_paths[key] for key in jar_paths])
+        elapsed = time.perf_counter() - start
+        rss_after = get_rss_bytes()
+
+        JVM_STARTUP_SECONDS.set(elapsed)
+        PROCESS_RSS_BYTES.labels("before_jvm").set(rss_before)
+        PROCESS_RSS_BYTES.labels("after_jvm").set(rss_after)
+        print(
+            f"JVM started in {elapsed:.2f}s, resident memory "
+            f"{rss_before / 2**20:.0f} MiB -> {rss_after / 2**20:.0f} MiB"
+        )
+
+
+def ensure_jvm() -> None:
+    """Start the JVM on first use.
+
+    Called by get_JClass before a Java class is first resolved, so worker
+    processes that only serve RDKit or Open Babel requests never start it.
+    Concurrent first calls start it once.
+    """
+    if not isJVMStarted():
+        with _jvm_lock:
+            if not isJVMStarted():
+                setup_jvm()
 
 
-setup_jvm()
 cdk_base = "org.openscience.cdk"
-opsin_base = JPackage("uk").ac.cam.ch.wwmm.opsin
-_nametostruct = opsin_base.NameToStructure.getInstance()
-_restoinchi = opsin_base.NameToInchi.convertResultToInChI
+opsin_base = "uk.ac.cam.ch.wwmm.opsin"
+
+_engines = threading.local()
+
+
+@lru_cache(maxsize=None)
+def get_JClass(name: str):
+    """Resolve a Java class by its fully qualified name.
+
+    Classes are looked up once per process and reused afterwards, which
+    avoids the reflection overhead of calling JClass on every request.
+
+    Args:
+        name (str): Fully qualified Java class name.
+
+    Returns:
+        JClass: The resolved Java class.
+    """
+    ensure_jvm()
+    return JClass(name)
+
+
+def get_builder():
+    """Return the shared CDK SilentChemObjectBuilder instance."""
+    return get_JClass(cdk_base + ".silent.SilentChemObjectBuilder").getInstance()
+
+
+def get_engine(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """Return a thread-local instance of a reusable CDK engine object.
+
+    Engines such as SmilesParser or StructureDiagramGenerator are not
+    thread safe but can be reused for any number of molecules, so each
+    thread creates its own instance once with ``factory`` and keeps it.
+
+    Args:
+        key (Hashable): Name (and configuration) of the engine.
+        factory (Callable): Creates a new engine instance.
+
+    Returns:
+        Any: The engine instance of the current thread.
+    """
+    instances = getattr(_engines, "instances", None)
+    if instances is None:
+        instances = _engines.instances = {}
+    engine = instances.get(key)
+    if engine is None:
+        engine = instances[key] = factory()
+    return engine
+
+
+def get_descriptor(name: str):
+    """Return the thread-local instance of a CDK molecular descriptor.
+
+    Args:
+        name (str): Simple class name in org.openscience.cdk.qsar.descriptors.molecular.
+
+    Returns:
+        IMolecularDescriptor: The descriptor instance.
+    """
+    return get_engine(
+        name,
+        get_JClass(cdk_base + ".qsar.descriptors.molecular." + name),
+    )
+
+
+def get_smiles_parser():
+    """Return the thread-local CDK SmilesParser."""
+    return get_engine(
+        "SmilesParser",
+        lambda: get_JClass(cdk_base + ".smiles.SmilesParser")(get_builder()),
+    )
+
+
+def get_smiles_generator(flavor: int):
+    """Return the thread-local CDK SmilesGenerator for the given SmiFlavor.
+
+    Args:
+        flavor (int): SmiFlavor bit mask.
+    """
+    return get_engine(
+        ("SmilesGenerator", int(flavor)),
+        lambda: get_JClass(cdk_base + ".smiles.SmilesGenerator")(flavor),
+    )
+
+
+def get_SmiFlavor():
+    """Return the CDK SmiFlavor class."""
+    return get_JClass(cdk_base + ".smiles.SmiFlavor")
+
+
+@lru_cache(maxsize=None)
+def get_NameToStructure():
+    """Return the shared OPSIN NameToStructure instance."""
+    return get_JClass(opsin_base + ".NameToStructure").getInstance()
 
 
 def get_CDK_IAtomContainer(smiles: str):
@@ -60,14 +236,51 @@ def get_CDK_IAtomContainer(smiles: str):
     Returns:
         mol (object): IAtomContainer with CDK.
     """
-    SCOB = JClass(cdk_base + ".silent.SilentChemObjectBuilder")
-    SmilesParser = JClass(
-        cdk_base + ".smiles.SmilesParser",
-    )(SCOB.getInstance())
+    SmilesParser = get_smiles_parser()
     molecule = SmilesParser.parseSmiles(smiles)
     return molecule
 
 
+def get_CDK_IAtomContainer_from_mol_block(mol_block: str):
+    """This function takes the input mol block (V2000 or V3000) and creates a.
+
+    CDK IAtomContainer.
+
+    Args:
+        mol_block (str): mol block as input.
+
+    Returns:
+        mol (object): IAtomContainer with CDK.
+    """
+    StringReader = get_JClass("java.io.StringReader")(mol_block)
+    if "V3000" in mol_block:
+        MDLReader = get_JClass(cdk_base + ".io.MDLV3000Reader")(StringReader)
+    else:
+        MDLReader = get_JClass(cdk_base + ".io.MDLV2000Reader")(StringReader)
+    try:
+        molecule = MDLReader.read(get_builder().newAtomContainer())
+    finally:
+        MDLReader.close()
+    return molecule
+
+
+def get_CDK_IAtomContainer_from_InChI(inchi: str):
+    """This function takes the input InChI and creates a CDK IAtomContainer.
+
+    Args:
+        inchi (str): InChI string as input.
+
+    Returns:
+        mol (object): IAtomContainer with CDK.
+    """
+    InChIGeneratorFactory = get_JClass(cdk_base + ".inchi.InChIGeneratorFactory")
+    InChIToStructure = InChIGeneratorFactory.getInstance().getInChIToStructure(
+        inchi,
+        get_builder(),
+    )
+    return InChIToStructure.getAtomContainer()
+
+
 def get_CDK_SDG(molecule: any):
     """This function takes the input IAtomContainer and Creates a.
 
@@ -79,9 +292,10 @@ def get_CDK_SDG(molecule: any):
     Returns:
         mol object: mol object with CDK SDG.
     """
-    StructureDiagramGenerator = JClass(
-        cdk_base + ".layout.StructureDiagramGenerator",
-    )()
+    StructureDiagramGenerator = get_engine(
+        "StructureDiagramGenerator",
+        get_JClass(cdk_base + ".layout.StructureDiagramGenerator"),
+    )
     StructureDiagramGenerator.generateCoordinates(molecule)
     molecule_ = StructureDiagramGenerator.getMolecule()
 
@@ -100,11 +314,26 @@ def get_CDK_SDG_mol(molecule: any, V3000=False) -> str:
     Returns:
         str: CDK Structure Diagram Layout mol block.
     """
-    StringW = JClass("java.io.StringWriter")()
     moleculeSDG = get_CDK_SDG(molecule)
-    SDFW = JClass(cdk_base + ".io.SDFWriter")(StringW)
+    return get_CDK_mol_block(moleculeSDG, V3000)
+
+
+def get_CDK_mol_block(molecule: any, V3000=False) -> str:
+    """Write an IAtomContainer as a mol block with its current coordinates.
+
+    No new layout is generated.
+
+    Args:
+        molecule (IAtomContainer): molecule with (2D) coordinates.
+        V3000 (bool, optional): Option to return V3000 mol. Defaults to False.
+
+    Returns:
+        str: CDK mol block.
+    """
+    StringW = get_JClass("java.io.StringWriter")()
+    SDFW = get_JClass(cdk_base + ".io.SDFWriter")(StringW)
     SDFW.setAlwaysV3000(V3000)
-    SDFW.write(moleculeSDG)
+    SDFW.write(molecule)
     SDFW.flush()
     mol_str = str(StringW.toString())
     return mol_str
@@ -122,7 +351,7 @@ def get_murko_framework(molecule: any) -> str:
         smiles (string): Murko Framework as SMILES.
     """
 
-    MurkoFragmenter = JClass(cdk_base + ".fragment.MurckoFragmenter")(True, 3)
+    MurkoFragmenter = get_JClass(cdk_base + ".fragment.MurckoFragmenter")(True, 3)
     MurkoFragmenter.generateFragments(molecule)
     if len(MurkoFragmenter.getFrameworks()) == 0:
         return "None"
@@ -140,12 +369,15 @@ def get_aromatic_ring_count(molecule) -> int:
         int: The number of aromatic rings present in the molecule.
     """
 
-    Cycles = JClass(cdk_base + ".graph.Cycles")
-    ElectronDonation = JClass(cdk_base + ".aromaticity.ElectronDonation")
+    Cycles = get_JClass(cdk_base + ".graph.Cycles")
+    ElectronDonation = get_JClass(cdk_base + ".aromaticity.ElectronDonation")
 
-    Aromaticity = JClass(cdk_base + ".aromaticity.Aromaticity")(
-        ElectronDonation.daylight(),
-        Cycles.cdkAromaticSet(),
+    Aromaticity = get_engine(
+        "Aromaticity.daylight",
+        lambda: get_JClass(cdk_base + ".aromaticity.Aromaticity")(
+            ElectronDonation.daylight(),
+            Cycles.cdkAromaticSet(),
+        ),
     )
     Aromaticity.apply(molecule)
     MCBRings = Cycles.mcb(molecule).toRingSet()
@@ -171,13 +403,13 @@ def get_vander_waals_volume(molecule: any) -> float:
         float: The Van der Waals volume of the molecule.
     """
 
-    AtomContainerManipulator = JClass(
-        cdk_base + ".tools.manipulator.AtomContainerManipulator",
+    AtomContainerManipulator = get_JClass(
+        cdk_base + ".tools.manipulator.AtomContainerManipulator"
     )
     AtomContainerManipulator.percieveAtomTypesAndConfigureAtoms(molecule)
-    VABCVolume = JClass(
+    VABCVolume = get_JClass(
         cdk_base + ".geometry.volume.VABCVolume",
-    )().calculate(molecule)
+    ).calculate(molecule)
     return VABCVolume
 
 
@@ -190,7 +422,7 @@ def get_CDK_MolecularFormula(molecule: any) -> str:
     Returns:
         str : MolecularFormula generated using CDK.
     """
-    MolecularFormulaManipulator = JClass(
+    MolecularFormulaManipulator = get_JClass(
         cdk_base + ".tools.manipulator.MolecularFormulaManipulator"
     )
 
@@ -198,6 +430,73 @@ def get_CDK_MolecularFormula(molecule: any) -> str:
     return MolecularFormulaManipulator.getString(MolecularFormula)
 
 
+def get_CDK_descriptor_values(molecule: any) -> dict:
+    """Calculate the CDK descriptors used by the service in a single pass.
+
+    The descriptors are purely topological, so no 2D layout is generated.
+    The work is done on a clone of the input, the aromaticity model, the
+    atom typing and the minimum cycle basis are applied once and shared
+    between the descriptors, and the thread-local descriptor instances are
+    reused across molecules. Values are returned as Python primitives.
+
+    Args:
+        molecule (IAtomContainer): molecule given by the user.
+
+    Returns:
+        dict: Descriptor values keyed by name.
+    """
+    mol = molecule.clone()
+    AtomContainerManipulator = get_JClass(
+        cdk_base + ".tools.manipulator.AtomContainerManipulator"
+    )
+    Cycles = get_JClass(cdk_base + ".graph.Cycles")
+    ElectronDonation = get_JClass(cdk_base + ".aromaticity.ElectronDonation")
+
+    def calculate(name):
+        return get_descriptor(name).calculate(mol).getValue()
+
+    values = {
+        "AtomCount": int(calculate("AtomCountDescriptor").intValue()),
+        "BondCount": int(calculate("BondCountDescriptor").intValue()),
+        "HeavyAtomCount": int(mol.getAtomCount()),
+        "MolecularWeight": float(calculate("WeightDescriptor").doubleValue()),
+        "ExactMass": float(AtomContainerManipulator.getTotalExactMass(mol)),
+        "ALogP": float(calculate("ALOGPDescriptor").get(0)),
+        "RotatableBondCount": int(
+            calculate("RotatableBondsCountDescriptor").intValue()
+        ),
+        "TPSA": float(calculate("TPSADescriptor").doubleValue()),
+        "HBondAcceptorCount": int(calculate("HBondAcceptorCountDescriptor").intValue()),
+        "HBondDonorCount": int(calculate("HBondDonorCountDescriptor").intValue()),
+        "RuleOfFiveViolations": int(calculate("RuleOfFiveDescriptor").intValue()),
+        "FormalCharge": int(AtomContainerManipulator.getTotalFormalCharge(mol)),
+    }
+
+    # Aromaticity and the ring set are perceived once and shared
+    Aromaticity = get_engine(
+        "Aromaticity.daylight",
+        lambda: get_JClass(cdk_base + ".aromaticity.Aromaticity")(
+            ElectronDonation.daylight(),
+            Cycles.cdkAromaticSet(),
+        ),
+    )
+    Aromaticity.apply(mol)
+    MCB = Cycles.mcb(mol)
+    AromaticRings = 0
+    for RingContainer in MCB.toRingSet().atomContainers():
+        if all(Bond.isAromatic() for Bond in RingContainer.bonds()):
+            AromaticRings += 1
+    values["AromaticRingCount"] = AromaticRings
+    values["FractionCSP3"] = float(calculate("FractionalCSP3Descriptor").doubleValue())
+    values["RingCount"] = int(MCB.numberOfCycles())
+
+    AtomContainerManipulator.percieveAtomTypesAndConfigureAtoms(mol)
+    values["VABCVolume"] = float(
+        get_JClass(cdk_base + ".geometry.volume.VABCVolume").calculate(mol)
+    )
+    return values
+
+
 def get_CDK_descriptors(molecule: any) -> Union[tuple, str]:
     """Take an input SMILES and generate a selected set of molecular.
 
@@ -208,159 +507,164 @@ def get_CDK_descriptors(molecule: any) -> Union[tuple, str]:
 
     Returns (list):     A list of calculated descriptors.
     """
-    SDGMol = get_CDK_SDG(molecule)
-    if SDGMol:
-        AtomCountDescriptor = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.AtomCountDescriptor")()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        HeavyAtomsC = SDGMol.getAtomCount()
-        WeightDescriptor = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.WeightDescriptor")()
-            .calculate(SDGMol)
-            .getValue()
-            .toString()
-        )
-        TotalExactMass = JClass(
-            cdk_base + ".tools.manipulator.AtomContainerManipulator",
-        ).getTotalExactMass(SDGMol)
-        ALogP = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.ALOGPDescriptor")()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        NumRotatableBonds = (
-            JClass(
-                cdk_base + ".qsar.descriptors.molecular.RotatableBondsCountDescriptor",
-            )()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        TPSADescriptor = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.TPSADescriptor")()
-            .calculate(SDGMol)
-            .getValue()
-            .toString()
-        )
-        HBondAcceptorCountDescriptor = (
-            JClass(
-                cdk_base + ".qsar.descriptors.molecular.HBondAcceptorCountDescriptor",
-            )()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        HBondDonorCountDescriptor = (
-            JClass(
-                cdk_base + ".qsar.descriptors.molecular.HBondAcceptorCountDescriptor",
-            )()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        RuleOfFiveDescriptor = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.RuleOfFiveDescriptor")()
-            .calculate(SDGMol)
-            .getValue()
-        )
-        AromaticRings = get_aromatic_ring_count(SDGMol)
-        QEDWeighted = None
-        FormalCharge = JClass(
-            cdk_base + ".tools.manipulator.AtomContainerManipulator",
-        ).getTotalFormalCharge(SDGMol)
-        FractionalCSP3Descriptor = (
-            JClass(cdk_base + ".qsar.descriptors.molecular.FractionalCSP3Descriptor")()
-            .calculate(SDGMol)
-            .getValue()
-            .toString()
-        )
-        NumRings = (
-            JClass(
-                cdk_base + ".graph.Cycles",
-            )
-            .mcb(SDGMol)
-            .numberOfCycles()
-        )
-        VABCVolume = get_vander_waals_volume(SDGMol)
-
+    if molecule:
+        values = get_CDK_descriptor_values(molecule)
         return (
-            int(str(AtomCountDescriptor)),
-            int(HeavyAtomsC),
-            float("{:.2f}".format(float(str(WeightDescriptor)))),
-            float("{:.5f}".format(float(str(TotalExactMass)))),
-            float("{:.2f}".format(float(str(ALogP).split(",")[0]))),
-            int(str(NumRotatableBonds)),
-            float("{:.2f}".format(float(str(TPSADescriptor)))),
-            int(str(HBondAcceptorCountDescriptor)),
-            int(str(HBondDonorCountDescriptor)),
-            int(str(HBondAcceptorCountDescriptor)),
-            int(str(HBondDonorCountDescriptor)),
-            int(str(RuleOfFiveDescriptor)),
-            int(AromaticRings),
-            str(QEDWeighted),
-            int(FormalCharge),
-            float("{:.2f}".format(float(str(FractionalCSP3Descriptor)))),
-            int(NumRings),
-            float("{:.2f}".format(float(str(VABCVolume)))),
+            values["AtomCount"],
+            values["HeavyAtomCount"],
+            round(values["MolecularWeight"], 2),
+            round(values["ExactMass"], 5),
+            round(values["ALogP"], 2),
+            values["RotatableBondCount"],
+            round(values["TPSA"], 2),
+            values["HBondAcceptorCount"],
+            values["HBondDonorCount"],
+            values["HBondAcceptorCount"],
+            values["HBondDonorCount"],
+            values["RuleOfFiveViolations"],
+            values["AromaticRingCount"],
+            str(None),
+            values["FormalCharge"],
+            round(values["FractionCSP3"], 2),
+            values["RingCount"],
+            round(values["VABCVolume"], 2),
         )
     else:
         return "Check input and try again!"
 
 
-def get_tanimoto_similarity_PubChem_CDK(mol1: any, mol2: any) -> str:
-    """Calculate the Tanimoto similarity index between two molecules using.
+def _get_PubChem_fingerprint(molecule: any) -> bytes:
+    """Generate the PubChem fingerprint of a molecule as BitSet bytes.
+
+    Hydrogens are made explicit and aromaticity is perceived on a clone, so
+    the caller's molecule is left untouched.
+    """
+    AtomContainerManipulator = get_JClass(
+        cdk_base + ".tools.manipulator.AtomContainerManipulator"
+    )
+    Cycles = get_JClass(cdk_base + ".graph.Cycles")
+    ElectronDonation = get_JClass(cdk_base + ".aromaticity.ElectronDonation")
+    PubchemFingerprinter = get_engine(
+        "PubchemFingerprinter",
+        lambda: get_JClass(cdk_base + ".fingerprint.PubchemFingerprinter")(
+            get_builder(),
+        ),
+    )
+    CDKHydrogenAdder = get_JClass(cdk_base + ".tools.CDKHydrogenAdder").getInstance(
+        get_builder(),
+    )
+    Aromaticity = get_engine(
+        "Aromaticity.cdk",
+        lambda: get_JClass(cdk_base + ".aromaticity.Aromaticity")(
+            ElectronDonation.cdk(),
+            Cycles.cdkAromaticSet(),
+        ),
+    )
+    mol = molecule.clone()
+    AtomContainerManipulator.percieveAtomTypesAndConfigureAtoms(mol)
+    CDKHydrogenAdder.addImplicitHydrogens(mol)
+    AtomContainerManipulator.convertImplicitToExplicitHydrogens(mol)
+    Aromaticity.apply(mol)
+    return bytes(PubchemFingerprinter.getBitFingerprint(mol).asBitSet().toByteArray())
+
+
+def _get_ECFP_fingerprint(molecule: any, ECFP: int, bitset_len: int) -> bytes:
+    """Generate the ECFP fingerprint of a molecule as BitSet bytes."""
+    CircularFingerprinter = get_JClass(
+        cdk_base + ".fingerprint.CircularFingerprinter",
+    )
+    fingerprinter_class = {
+        2: CircularFingerprinter.CLASS_ECFP2,
+        4: CircularFingerprinter.CLASS_ECFP4,
+        6: CircularFingerprinter.CLASS_ECFP6,
+    }[ECFP]
+    CircularFingerprinter_ECFP = get_engine(
+        ("CircularFingerprinter", ECFP, bitset_len),
+        lambda: CircularFingerprinter(fingerprinter_class, bitset_len),
+    )
+    fingerprint = CircularFingerprinter_ECFP.getBitFingerprint(molecule.clone())
+    return bytes(fingerprint.asBitSet().toByteArray())
 
-    PubChem fingerprints.
+
+def get_CDK_fingerprint(
+    molecule: any,
+    fingerprinter: str = "PubChem",
+    ECFP: int = 2,
+    bitset_len: int = 2048,
+) -> bytes:
+    """Return the CDK fingerprint of a molecule, computing it at most once.
+
+    Fingerprints are cached as the little-endian bytes of the Java BitSet,
+    keyed by the canonical SMILES of the molecule, the fingerprint type and
+    its parameters.
 
     Args:
-        mol1 (IAtomContainer): First molecule given by the user.
-        mol2 (IAtomContainer): Second molecule given by the user.
+        molecule (IAtomContainer): molecule given by the user.
+        fingerprinter (str, optional): "PubChem" or "ECFP". Defaults to "PubChem".
+        ECFP (int, optional): The ECFP version to use (2, 4, or 6). Defaults to 2.
+        bitset_len (int, optional): The length of the ECFP bitset. Defaults to 2048.
 
     Returns:
-        str: The Tanimoto similarity as a string with 5 decimal places, or an error message.
+        bytes: The fingerprint bits.
     """
-
-    Tanimoto = JClass(cdk_base + ".similarity.Tanimoto")
-    SCOB = JClass(cdk_base + ".silent.SilentChemObjectBuilder")
-    PubchemFingerprinter = JClass(cdk_base + ".fingerprint.PubchemFingerprinter")(
-        SCOB.getInstance(),
-    )
-    CDKHydrogenAdder = JClass(cdk_base + ".tools.CDKHydrogenAdder").getInstance(
-        SCOB.getInstance(),
-    )
-    AtomContainerManipulator = JClass(
-        cdk_base + ".tools.manipulator.AtomContainerManipulator",
-    )
-    Cycles = JClass(cdk_base + ".graph.Cycles")
-    ElectronDonation = JClass(cdk_base + ".aromaticity.ElectronDonation")
-    Aromaticity = JClass(cdk_base + ".aromaticity.Aromaticity")(
-        ElectronDonation.cdk(),
-        Cycles.cdkAromaticSet(),
+    SmiFlavor = get_SmiFlavor()
+    canonical_smiles = str(
+        get_smiles_generator(SmiFlavor.Absolute | SmiFlavor.UseAromaticSymbols).create(
+            molecule
+        )
     )
-    if mol1 and mol2:
-        # Perceive atom types and configure atoms
-        AtomContainerManipulator.percieveAtomTypesAndConfigureAtoms(mol1)
-        AtomContainerManipulator.percieveAtomTypesAndConfigureAtoms(mol2)
+    if fingerprinter == "PubChem":
+        key = (canonical_smiles, fingerprinter)
+    else:
+        key = (canonical_smiles, fingerprinter, ECFP, bitset_len)
+
+    fingerprint = fingerprint_cache.get(key)
+    if fingerprint is None:
+        if fingerprinter == "PubChem":
+            fingerprint = _get_PubChem_fingerprint(molecule)
+        else:
+            fingerprint = _get_ECFP_fingerprint(molecule, ECFP, bitset_len)
+        fingerprint_cache.set(key, fingerprint)
+    return fingerprint
 
-        # add Implicit Hydrogens
-        CDKHydrogenAdder.addImplicitHydrogens(mol1)
-        CDKHydrogenAdder.addImplicitHydrogens(mol2)
 
-        # Convert implicit to explicit Hydrogens
-        AtomContainerManipulator.convertImplicitToExplicitHydrogens(mol1)
-        AtomContainerManipulator.convertImplicitToExplicitHydrogens(mol2)
+def get_tanimoto_from_fingerprints(fingerprint1: bytes, fingerprint2: bytes) -> float:
+    """Calculate the Tanimoto coefficient of two BitSet byte fingerprints.
 
-        # Apply Aromaticity
-        Aromaticity.apply(mol1)
-        Aromaticity.apply(mol2)
+    Args:
+        fingerprint1 (bytes): First fingerprint.
+        fingerprint2 (bytes): Second fingerprint.
+
+    Returns:
+        float: The Tanimoto coefficient, 0.0 if both fingerprints are empty.
+    """
+    bits1 = int.from_bytes(fingerprint1, "little")
+    bits2 = int.from_bytes(fingerprint2, "little")
+    union = (bits1 | bits2).bit_count()
+    if union == 0:
+        return 0.0
+    return (bits1 & bits2).bit_count() / union
 
-        # Generate BitSets using PubChemFingerprinter
-        fingerprint1 = PubchemFingerprinter.getBitFingerprint(mol1).asBitSet()
-        fingerprint2 = PubchemFingerprinter.getBitFingerprint(mol2).asBitSet()
 
-        # Calculate Tanimoto similarity
-        Similarity = Tanimoto.calculate(fingerprint1, fingerprint2)
+def get_tanimoto_similarity_PubChem_CDK(mol1: any, mol2: any) -> str:
+    """Calculate the Tanimoto similarity index between two molecules using.
+
+    PubChem fingerprints.
+
+    Args:
+        mol1 (IAtomContainer): First molecule given by the user.
+        mol2 (IAtomContainer): Second molecule given by the user.
 
-        return "{:.5f}".format(float(str(Similarity)))
+    Returns:
+        str: The Tanimoto similarity as a string with 5 decimal places, or an error message.
+    """
+    if mol1 and mol2:
+        fingerprint1 = get_CDK_fingerprint(mol1, "PubChem")
+        fingerprint2 = get_CDK_fingerprint(mol2, "PubChem")
+        Similarity = get_tanimoto_from_fingerprints(fingerprint1, fingerprint2)
+        # CDK reports BitSet similarities in single precision
+        Similarity = struct.unpack("f", struct.pack("f", Similarity))[0]
+        return "{:.5f}".format(Similarity)
     else:
         return "Check the SMILES string for errors"
 
@@ -383,29 +687,14 @@ def get_tanimoto_similarity_ECFP_CDK(
     Returns:
         str: The Tanimoto similarity as a string with 5 decimal places, or an error message.
     """
-    Tanimoto = JClass(cdk_base + ".similarity.Tanimoto")
-    CircularFingerprinter = JClass(
-        cdk_base + ".fingerprint.CircularFingerprinter",
-    )()
-    if ECFP == 2:
-        fingerprinter_class = CircularFingerprinter.CLASS_ECFP2
-    elif ECFP == 4:
-        fingerprinter_class = CircularFingerprinter.CLASS_ECFP4
-    elif ECFP == 6:
-        fingerprinter_class = CircularFingerprinter.CLASS_ECFP6
-    else:
+    if ECFP not in (2, 4, 6):
         return "only ECFP 2/4/6 allowed"
 
-    CircularFingerprinter_ECFP = JClass(
-        cdk_base + ".fingerprint.CircularFingerprinter",
-    )(fingerprinter_class, bitset_len)
-
     if mol1 and mol2:
-        fingerprint1 = CircularFingerprinter_ECFP.getBitFingerprint(mol1)
-        fingerprint2 = CircularFingerprinter_ECFP.getBitFingerprint(mol2)
-        # Calculate Tanimoto similarity
-        Similarity = Tanimoto.calculate(fingerprint1, fingerprint2)
-        return "{:.5f}".format(float(str(Similarity)))
+        fingerprint1 = get_CDK_fingerprint(mol1, "ECFP", ECFP, bitset_len)
+        fingerprint2 = get_CDK_fingerprint(mol2, "ECFP", ECFP, bitset_len)
+        Similarity = get_tanimoto_from_fingerprints(fingerprint1, fingerprint2)
+        return "{:.5f}".format(Similarity)
     else:
         return "Check the SMILES string for errors"
 
@@ -462,17 +751,17 @@ def get_cip_annotation(molecule: any) -> str:
     """
     SDGMol = get_CDK_SDG(molecule)
     centres_base = "com.simolecule.centres"
-    Cycles = JClass(cdk_base + ".graph.Cycles")
-    IBond = JClass(cdk_base + ".interfaces.IBond")
-    IStereoElement = JClass(cdk_base + ".interfaces.IStereoElement")
-    Stereocenters = JClass(cdk_base + ".stereo.Stereocenters")
-    StandardGenerator = JClass(
+    Cycles = get_JClass(cdk_base + ".graph.Cycles")
+    IBond = get_JClass(cdk_base + ".interfaces.IBond")
+    IStereoElement = get_JClass(cdk_base + ".interfaces.IStereoElement")
+    Stereocenters = get_JClass(cdk_base + ".stereo.Stereocenters")
+    StandardGenerator = get_JClass(
         cdk_base + ".renderer.generators.standard.StandardGenerator",
     )
 
-    BaseMol = JClass(centres_base + ".BaseMol")
-    CdkLabeller = JClass(centres_base + ".CdkLabeller")
-    Descriptor = JClass(centres_base + ".Descriptor")
+    BaseMol = get_JClass(centres_base + ".BaseMol")
+    CdkLabeller = get_JClass(centres_base + ".CdkLabeller")
+    Descriptor = get_JClass(centres_base + ".Descriptor")
 
     stereocenters = Stereocenters.of(SDGMol)
     for atom in SDGMol.atoms():
@@ -578,8 +867,8 @@ def get_CXSMILES(molecule: any) -> str:
         str: CXSMILES representation with 2D atom coordinates.
     """
     SDGMol = get_CDK_SDG(molecule)
-    SmiFlavor = JClass(cdk_base + ".smiles.SmiFlavor")
-    SmilesGenerator = JClass(cdk_base + ".smiles.SmilesGenerator")(
+    SmiFlavor = get_SmiFlavor()
+    SmilesGenerator = get_smiles_generator(
         SmiFlavor.Absolute | SmiFlavor.CxSmilesWithCoords,
     )
     CXSMILES = SmilesGenerator.create(SDGMol)
@@ -598,10 +887,7 @@ def get_canonical_SMILES(molecule: any) -> str:
         str: Canonical SMILES representation with 2D atom coordinates.
     """
     SDGMol = get_CDK_SDG(molecule)
-    SmiFlavor = JClass(cdk_base + ".smiles.SmiFlavor")
-    SmilesGenerator = JClass(
-        cdk_base + ".smiles.SmilesGenerator",
-    )(SmiFlavor.Absolute)
+    SmilesGenerator = get_smiles_generator(get_SmiFlavor().Absolute)
     CanonicalSMILES = SmilesGenerator.create(SDGMol)
     return str(CanonicalSMILES)
 
@@ -617,14 +903,11 @@ def get_InChI(molecule: any, InChIKey=False) -> str:
         str: InChI or InChIKey string.
     """
     SDGMol = get_CDK_SDG(molecule)
-    InChIGeneratorFactory = JClass(cdk_base + ".inchi.InChIGeneratorFactory")
-    InChI = InChIGeneratorFactory.getInstance().getInChIGenerator(SDGMol).getInchi()
+    InChIGeneratorFactory = get_JClass(cdk_base + ".inchi.InChIGeneratorFactory")
+    InChIGenerator = InChIGeneratorFactory.getInstance().getInChIGenerator(SDGMol)
     if InChIKey:
-        InChIKey = (
-            InChIGeneratorFactory.getInstance().getInChIGenerator(SDGMol).getInchiKey()
-        )
-        return InChIKey
-    return InChI
+        return InChIGenerator.getInchiKey()
+    return InChIGenerator.getInchi()
 
 
 def get_smiles_opsin(input_text: str) -> str:
@@ -640,7 +923,7 @@ def get_smiles_opsin(input_text: str) -> str:
     - Exception: If the IUPAC name is not valid or if there are issues in the conversion process. The exception message will guide the user to check the data again.
     """
     try:
-        OpsinResult = _nametostruct.parseChemicalName(input_text)
+        OpsinResult = get_NameToStructure().parseChemicalName(input_text)
         if str(OpsinResult.getStatus()) == "FAILURE":
             raise Exception(
                 (
@@ -656,7 +939,7 @@ def get_smiles_opsin(input_text: str) -> str:
         )
 
 
-async def get_CDK_HOSE_codes(
+def get_CDK_HOSE_codes(
     molecule: any,
     noOfSpheres: int,
     ringsize: bool,
@@ -671,7 +954,10 @@ async def get_CDK_HOSE_codes(
     Returns:
         List[str]: List of CDK-generated HOSECodes.
     """
-    HOSECodeGenerator = JClass(cdk_base + ".tools.HOSECodeGenerator")()
+    HOSECodeGenerator = get_engine(
+        "HOSECodeGenerator",
+        get_JClass(cdk_base + ".tools.HOSECodeGenerator"),
+    )
     HOSECodes = []
     atoms = molecule.atoms()
     for atom in atoms:
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from functools import cached_property
+
+from rdkit import Chem
+
+from app.modules.toolkits.cdk_wrapper import get_CDK_mol_block
+from app.modules.toolkits.cdk_wrapper import get_CDK_SDG
+from app.modules.toolkits.helpers import parse_input
+from app.modules.toolkits.openbabel_wrapper import get_OBMol
+
+
+class MoleculeContext:
+    """Parse-once holder for all toolkit representations of one input.
+
+    Every representation is built lazily on first access and memoized, so
+    a pipeline that needs the RDKit molecule, the CDK IAtomContainer and a
+    CDK layout of the same input pays for each of them at most once.
+
+    The memoized objects are shared by everyone holding the context; callers
+    that modify a molecule in place must copy it first.
+
+    Args:
+        input_text (str): The input molecule (SMILES).
+        standardize (bool, optional): Whether to standardize the RDKit molecule. Defaults to False.
+    """
+
+    def __init__(self, input_text: str, standardize: bool = False):
+        self.input_text = input_text
+        self.standardize = standardize
+
+    def get_mol(self, framework: str):
+        """Return the molecule object for the requested framework.
+
+        Args:
+            framework (str): "rdkit", "cdk" or "openbabel".
+
+        Returns:
+            Chem.Mol, IAtomContainer or ob.OBMol: The memoized molecule.
+        """
+        if framework == "rdkit":
+            return self.rdkit_mol
+        elif framework == "cdk":
+            return self.cdk_mol
+        elif framework == "openbabel":
+            return self.ob_mol
+        raise ValueError(f"Invalid framework specified: {framework}")
+
+    @cached_property
+    def rdkit_mol(self) -> Chem.Mol:
+        """RDKit molecule object."""
+        return parse_input(self.input_text, "rdkit", self.standardize)
+
+    @cached_property
+    def cdk_mol(self):
+        """CDK IAtomContainer."""
+        return parse_input(self.input_text, "cdk", False)
+
+    @cached_property
+    def ob_mol(self):
+        """Open Babel OBMol."""
+        return get_OBMol(self.input_text)
+
+    @cached_property
+    def canonical_smiles(self) -> str:
+        """RDKit canonical isomeric SMILES."""
+        return Chem.MolToSmiles(self.rdkit_mol)
+
+    @cached_property
+    def sdg_mol(self):
+        """CDK IAtomContainer with a Structure Diagram Generator 2D layout."""
+        return get_CDK_SDG(self.cdk_mol)
+
+    @cached_property
+    def molblock(self) -> str:
+        """V2000 mol block of the CDK 2D layout."""
+        return get_CDK_mol_block(self.sdg_mol, V3000=False).replace("$$$$\n", "")
@@ -1,30 +1,374 @@
 from __future__ import annotations
 
+import os
+import re
+
+import selfies as sf
 from chembl_structure_pipeline import standardizer
 from rdkit import Chem
 
 from app.exception_handlers import InvalidInputException
+from app.modules.cache import LRUCache
 from app.modules.toolkits.cdk_wrapper import get_CDK_IAtomContainer
+from app.modules.toolkits.cdk_wrapper import get_CDK_IAtomContainer_from_InChI
+from app.modules.toolkits.cdk_wrapper import get_CDK_IAtomContainer_from_mol_block
 from app.modules.toolkits.cdk_wrapper import get_CDK_SDG_mol
 from app.modules.toolkits.openbabel_wrapper import get_ob_mol
 
+# Parsed molecules keyed by (input, framework, standardize)
+parse_cache = LRUCache("parse", maxsize=int(os.getenv("PARSE_CACHE_SIZE", "4096")))
+# Error payloads of inputs known to be invalid, keyed like parse_cache
+invalid_cache = LRUCache(
+    "invalid_input",
+    maxsize=int(os.getenv("INVALID_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("INVALID_CACHE_TTL", "600")),
+)
+
+# A SMILES followed by a CXSMILES extension block, e.g. "CC(=O)O |$;;R1;$|"
+_CXSMILES_RE = re.compile(r"^(?P<smiles>.+?)\s+(?P<extension>\|[^|]*\|)\s*$")
+# A string built only from bracketed tokens (and dots), e.g. "[C][C][O]"
+_BRACKETED_RE = re.compile(r"^(?:\[[^\[\]]+\]|\.)+$")
+_BRACKET_TOKEN_RE = re.compile(r"\[[^\[\]]+\]")
+# A SMILES bracket atom: isotope, symbol, chirality, hydrogens, charge and atom
+# class, e.g. "[13CH3]", "[C@@H]", "[NH4+]"; SELFIES ring, branch and
+# bond-prefixed tokens such as "[Ring1]" or "[=C]" do not match
+_SMILES_BRACKET_ATOM_RE = re.compile(
+    r"^\[\d*(?:[A-Z][a-z]?|se|as|te|[bcnops]|\*)"
+    r"(?:@(?:@|TH[12]|AL[12]|SP[123]|TB\d{1,2}|OH\d{1,2})?)?"
+    r"(?:H\d?)?(?:[+-](?:\d+|\+|-)?)?(?::\d+)?\]$"
+)
+# SMILES atom tokens: bracket atoms, bare R-group labels and the organic subset
+_SMILES_ATOM_RE = re.compile(
+    r"\[[^\]]+\]|R(?:\d+|#|'*)(?![a-z])|Br|Cl|[BCNOPSFI]|[bcnops]|\*"
+)
+# R-group pseudo atoms, e.g. [R], [R1], [R#], [R'] but not [Ru], [Rh], [Rb], ...
+_R_GROUP_RE = re.compile(r"^\[?\d*(?P<label>R(?:\d+|#|'*))(?![a-z])[^\]]*\]?$")
+
+
+def _to_cache_entry(mol, framework: str):
+    """Convert a parsed molecule into the representation held by the cache.
+
+    RDKit molecules are stored as binary pickles, including all atom and
+    molecule properties such as R-group labels, and CDK molecules as
+    private clones, so that a cached entry can never be modified through a
+    reference handed out to a caller.
+    """
+    if framework == "rdkit":
+        return mol.ToBinary(Chem.PropertyPickleOptions.AllProps)
+    if framework == "cdk":
+        return mol.clone()
+    return mol
+
+
+def _from_cache_entry(entry, framework: str):
+    """Return a fresh, caller-owned copy of a cached molecule."""
+    if framework == "rdkit":
+        return Chem.Mol(entry)
+    if framework == "cdk":
+        return entry.clone()
+    # OpenBabel molecules are returned as immutable mol block strings
+    return entry
+
 
 def parse_input(input: str, framework: str = "rdkit", standardize: bool = False):
     """Parse and check if the input is valid.
 
+    Parsed molecules are kept in a size-bounded LRU cache, every call
+    returns a new copy that the caller is free to modify. Inputs that failed
+    to parse are remembered for a limited time and rejected right away with
+    the original error.
+
     Args:
         input (str): Input string.
+        framework (str): Framework to use for parsing. Default is "rdkit".
+        standardize (bool): Whether to standardize the molecule. Default is False.
 
     Returns:
         Mol or None: Valid molecule object or None if an error occurs.
             If an error occurs during SMILES parsing, an error message is returned.
     """
+    key = (input, framework, standardize)
+    entry = parse_cache.get(key)
+    if entry is not None:
+        return _from_cache_entry(entry, framework)
 
-    # auto detect the format
-    format = "SMILES"
+    error = invalid_cache.get(key)
+    if error is not None:
+        raise InvalidInputException(name=error[0], value=error[1])
+
+    format = detect_format(input)
+
+    try:
+        if format == "SMILES":
+            mol = parse_SMILES(input, framework, standardize)
+        elif format == "CXSMILES":
+            mol = parse_CXSMILES(input, framework, standardize)
+        elif format == "SELFIES":
+            try:
+                mol = parse_SELFIES(input, framework, standardize)
+            except InvalidInputException:
+                # Bracket-only strings can also be SMILES, e.g. "[13CH3][CH3]"
+                mol = parse_SMILES(input, framework, standardize)
+        elif format == "InChI":
+            mol = parse_InChI(input, framework, standardize)
+        else:
+            mol = parse_mol_block(input, framework, standardize)
+    except InvalidInputException as e:
+        if e.cacheable:
+            invalid_cache.set(key, (e.name, e.value))
+        raise
+
+    if mol is not None:
+        parse_cache.set(key, _to_cache_entry(mol, framework))
+    return mol
+
+
+def detect_format(input_text: str) -> str:
+    """Detect the format of a chemical structure input without parsing it.
+
+    The detection only looks at the text itself, so it is cheap enough to be
+    run for every request.
+
+    Args:
+        input_text (str): Input string.
+
+    Returns:
+        str: One of "MOL", "SDF", "InChI", "CXSMILES", "SELFIES" or "SMILES".
+    """
+    text = input_text.strip()
+    if "M  END" in text or "M  V30" in text or "V2000" in text or "V3000" in text:
+        if "$$$$" in text or "\n> " in text:
+            return "SDF"
+        return "MOL"
+    if text.startswith("InChI="):
+        return "InChI"
+    if _CXSMILES_RE.match(text):
+        return "CXSMILES"
+    # Bracketed strings such as "[C][C][O]" are valid SMILES too, so they are
+    # only read as SELFIES when a token is not a SMILES bracket atom
+    if _BRACKETED_RE.match(text) and not all(
+        _SMILES_BRACKET_ATOM_RE.match(token)
+        for token in _BRACKET_TOKEN_RE.findall(text)
+    ):
+        return "SELFIES"
+    return "SMILES"
+
+
+def _is_rejection(error: Exception) -> bool:
+    """Return True if an error raised while parsing means the input is invalid.
+
+    A toolkit that returned no molecule and CDK's parse errors
+    (CDKException and its subclasses, e.g. InvalidSmilesException) reject the
+    input. Any other error, e.g. a failing JVM, says nothing about the input
+    and must not be remembered in invalid_cache.
+    """
+    if isinstance(error, InvalidInputException):
+        return error.cacheable
+    if isinstance(error, ValueError):
+        return True
+    return any(
+        cls.__name__.startswith("org.openscience.cdk.exception.")
+        for cls in type(error).__mro__
+    )
 
-    if format == "SMILES":
-        return parse_SMILES(input, framework, standardize)
+
+def _standardize_rdkit(mol: Chem.Mol) -> Chem.Mol:
+    """Standardize an RDKit molecule using the ChEMBL pipeline."""
+    mol_block = Chem.MolToMolBlock(mol)
+    standardized_mol = standardizer.standardize_molblock(mol_block)
+    return Chem.MolFromMolBlock(standardized_mol)
+
+
+def parse_mol_block(
+    mol_block: str, framework: str = "rdkit", standardize: bool = False
+):
+    """Parse a mol block (V2000/V3000) or the first record of an SD file.
+
+    Args:
+        mol_block (str): Input mol block or SD file content.
+        framework (str): Framework to use for parsing. Default is "rdkit".
+        standardize (bool): Whether to standardize the molecule. Default is False.
+
+    Returns:
+        Chem.Mol, IAtomContainer or str: Valid molecule object (a mol block for "openbabel").
+
+    Raises:
+        InvalidInputException: If the mol block cannot be parsed.
+    """
+    try:
+        mol_block = mol_block.split("$$$$")[0]
+        if framework == "rdkit":
+            mol = Chem.MolFromMolBlock(mol_block)
+            if mol and standardize:
+                mol = _standardize_rdkit(mol)
+        elif framework == "cdk":
+            mol = get_CDK_IAtomContainer_from_mol_block(mol_block)
+        elif framework == "openbabel":
+            mol = get_ob_mol(mol_block, input_format="mol")
+        else:
+            raise ValueError(f"Invalid framework specified: {framework}")
+        if not mol:
+            raise ValueError("Empty molecule")
+        return mol
+    except Exception as e:
+        raise InvalidInputException(
+            name="molblock", value=mol_block, cacheable=_is_rejection(e)
+        )
+
+
+def parse_InChI(inchi: str, framework: str = "rdkit", standardize: bool = False):
+    """Parse an InChI string with the native InChI reader of each toolkit.
+
+    Args:
+        inchi (str): Input InChI string.
+        framework (str): Framework to use for parsing. Default is "rdkit".
+        standardize (bool): Whether to standardize the molecule. Default is False.
+
+    Returns:
+        Chem.Mol, IAtomContainer or str: Valid molecule object (a mol block for "openbabel").
+
+    Raises:
+        InvalidInputException: If the InChI cannot be parsed.
+    """
+    try:
+        inchi = inchi.strip().replace(" ", "+")
+        if framework == "rdkit":
+            mol = Chem.MolFromInchi(inchi)
+            if mol and standardize:
+                mol = _standardize_rdkit(mol)
+        elif framework == "cdk":
+            mol = get_CDK_IAtomContainer_from_InChI(inchi)
+        elif framework == "openbabel":
+            mol = get_ob_mol(inchi, input_format="inchi")
+        else:
+            raise ValueError(f"Invalid framework specified: {framework}")
+        if not mol:
+            raise ValueError("Empty molecule")
+        return mol
+    except Exception as e:
+        raise InvalidInputException(
+            name="inchi", value=inchi, cacheable=_is_rejection(e)
+        )
+
+
+def parse_SELFIES(selfies: str, framework: str = "rdkit", standardize: bool = False):
+    """Decode a SELFIES string and parse the resulting SMILES.
+
+    Args:
+        selfies (str): Input SELFIES string.
+        framework (str): Framework to use for parsing. Default is "rdkit".
+        standardize (bool): Whether to standardize the molecule. Default is False.
+
+    Returns:
+        Chem.Mol, IAtomContainer or str: Valid molecule object (a mol block for "openbabel").
+
+    Raises:
+        InvalidInputException: If the SELFIES cannot be decoded.
+    """
+    try:
+        smiles = sf.decoder(selfies.strip())
+    except Exception:
+        raise InvalidInputException(name="selfies", value=selfies)
+    if not smiles:
+        raise InvalidInputException(name="selfies", value=selfies)
+    return parse_SMILES(smiles, framework, standardize)
+
+
+def parse_CXSMILES(cxsmiles: str, framework: str = "rdkit", standardize: bool = False):
+    """Parse a CXSMILES string, keeping the extension block intact.
+
+    RDKit and CDK read the extension natively, Open Babel only receives the
+    SMILES part.
+
+    Args:
+        cxsmiles (str): Input CXSMILES string.
+        framework (str): Framework to use for parsing. Default is "rdkit".
+        standardize (bool): Whether to standardize the molecule. Default is False.
+
+    Returns:
+        Chem.Mol, IAtomContainer or str: Valid molecule object (a mol block for "openbabel").
+
+    Raises:
+        InvalidInputException: If the CXSMILES cannot be parsed.
+    """
+    match = _CXSMILES_RE.match(cxsmiles.strip())
+    smiles = match.group("smiles").replace(" ", "+")
+    cxsmiles = smiles + " " + match.group("extension")
+    try:
+        if framework == "rdkit":
+            mol = Chem.MolFromSmiles(cxsmiles)
+            if mol and standardize:
+                mol = _standardize_rdkit(mol)
+        elif framework == "cdk":
+            mol = get_CDK_IAtomContainer(cxsmiles)
+        elif framework == "openbabel":
+            mol = get_ob_mol(smiles)
+        else:
+            raise ValueError(f"Invalid framework specified: {framework}")
+        if not mol:
+            raise ValueError("Empty molecule")
+        return mol
+    except Exception as e:
+        raise InvalidInputException(
+            name="cxsmiles", value=cxsmiles, cacheable=_is_rejection(e)
+        )
+
+
+def find_R_groups(smiles: str) -> list:
+    """Find the R-group pseudo atoms in a SMILES string.
+
+    The SMILES is tokenized into atoms, so element symbols that start with
+    an "R" (Ru, Rh, Rb, Re, Ra, Rn, ...) are not mistaken for R-groups.
+
+    Args:
+        smiles (str): Input SMILES string.
+
+    Returns:
+        list: (atom index, token span, label) for every R-group atom, in atom order.
+    """
+    r_groups = []
+    for index, token in enumerate(_SMILES_ATOM_RE.finditer(smiles)):
+        match = _R_GROUP_RE.match(token.group())
+        if match:
+            r_groups.append((index, token.span(), match.group("label")))
+    return r_groups
+
+
+def parse_R_group_SMILES(smiles: str, r_groups: list) -> Chem.Mol:
+    """Parse a SMILES string with R-group pseudo atoms using RDKit.
+
+    Every R-group is read as a dummy atom that carries its label the same
+    way RDKit does for R# atoms read from a mol block (dummyLabel,
+    _MolFileRLabel and the R-group number as isotope).
+
+    Args:
+        smiles (str): Input SMILES string.
+        r_groups (list): R-group atoms as returned by find_R_groups.
+
+    Returns:
+        Chem.Mol or None: RDKit molecule or None if the SMILES cannot be parsed.
+    """
+    parts = []
+    last = 0
+    for _, (start, end), _ in r_groups:
+        parts.append(smiles[last:start])
+        parts.append("[*]")
+        last = end
+    parts.append(smiles[last:])
+
+    params = Chem.SmilesParserParams()
+    params.removeHs = False
+    mol = Chem.MolFromSmiles("".join(parts), params)
+    if mol is None:
+        return None
+
+    for index, _, label in r_groups:
+        atom = mol.GetAtomWithIdx(index)
+        atom.SetProp("dummyLabel", label)
+        if label[1:].isdigit():
+            atom.SetIntProp("_MolFileRLabel", int(label[1:]))
+            atom.SetIsotope(int(label[1:]))
+    return Chem.RemoveHs(mol)
 
 
 def parse_SMILES(smiles: str, framework: str = "rdkit", standardize: bool = False):
@@ -45,16 +389,13 @@ def parse_SMILES(smiles: str, framework: str = "rdkit", standardize: bool = Fals
     try:
         smiles = smiles.replace(" ", "+")
         if framework == "rdkit":
-            if "R" in smiles:
-                mol = get_CDK_IAtomContainer(smiles)
-                mol_str = get_CDK_SDG_mol(mol)
-                mol = Chem.MolFromMolBlock(mol_str)
+            r_groups = find_R_groups(smiles) if "R" in smiles else []
+            if r_groups:
+                mol = parse_R_group_SMILES(smiles, r_groups)
             else:
                 mol = Chem.MolFromSmiles(smiles)
             if standardize:
-                mol_block = Chem.MolToMolBlock(mol)
-                standardized_mol = standardizer.standardize_molblock(mol_block)
-                mol = Chem.MolFromMolBlock(standardized_mol)
+                mol = _standardize_rdkit(mol)
         elif framework == "cdk":
             mol = get_CDK_IAtomContainer(smiles)
         elif framework == "openbabel":
@@ -68,5 +409,7 @@ def parse_SMILES(smiles: str, framework: str = "rdkit", standardize: bool = Fals
             mol = get_CDK_IAtomContainer(smiles)
             mol_str = get_CDK_SDG_mol(mol)
             return Chem.MolFromMolBlock(mol_str)
-    except Exception:
-        raise InvalidInputException(name="smiles", value=smiles)
+    except Exception as e:
+        raise InvalidInputException(
+            name="smiles", value=smiles, cacheable=_is_rejection(e)
+        )
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+from app.exception_handlers import ToolkitTimeoutException
+from app.modules.toolkits.cdk_wrapper import get_JClass
+
+CDK_THREADS = int(os.getenv("CDK_THREADS", str(min(4, os.cpu_count() or 1))))
+CDK_TIMEOUT = float(os.getenv("CDK_TIMEOUT", "30"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _attach_thread() -> None:
+    """Attach the current worker thread to the JVM as a daemon thread.
+
+    Runs once per pool thread, so the attach cost is not paid on every
+    call and the JVM can shut down without waiting for idle workers.
+    """
+    get_JClass("java.lang.Thread").attachAsDaemon()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool used for CDK work.
+
+    The pool size is configured with the CDK_THREADS environment variable.
+
+    Returns:
+        ThreadPoolExecutor: The JVM-attached thread pool.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=CDK_THREADS,
+                thread_name_prefix="cdk",
+                initializer=_attach_thread,
+            )
+        return _executor
+
+
+def shutdown_executor() -> None:
+    """Shut down the CDK thread pool if it has been started."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+async def run_in_jvm(
+    func: Callable[..., Any],
+    *args: Any,
+    timeout: Optional[float] = None,
+    **kwargs: Any,
+) -> Any:
+    """Run a blocking CDK call on the JVM thread pool and await its result.
+
+    The event loop stays free to serve other requests while the call runs.
+    A call that exceeds the timeout is reported to the client, but the
+    Java computation itself cannot be interrupted and finishes in the
+    background.
+
+    Args:
+        func (Callable): The function to call.
+        *args: Positional arguments for ``func``.
+        timeout (float, optional): Timeout in seconds. Defaults to CDK_TIMEOUT, a value <= 0 disables it.
+        **kwargs: Keyword arguments for ``func``.
+
+    Returns:
+        Any: The return value of ``func``.
+
+    Raises:
+        ToolkitTimeoutException: If the call does not finish within the timeout.
+    """
+    timeout = CDK_TIMEOUT if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(
+        get_executor(),
+        functools.partial(func, *args, **kwargs),
+    )
+    try:
+        return await asyncio.wait_for(future, timeout if timeout > 0 else None)
+    except asyncio.TimeoutError:
+        raise ToolkitTimeoutException("cdk", timeout)
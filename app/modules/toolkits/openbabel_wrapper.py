@@ -6,6 +6,27 @@ from openbabel import pybel
 from app.exception_handlers import InvalidInputException
 
 
+def get_OBMol(smiles: str) -> ob.OBMol:
+    """Convert a SMILES string to an Open Babel molecule object.
+
+    Args:
+        smiles (str): Input SMILES string.
+
+    Returns:
+        ob.OBMol: Open Babel molecule object.
+    """
+    smiles = smiles.replace(" ", "+")
+
+    mol = ob.OBMol()
+    conv = ob.OBConversion()
+    conv.SetInFormat("smi")
+    conv.ReadString(mol, smiles)
+
+    if mol.NumAtoms() <= 0:
+        raise InvalidInputException(name="smiles", value=smiles)
+    return mol
+
+
 def get_ob_canonical_SMILES(smiles: str) -> str:
     """Convert a SMILES string to Canonical SMILES.
 
@@ -65,22 +86,29 @@ def get_ob_InChI(smiles: str, InChIKey: bool = False) -> str:
         return inchi
 
 
-def get_ob_mol(smiles: str, threeD: bool = False, depict: bool = False) -> str:
+def get_ob_mol(
+    smiles: str,
+    threeD: bool = False,
+    depict: bool = False,
+    input_format: str = "smi",
+) -> str:
     """Convert a SMILES string to a 2D/3D mol block.
 
     Args:
         smiles (str): Input SMILES string.
         threeD (bool, optional): Generate 3D structure. Defaults to False.
         depict (bool, optional): Generate 3D structure for depiction. Defaults to False.
+        input_format (str, optional): Open Babel format code of the input ("smi", "mol", "sdf", "inchi"). Defaults to "smi".
 
     Returns:
         str: Mol block (2D/3D).
     """
-    smiles = smiles.replace(" ", "+")
+    if input_format == "smi":
+        smiles = smiles.replace(" ", "+")
 
     if threeD:
         try:
-            mol = pybel.readstring("smi", smiles)
+            mol = pybel.readstring(input_format, smiles)
         except OSError as e:
             raise InvalidInputException(name="smiles", value=smiles) from e
         else:
@@ -98,15 +126,16 @@ def get_ob_mol(smiles: str, threeD: bool = False, depict: bool = False) -> str:
     mol = ob.OBMol()
 
     conv = ob.OBConversion()
-    conv.SetInAndOutFormats("smi", "mol")
+    conv.SetInAndOutFormats(input_format, "mol")
     conv.ReadString(mol, smiles)
 
     if mol.NumAtoms() <= 0:
         raise InvalidInputException(name="smiles", value=smiles)
     else:
-        # Generate 2D coordinates
-        obBuilder = ob.OBBuilder()
-        obBuilder.Build(mol)
+        # Generate 2D coordinates unless the input already has them
+        if input_format not in ("mol", "sdf"):
+            obBuilder = ob.OBBuilder()
+            obBuilder.Build(mol)
 
         mol_block = conv.WriteString(mol)
         mol_block = mol_block.strip()  # Remove leading/trailing whitespace
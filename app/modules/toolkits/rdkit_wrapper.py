@@ -1,6 +1,14 @@
 from __future__ import annotations
 
+import math
+import os
+import threading
+from functools import lru_cache
+from functools import partial
+from itertools import islice
+from typing import Iterator
 from typing import List
+from typing import Optional
 from typing import Tuple
 from typing import Union
 
@@ -15,13 +23,22 @@ from rdkit.Chem import QED
 from rdkit.Chem import rdFingerprintGenerator
 from rdkit.Chem import rdMolDescriptors
 from rdkit.Chem import rdmolops
+from rdkit.Chem.EnumerateStereoisomers import EnumerateStereoisomers
+from rdkit.Chem.EnumerateStereoisomers import GetStereoisomerCount
+from rdkit.Chem.EnumerateStereoisomers import StereoEnumerationOptions
 from rdkit.Chem.FilterCatalog import FilterCatalog
 from rdkit.Chem.FilterCatalog import FilterCatalogParams
 from rdkit.Contrib.IFG import ifg
 from rdkit.Contrib.SA_Score import sascorer
+from rdkit.Chem.MolStandardize.rdMolStandardize import CleanupParameters
 from rdkit.Chem.MolStandardize.rdMolStandardize import TautomerEnumerator
 from mapchiral.mapchiral import encode, jaccard_similarity
 
+from app.exception_handlers import InvalidInputException
+from app.modules.batch import map_batch
+from app.modules.conformers import get_conformer
+from app.modules.toolkits.helpers import parse_input
+
 
 def check_RO5_violations(molecule: any) -> int:
     """Check the molecule for violations of Lipinski's Rule of Five.
@@ -44,23 +61,103 @@ def check_RO5_violations(molecule: any) -> int:
     return num_of_violations
 
 
-def get_MolVolume(molecule: any) -> float:
+# Van der Waals radii (Angstrom) of CDK's VABCVolume, so that both toolkits
+# report the same volume. These are Bondi radii, except for boron where CDK
+# uses 2.13 instead of Bondi's 1.92.
+VABC_RADII = {
+    "H": 1.20,
+    "C": 1.70,
+    "N": 1.55,
+    "O": 1.52,
+    "F": 1.47,
+    "Cl": 1.75,
+    "Br": 1.85,
+    "I": 1.98,
+    "P": 1.80,
+    "S": 1.80,
+    "As": 1.85,
+    "B": 2.13,
+    "Si": 2.10,
+    "Se": 1.90,
+    "Te": 2.06,
+}
+VABC_VOLUMES = {
+    symbol: 4.0 / 3.0 * math.pi * radius**3 for symbol, radius in VABC_RADII.items()
+}
+
+MOL_VOLUME_METHOD = os.getenv("MOL_VOLUME_METHOD", "vabc")
+
+
+def get_VABC_volume(molecule: Chem.Mol) -> Optional[float]:
+    """Calculate the van der Waals volume with the VABC method.
+
+    Sums the atomic volumes from Bondi radii and subtracts the bond and
+    ring corrections (Zhao, Abraham & Zissimos, J. Org. Chem. 2003), the
+    same group-contribution scheme CDK uses. No 3D coordinates are needed,
+    so the result is fast and deterministic.
+
+    Args:
+        molecule (Chem.Mol): RDKit molecule object.
+
+    Returns:
+        float: The volume in cubic Angstrom, or None if the molecule contains an element without a VABC radius.
+    """
+    volume = 0.0
+    hydrogens = 0
+    for atom in molecule.GetAtoms():
+        atom_volume = VABC_VOLUMES.get(atom.GetSymbol())
+        if atom_volume is None:
+            return None
+        volume += atom_volume
+        hydrogens += atom.GetTotalNumHs()
+    volume += hydrogens * VABC_VOLUMES["H"]
+
+    bonds = molecule.GetNumBonds() + hydrogens
+    aromatic_rings = rdMolDescriptors.CalcNumAromaticRings(molecule)
+    rings = rdMolDescriptors.CalcNumRings(molecule)
+    return (
+        volume - 5.92 * bonds - 14.7 * aromatic_rings - 3.8 * (rings - aromatic_rings)
+    )
+
+
+def get_grid_volume(molecule: Chem.Mol) -> float:
+    """Calculate the grid-based volume on a cached, seeded 3D conformer.
+
+    Args:
+        molecule (Chem.Mol): RDKit molecule object.
+
+    Returns:
+        float: The volume in cubic Angstrom.
+    """
+    conformer = get_conformer(molecule, optimize=False)
+    return AllChem.ComputeMolVolume(conformer, gridSpacing=0.2)
+
+
+def get_MolVolume(molecule: any, method: str = None) -> float:
     """
     Calculate the volume of a molecule.
 
-    This function calculates the volume of a molecule using RDKit's molecular modeling functionalities.
-    It adds hydrogens to the molecule, embeds it into 3D space, and computes the molecular volume.
+    By default the fast topological VABC volume is returned. The grid-based
+    volume of a 3D conformer (0.2 Angstrom grid) is available as an opt-in
+    mode, either per call or for the whole service via the
+    MOL_VOLUME_METHOD environment variable. Molecules containing elements
+    without a VABC radius always use the grid mode.
 
     Args:
         molecule (any): The molecule for which the volume needs to be calculated.
+        method (str, optional): "vabc" or "grid". Defaults to MOL_VOLUME_METHOD.
 
     Returns:
         float: The volume of the molecule.
     """
-    molecule = Chem.AddHs(molecule)
-    AllChem.EmbedMolecule(molecule, useRandomCoords=True)
-    volume = AllChem.ComputeMolVolume(molecule, gridSpacing=0.2)
-    return volume
+    method = method or MOL_VOLUME_METHOD
+    if method == "vabc":
+        volume = get_VABC_volume(molecule)
+        if volume is not None:
+            return volume
+    elif method != "grid":
+        raise ValueError(f"Unsupported volume method: {method}")
+    return get_grid_volume(molecule)
 
 
 def get_rdkit_descriptors(molecule: any) -> Union[tuple, str]:
@@ -119,6 +216,8 @@ def get_rdkit_descriptors(molecule: any) -> Union[tuple, str]:
 def get_3d_conformers(molecule: any, depict=True) -> Chem.Mol:
     """Convert a SMILES string to an RDKit Mol object with 3D coordinates.
 
+    The conformer comes from the shared, cached conformer service.
+
     Args:
         molecule (Chem.Mol): RDKit molecule object.
         depict (bool, optional): If True, returns the molecule's 3D structure in MolBlock format. If False, returns the 3D molecule without hydrogen atoms.
@@ -127,16 +226,7 @@ def get_3d_conformers(molecule: any, depict=True) -> Chem.Mol:
         str or rdkit.Chem.rdchem.Mol: If `depict` is True, returns the 3D structure in MolBlock format. Otherwise, returns an RDKit Mol object.
     """
     if molecule:
-        molecule = Chem.AddHs(molecule)
-        AllChem.EmbedMolecule(molecule, maxAttempts=5000, useRandomCoords=True)
-        try:
-            AllChem.MMFFOptimizeMolecule(molecule)
-        except Exception:
-            AllChem.EmbedMolecule(
-                molecule,
-                maxAttempts=5000,
-                useRandomCoords=True,
-            )
+        molecule = get_conformer(molecule)
         if depict:
             return Chem.MolToMolBlock(molecule)
         else:
@@ -144,6 +234,82 @@ def get_3d_conformers(molecule: any, depict=True) -> Chem.Mol:
             return Chem.MolToMolBlock(molecule)
 
 
+def get_stereoisomer_options(
+    only_unassigned: bool = True,
+    unique: bool = True,
+    try_embedding: bool = False,
+) -> StereoEnumerationOptions:
+    """Return the stereoisomer enumeration options.
+
+    RDKit's own maxIsomers cap switches to random sampling below the total
+    count, which would make pages inconsistent, so the cap is applied by the
+    caller on the lazily generated isomers instead.
+
+    Args:
+        only_unassigned (bool, optional): Only enumerate unassigned stereo centres. Defaults to True.
+        unique (bool, optional): Skip duplicate isomers. Defaults to True.
+        try_embedding (bool, optional): Skip isomers that cannot be embedded in 3D. Defaults to False.
+
+    Returns:
+        StereoEnumerationOptions: The enumeration options.
+    """
+    return StereoEnumerationOptions(
+        onlyUnassigned=only_unassigned,
+        unique=unique,
+        tryEmbedding=try_embedding,
+        maxIsomers=0,
+    )
+
+
+def get_stereoisomer_count(molecule: Chem.Mol, only_unassigned: bool = True) -> int:
+    """Estimate the number of stereoisomers without enumerating them.
+
+    The estimate is 2^n for n stereo elements, an upper bound as
+    duplicates and impossible isomers are not removed.
+
+    Args:
+        molecule (Chem.Mol): RDKit molecule object.
+        only_unassigned (bool, optional): Only count unassigned stereo centres. Defaults to True.
+
+    Returns:
+        int: The estimated number of stereoisomers.
+    """
+    return GetStereoisomerCount(
+        molecule,
+        options=get_stereoisomer_options(only_unassigned=only_unassigned),
+    )
+
+
+def enumerate_stereoisomers(
+    molecule: Chem.Mol,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    only_unassigned: bool = True,
+    unique: bool = True,
+    try_embedding: bool = False,
+) -> Iterator[str]:
+    """Lazily enumerate stereoisomer SMILES in a stable order.
+
+    Args:
+        molecule (Chem.Mol): RDKit molecule object.
+        offset (int, optional): Number of isomers to skip. Defaults to 0.
+        limit (int, optional): Maximum number of isomers to return. Defaults to None (no limit).
+        only_unassigned (bool, optional): Only enumerate unassigned stereo centres. Defaults to True.
+        unique (bool, optional): Skip duplicate isomers. Defaults to True.
+        try_embedding (bool, optional): Skip isomers that cannot be embedded in 3D. Defaults to False.
+
+    Returns:
+        Iterator[str]: Isomeric SMILES of the stereoisomers, none if offset is past the estimated count.
+    """
+    if offset >= get_stereoisomer_count(molecule, only_unassigned):
+        return
+    options = get_stereoisomer_options(only_unassigned, unique, try_embedding)
+    isomers = EnumerateStereoisomers(molecule, options=options)
+    stop = offset + limit if limit is not None else None
+    for isomer in islice(isomers, offset, stop):
+        yield Chem.MolToSmiles(isomer, isomericSmiles=True)
+
+
 def get_tanimoto_similarity_rdkit(
     mol1,
     mol2,
@@ -411,6 +577,109 @@ def get_sas_score(molecule: any) -> float:
         return round(sas_score, 2)
 
 
+ALERT_CATALOGS = {
+    "PAINS_A": FilterCatalogParams.FilterCatalogs.PAINS_A,
+    "PAINS_B": FilterCatalogParams.FilterCatalogs.PAINS_B,
+    "PAINS_C": FilterCatalogParams.FilterCatalogs.PAINS_C,
+    "BRENK": FilterCatalogParams.FilterCatalogs.BRENK,
+    "NIH": FilterCatalogParams.FilterCatalogs.NIH,
+    "ZINC": FilterCatalogParams.FilterCatalogs.ZINC,
+    "CHEMBL": FilterCatalogParams.FilterCatalogs.CHEMBL,
+}
+
+
+@lru_cache(maxsize=None)
+def get_filter_catalog(name: str) -> FilterCatalog:
+    """Return the FilterCatalog for a named alert set, built once per process.
+
+    FilterCatalog matching is thread safe, so the same instance is shared by
+    all requests.
+
+    Args:
+        name (str): "PAINS" or one of the keys of ALERT_CATALOGS.
+
+    Returns:
+        FilterCatalog: The prebuilt catalog.
+    """
+    params = FilterCatalogParams()
+    if name == "PAINS":
+        params.AddCatalog(FilterCatalogParams.FilterCatalogs.PAINS)
+    else:
+        params.AddCatalog(ALERT_CATALOGS[name])
+    return FilterCatalog(params)
+
+
+@lru_cache(maxsize=None)
+def get_alert_catalog(names: Tuple[str, ...]) -> FilterCatalog:
+    """Return a single FilterCatalog combining several alert sets.
+
+    The catalog is built once per combination, so a molecule is matched
+    against all selected alert sets in one pass. Every entry carries the
+    name of its alert set in the "Catalog" property.
+
+    Args:
+        names (Tuple[str, ...]): Sorted keys of ALERT_CATALOGS.
+
+    Returns:
+        FilterCatalog: The combined catalog.
+    """
+    catalog = FilterCatalog()
+    for name in names:
+        params = FilterCatalogParams()
+        params.AddCatalog(ALERT_CATALOGS[name])
+        source = FilterCatalog(params)
+        for index in range(source.GetNumEntries()):
+            entry = source.GetEntryWithIdx(index)
+            entry.SetProp("Catalog", name)
+            catalog.AddEntry(entry)
+    return catalog
+
+
+def get_structural_alerts(
+    molecule: Chem.Mol,
+    catalogs: Optional[List[str]] = None,
+) -> List[dict]:
+    """Match a molecule against several structural alert catalogs at once.
+
+    Args:
+        molecule (Chem.Mol): RDKit molecule object.
+        catalogs (List[str], optional): Names of the alert sets to use. Defaults to all of ALERT_CATALOGS.
+
+    Returns:
+        List[dict]: One entry per matched alert with the catalog name, the alert
+            description, its scope and the indices of the matched atoms.
+
+    Raises:
+        ValueError: If an unknown catalog name is given.
+    """
+    catalogs = list(ALERT_CATALOGS) if catalogs is None else catalogs
+    unknown = [name for name in catalogs if name not in ALERT_CATALOGS]
+    if unknown:
+        raise ValueError(f"Unknown alert catalog(s): {', '.join(unknown)}")
+
+    alerts = []
+    catalog = get_alert_catalog(tuple(sorted(set(catalogs))))
+    for entry in catalog.GetMatches(molecule):
+        atoms = sorted(
+            {
+                atom_index
+                for match in entry.GetFilterMatches(molecule)
+                for _, atom_index in match.atomPairs
+            }
+        )
+        alerts.append(
+            {
+                "catalog": entry.GetProp("Catalog"),
+                "description": entry.GetDescription(),
+                "scope": (
+                    entry.GetProp("Scope") if "Scope" in entry.GetPropList() else ""
+                ),
+                "atoms": atoms,
+            }
+        )
+    return alerts
+
+
 def get_PAINS(molecule: any) -> Union[bool, Tuple[str, str]]:
     """Check if a molecule contains a PAINS (Pan Assay INterference compoundS)substructure.
 
@@ -424,11 +693,7 @@ def get_PAINS(molecule: any) -> Union[bool, Tuple[str, str]]:
     any PAINS substructure. PAINS are known substructures that may interfere
     with various biological assays.
     """
-    params = FilterCatalogParams()
-    params.AddCatalog(FilterCatalogParams.FilterCatalogs.PAINS)
-    catalog = FilterCatalog(params)
-
-    entry = catalog.GetFirstMatch(molecule)
+    entry = get_filter_catalog("PAINS").GetFirstMatch(molecule)
     if entry:
         family = entry.GetProp("Scope")
         description = entry.GetDescription().capitalize()
@@ -608,6 +873,77 @@ def get_ertl_functional_groups(molecule: any) -> list:
             return [{"None": "No fragments found"}]
 
 
+def get_functional_group_key(group_type: str) -> str:
+    """Normalize the type of an Ertl functional group into a stable key.
+
+    The group type is a fragment SMILES that is not always sanitizable, so
+    it is canonicalized without sanitization. Types that cannot be parsed
+    are returned unchanged.
+
+    Args:
+        group_type (str): The ``type`` of a group returned by ifg.identify_functional_groups.
+
+    Returns:
+        str: The canonical group key.
+    """
+    molecule = Chem.MolFromSmiles(group_type, sanitize=False)
+    if molecule is None:
+        return group_type
+    return Chem.MolToSmiles(molecule)
+
+
+def get_functional_group_profile(smiles: str) -> Optional[List[dict]]:
+    """Identify the Ertl functional groups of a molecule given as SMILES.
+
+    Used for batches, which may run in a worker process.
+
+    Args:
+        smiles (str): The SMILES string.
+
+    Returns:
+        List[dict]: The groups with their key, matched atoms SMILES and atom indices, or None if the SMILES string is invalid.
+    """
+    try:
+        molecule = parse_input(smiles, "rdkit", False)
+    except InvalidInputException:
+        return None
+    if molecule is None:
+        return None
+    return [
+        {
+            "key": get_functional_group_key(group.type),
+            "atoms": group.atoms,
+            "atom_ids": list(group.atomIds),
+        }
+        for group in ifg.identify_functional_groups(molecule)
+    ]
+
+
+TAUTOMER_MAX_TAUTOMERS = int(os.getenv("TAUTOMER_MAX_TAUTOMERS", "1000"))
+TAUTOMER_MAX_TRANSFORMS = int(os.getenv("TAUTOMER_MAX_TRANSFORMS", "1000"))
+
+_tautomer_enumerators = threading.local()
+
+
+def get_tautomer_enumerator() -> TautomerEnumerator:
+    """Return the tautomer enumerator of the current thread.
+
+    The enumerator is configured once per thread with the
+    TAUTOMER_MAX_TAUTOMERS and TAUTOMER_MAX_TRANSFORMS limits, which bound
+    the work spent on pathological inputs, and reused for every molecule.
+
+    Returns:
+        TautomerEnumerator: The configured tautomer enumerator.
+    """
+    enumerator = getattr(_tautomer_enumerators, "enumerator", None)
+    if enumerator is None:
+        params = CleanupParameters()
+        params.maxTautomers = TAUTOMER_MAX_TAUTOMERS
+        params.maxTransforms = TAUTOMER_MAX_TRANSFORMS
+        enumerator = _tautomer_enumerators.enumerator = TautomerEnumerator(params)
+    return enumerator
+
+
 def get_standardized_tautomer(
     molecule: any,
     isomeric: bool = True,
@@ -623,19 +959,57 @@ def get_standardized_tautomer(
     """
 
     if molecule:
-        [a.SetAtomMapNum(0) for i, a in enumerate(molecule.GetAtoms())]
-        initial_smiles = Chem.MolToSmiles(
-            molecule, isomericSmiles=isomeric, kekuleSmiles=True
+        molecule = Chem.Mol(molecule)
+        for atom in molecule.GetAtoms():
+            atom.SetAtomMapNum(0)
+        standardized_mol = get_tautomer_enumerator().Canonicalize(molecule)
+        return Chem.MolToSmiles(
+            standardized_mol, isomericSmiles=isomeric, kekuleSmiles=True
         )
-        canonical_mol = Chem.MolFromSmiles(Chem.CanonSmiles(initial_smiles))
-
-        if canonical_mol:
-            te = TautomerEnumerator()
-            standardized_mol = te.Canonicalize(canonical_mol)
-            new_smiles = Chem.MolToSmiles(
-                standardized_mol, isomericSmiles=isomeric, kekuleSmiles=True
-            )
-
-            return new_smiles
     else:
         return "Error Check input SMILES"
+
+
+def get_standardized_tautomer_from_SMILES(
+    smiles: str,
+    isomeric: bool = True,
+) -> Optional[str]:
+    """Generate the standardized tautomer SMILES for a SMILES string.
+
+    Used for batches, which may run in a worker process.
+
+    Args:
+        smiles (str): The SMILES string.
+        isomeric (bool, optional): Flag to generate isomeric SMILES. Defaults to True.
+
+    Returns:
+        str: The standardized tautomer SMILES, or None if the SMILES string is invalid.
+    """
+    try:
+        molecule = parse_input(smiles, "rdkit", False)
+    except InvalidInputException:
+        return None
+    if molecule is None:
+        return None
+    return get_standardized_tautomer(molecule, isomeric)
+
+
+def get_standardized_tautomers(
+    smiles_list: List[str],
+    isomeric: bool = True,
+) -> List[Optional[str]]:
+    """Generate the standardized tautomer SMILES for a list of SMILES strings.
+
+    Large lists are spread over the batch process pool.
+
+    Args:
+        smiles_list (List[str]): The SMILES strings.
+        isomeric (bool, optional): Flag to generate isomeric SMILES. Defaults to True.
+
+    Returns:
+        List[Optional[str]]: The standardized tautomer SMILES, None for invalid SMILES strings.
+    """
+    return map_batch(
+        partial(get_standardized_tautomer_from_SMILES, isomeric=isomeric),
+        smiles_list,
+    )
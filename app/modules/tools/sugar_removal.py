@@ -2,6 +2,33 @@ from __future__ import annotations
 
 import app.modules.toolkits.cdk_wrapper as cdk
 
+sru_base = "de.unijena.cheminf.deglycosylation"
+
+
+def get_sugar_removal_utility(o_glycosidic_only: bool = False):
+    """Return the thread-local SugarRemovalUtility of the requested configuration.
+
+    The detection settings are fixed when the utility is created, so the
+    instances can be reused across requests without leaking settings
+    between the detection and the removal functions.
+
+    Args:
+        o_glycosidic_only (bool): Detect circular sugars only with an O-glycosidic bond. Defaults to False.
+
+    Returns:
+        SugarRemovalUtility: The configured utility instance.
+    """
+
+    def factory():
+        utility = cdk.get_JClass(sru_base + ".SugarRemovalUtility")(
+            cdk.get_builder(),
+        )
+        if o_glycosidic_only:
+            utility.setDetectCircularSugarsOnlyWithOGlycosidicBondSetting(True)
+        return utility
+
+    return cdk.get_engine(("SugarRemovalUtility", o_glycosidic_only), factory)
+
 
 def get_sugar_info(molecule: any) -> tuple:
     """Analyzes a molecule represented by a SMILES string to determine if it.
@@ -17,13 +44,7 @@ def get_sugar_info(molecule: any) -> tuple:
         tuple: A tuple containing two boolean values indicating whether the molecule has linear sugars
                and whether the molecule has circular sugars. If no sugars are found, both values will be False.
     """
-    SCOB = cdk.JClass(cdk.cdk_base + ".silent.SilentChemObjectBuilder")
-
-    sru_base = "de.unijena.cheminf.deglycosylation"
-
-    SugarRemovalUtility = cdk.JClass(sru_base + ".SugarRemovalUtility")(
-        SCOB.getInstance(),
-    )
+    SugarRemovalUtility = get_sugar_removal_utility()
     hasCircularOrLinearSugars = SugarRemovalUtility.hasCircularOrLinearSugars(
         molecule,
     )
@@ -53,18 +74,8 @@ def remove_linear_sugar(molecule: any) -> str:
         ValueError: If there is an issue with parsing the input SMILES string.
     """
 
-    cdk_base = "org.openscience.cdk"
-    SCOB = cdk.JClass(cdk_base + ".silent.SilentChemObjectBuilder")
-    SmiFlavor = cdk.JClass(cdk_base + ".smiles.SmiFlavor")
-    SmilesGenerator = cdk.JClass(cdk_base + ".smiles.SmilesGenerator")(
-        SmiFlavor.Absolute,
-    )
-
-    sru_base = "de.unijena.cheminf.deglycosylation"
-
-    SugarRemovalUtility = cdk.JClass(sru_base + ".SugarRemovalUtility")(
-        SCOB.getInstance(),
-    )
+    SmilesGenerator = cdk.get_smiles_generator(cdk.get_SmiFlavor().Absolute)
+    SugarRemovalUtility = get_sugar_removal_utility()
     hasLinearSugar = SugarRemovalUtility.hasLinearSugars(molecule)
 
     if hasLinearSugar:
@@ -92,25 +103,14 @@ def remove_circular_sugar(molecule: any) -> str:
     Returns:
         str: SMILES string with circular sugars removed, or a message if no circular sugars are found.
     """
-    cdk_base = "org.openscience.cdk"
-    SCOB = cdk.JClass(cdk_base + ".silent.SilentChemObjectBuilder")
-    SmiFlavor = cdk.JClass(cdk_base + ".smiles.SmiFlavor")
-    SmilesGenerator = cdk.JClass(cdk_base + ".smiles.SmilesGenerator")(
-        SmiFlavor.Absolute,
-    )
-
-    sru_base = "de.unijena.cheminf.deglycosylation"
-
-    SugarRemovalUtility = cdk.JClass(sru_base + ".SugarRemovalUtility")(
-        SCOB.getInstance(),
-    )
+    SmilesGenerator = cdk.get_smiles_generator(cdk.get_SmiFlavor().Absolute)
+    SugarRemovalUtility = get_sugar_removal_utility()
     hasCircularSugar = SugarRemovalUtility.hasCircularSugars(molecule)
 
     if hasCircularSugar:
-        SugarRemovalUtility.setDetectCircularSugarsOnlyWithOGlycosidicBondSetting(
-            True,
-        )
-        MoleculeWithoutSugars = SugarRemovalUtility.removeCircularSugars(
+        MoleculeWithoutSugars = get_sugar_removal_utility(
+            o_glycosidic_only=True,
+        ).removeCircularSugars(
             molecule,
             True,
         )
@@ -135,27 +135,16 @@ def remove_linear_and_circular_sugar(molecule: any):
     Returns:
         smiles (str): SMILES string without linear and circular sugars.
     """
-    cdk_base = "org.openscience.cdk"
-    SCOB = cdk.JClass(cdk_base + ".silent.SilentChemObjectBuilder")
-    SmiFlavor = cdk.JClass(cdk_base + ".smiles.SmiFlavor")
-    SmilesGenerator = cdk.JClass(cdk_base + ".smiles.SmilesGenerator")(
-        SmiFlavor.Absolute,
-    )
-
-    sru_base = "de.unijena.cheminf.deglycosylation"
-
-    SugarRemovalUtility = cdk.JClass(sru_base + ".SugarRemovalUtility")(
-        SCOB.getInstance(),
-    )
+    SmilesGenerator = cdk.get_smiles_generator(cdk.get_SmiFlavor().Absolute)
+    SugarRemovalUtility = get_sugar_removal_utility()
     hasCircularOrLinearSugars = SugarRemovalUtility.hasCircularOrLinearSugars(
         molecule,
     )
 
     if hasCircularOrLinearSugars:
-        SugarRemovalUtility.setDetectCircularSugarsOnlyWithOGlycosidicBondSetting(
-            True,
-        )
-        MoleculeWithoutSugars = SugarRemovalUtility.removeCircularAndLinearSugars(
+        MoleculeWithoutSugars = get_sugar_removal_utility(
+            o_glycosidic_only=True,
+        ).removeCircularAndLinearSugars(
             molecule,
             True,
         )
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from prometheus_client import Gauge
+
+WARMUP = os.getenv("WARMUP", "false").lower() == "true"
+WARMUP_STEPS = [
+    step.strip()
+    for step in os.getenv("WARMUP_STEPS", "cdk,opsin,rdkit,stout,decimer").split(",")
+    if step.strip()
+]
+
+WARMUP_SECONDS = Gauge(
+    "cms_warmup_seconds",
+    "Time spent warming up each subsystem at startup.",
+    ["step"],
+)
+
+# Small built-in molecule set: caffeine, aspirin and a glycoside
+WARMUP_MOLECULES = [
+    "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+    "CC(=O)OC1=CC=CC=C1C(=O)O",
+    "OCC1OC(OC2=CC=CC=C2)C(O)C(O)C1O",
+]
+
+_ready = threading.Event()
+_status: Dict[str, str] = {}
+
+
+def _warm_cdk() -> None:
+    from app.modules.depiction import get_cdk_depiction
+    from app.modules.toolkits.cdk_wrapper import get_canonical_SMILES
+    from app.modules.toolkits.cdk_wrapper import get_CDK_descriptors
+    from app.modules.toolkits.cdk_wrapper import get_CDK_SDG_mol
+    from app.modules.toolkits.helpers import parse_input
+    from app.modules.toolkits.jvm_executor import get_executor
+    from app.modules.tools.sugar_removal import get_sugar_info
+
+    def exercise():
+        for smiles in WARMUP_MOLECULES:
+            mol = parse_input(smiles, "cdk", False)
+            get_CDK_SDG_mol(mol)
+            get_canonical_SMILES(mol)
+            get_CDK_descriptors(mol)
+            get_cdk_depiction(mol)
+            get_sugar_info(mol)
+
+    # Run on the CDK pool so its thread-local engines are created as well
+    get_executor().submit(exercise).result()
+
+
+def _warm_opsin() -> None:
+    from app.modules.toolkits.cdk_wrapper import get_smiles_opsin
+
+    get_smiles_opsin("1,3,7-trimethylpurine-2,6-dione")
+
+
+def _warm_rdkit() -> None:
+    from app.modules.npscorer import get_np_score
+    from app.modules.toolkits.helpers import parse_input
+    from app.modules.toolkits.rdkit_wrapper import get_PAINS
+    from app.modules.toolkits.rdkit_wrapper import get_rdkit_descriptors
+    from app.modules.toolkits.rdkit_wrapper import get_sas_score
+
+    for smiles in WARMUP_MOLECULES:
+        mol = parse_input(smiles, "rdkit", False)
+        get_rdkit_descriptors(mol)
+        get_PAINS(mol)
+        get_np_score(mol)
+        get_sas_score(mol)
+
+
+def _warm_stout() -> None:
+    from STOUT import translate_forward
+
+    translate_forward(WARMUP_MOLECULES[0])
+
+
+def _warm_decimer() -> None:
+    if os.getenv("INCLUDE_OCSR", "true").lower() != "true":
+        return
+    from DECIMER import predict_SMILES
+    from rdkit import Chem
+    from rdkit.Chem import Draw
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "warmup.png")
+        Draw.MolToFile(Chem.MolFromSmiles(WARMUP_MOLECULES[0]), path, size=(512, 512))
+        predict_SMILES(path)
+
+
+WARMUP_FUNCTIONS: Dict[str, Callable[[], None]] = {
+    "cdk": _warm_cdk,
+    "opsin": _warm_opsin,
+    "rdkit": _warm_rdkit,
+    "stout": _warm_stout,
+    "decimer": _warm_decimer,
+}
+
+
+def run_warmup(steps: Optional[List[str]] = None) -> Dict[str, str]:
+    """Exercise each enabled subsystem once with the built-in molecules.
+
+    A failing step is recorded and does not stop the remaining steps, the
+    service is marked ready once all steps have run.
+
+    Args:
+        steps (List[str], optional): Names of the steps to run. Defaults to WARMUP_STEPS.
+
+    Returns:
+        Dict[str, str]: Status of each step, "ok" or the error message.
+    """
+    for step in steps if steps is not None else WARMUP_STEPS:
+        function = WARMUP_FUNCTIONS.get(step)
+        if function is None:
+            _status[step] = "unknown step"
+            continue
+        start = time.perf_counter()
+        try:
+            function()
+            _status[step] = "ok"
+        except Exception as e:
+            _status[step] = str(e)
+        elapsed = time.perf_counter() - start
+        WARMUP_SECONDS.labels(step).set(elapsed)
+        print(f"Warm-up step {step} finished in {elapsed:.2f}s: {_status[step]}")
+    _ready.set()
+    return dict(_status)
+
+
+def start_warmup() -> None:
+    """Start the warm-up in a background thread if WARMUP is enabled.
+
+    Without warm-up the service is ready immediately.
+    """
+    if WARMUP:
+        threading.Thread(target=run_warmup, name="warmup", daemon=True).start()
+    else:
+        _ready.set()
+
+
+def is_ready() -> bool:
+    """Return True once the warm-up has finished."""
+    return _ready.is_set()
+
+
+def get_warmup_status() -> Dict[str, str]:
+    """Return the status of the warm-up steps that have run so far."""
+    return dict(_status)
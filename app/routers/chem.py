@@ -1,7 +1,12 @@
 from __future__ import annotations
 
 import io
+import json
+import os
 from typing import Annotated
+from typing import Any
+from typing import Dict
+from typing import List
 from typing import Literal
 from typing import Optional
 from typing import Union
@@ -13,38 +18,48 @@ from fastapi import APIRouter
 from fastapi import Body
 from fastapi import HTTPException
 from fastapi import Query
+from fastapi import Request
 from fastapi import status
 from fastapi.responses import JSONResponse
 from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from fastapi.templating import Jinja2Templates
 from rdkit import Chem
-from rdkit.Chem.EnumerateStereoisomers import (
-    EnumerateStereoisomers,
-)
 
-from app.modules.all_descriptors import get_tanimoto_similarity
+from app.exception_handlers import ToolkitTimeoutException
+from app.modules.all_descriptors import iter_tanimoto_similarity
+from app.modules.all_descriptors import SIMILARITY_EDGE_FORMATS
+from app.modules.all_descriptors import SIMILARITY_MEDIA_TYPES
+from app.modules.batch import iter_chunks
+from app.modules.batch import map_batch
+from app.modules.batch import spool_request
 from app.modules.classyfire import classify
 from app.modules.classyfire import result
 from app.modules.coconut.descriptors import get_COCONUT_descriptors
 from app.modules.coconut.preprocess import get_COCONUT_preprocessing
+from app.modules.filters import filter_molecules
+from app.modules.filters import get_filter_names
+from app.modules.filters import get_filter_plan
 from app.modules.npscorer import get_np_score
+from app.modules.scores import get_scores
+from app.modules.similarity import get_fingerprint_matrix
 from app.modules.toolkits.cdk_wrapper import get_CDK_HOSE_codes
 from app.modules.toolkits.cdk_wrapper import get_tanimoto_similarity_CDK
 from app.modules.toolkits.helpers import parse_input
-from app.modules.toolkits.rdkit_wrapper import check_RO5_violations
+from app.modules.toolkits.jvm_executor import run_in_jvm
+from app.modules.toolkits.rdkit_wrapper import ALERT_CATALOGS
+from app.modules.toolkits.rdkit_wrapper import enumerate_stereoisomers
 from app.modules.toolkits.rdkit_wrapper import get_ertl_functional_groups
-from app.modules.toolkits.rdkit_wrapper import get_GhoseFilter
-from app.modules.toolkits.rdkit_wrapper import get_PAINS
+from app.modules.toolkits.rdkit_wrapper import get_functional_group_profile
 from app.modules.toolkits.rdkit_wrapper import get_properties
 from app.modules.toolkits.rdkit_wrapper import get_rdkit_HOSE_codes
-from app.modules.toolkits.rdkit_wrapper import get_REOSFilter
-from app.modules.toolkits.rdkit_wrapper import get_RuleofThree
-from app.modules.toolkits.rdkit_wrapper import get_sas_score
-from app.modules.toolkits.rdkit_wrapper import get_tanimoto_similarity_rdkit
-from app.modules.toolkits.rdkit_wrapper import get_VeberFilter
 from app.modules.toolkits.rdkit_wrapper import get_standardized_tautomer
-from app.modules.toolkits.rdkit_wrapper import QED
+from app.modules.toolkits.rdkit_wrapper import get_standardized_tautomers
+from app.modules.toolkits.rdkit_wrapper import get_stereoisomer_count
+from app.modules.toolkits.rdkit_wrapper import get_structural_alerts
+from app.modules.toolkits.rdkit_wrapper import get_tanimoto_similarity_rdkit
 from app.schemas import HealthCheck
+from app.schemas.chem_schema import CustomFilterResponse
 from app.schemas.chem_schema import FilteredMoleculesResponse
 from app.schemas.chem_schema import GenerateDescriptorsResponse
 from app.schemas.chem_schema import GenerateFunctionalGroupResponse
@@ -53,9 +68,12 @@ from app.schemas.chem_schema import GenerateMultipleDescriptorsResponse
 from app.schemas.chem_schema import GenerateStandardizeResponse
 from app.schemas.chem_schema import GenerateStereoisomersResponse
 from app.schemas.chem_schema import NPlikelinessScoreResponse
+from app.schemas.chem_schema import ScoresResponse
+from app.schemas.chem_schema import StandardizedTautomersResponse
+from app.schemas.chem_schema import StandarizedTautomerResponse
+from app.schemas.chem_schema import StructuralAlertsResponse
 from app.schemas.chem_schema import TanimotoMatrixResponse
 from app.schemas.chem_schema import TanimotoSimilarityResponse
-from app.schemas.chem_schema import StandarizedTautomerResponse
 from app.schemas.chemblstandardizer import SMILESStandardizedResult
 from app.schemas.chemblstandardizer import SMILESValidationResult
 from app.schemas.classyfire import ClassyFireJob
@@ -79,6 +97,8 @@ router = APIRouter(
 
 templates = Jinja2Templates(directory="app/templates")
 
+MAX_STEREOISOMERS = int(os.getenv("MAX_STEREOISOMERS", "10000"))
+
 
 @router.get("/", include_in_schema=False)
 @router.get(
@@ -131,13 +151,51 @@ async def get_stereoisomers(
             },
         },
     ),
+    max_isomers: int = Query(
+        default=min(1024, MAX_STEREOISOMERS),
+        ge=1,
+        le=MAX_STEREOISOMERS,
+        description="Maximum number of stereoisomers to return",
+    ),
+    offset: int = Query(
+        default=0,
+        ge=0,
+        le=MAX_STEREOISOMERS,
+        description="Number of stereoisomers to skip, for pagination",
+    ),
+    only_unassigned: bool = Query(
+        default=True,
+        description="Only enumerate unassigned stereo centres",
+    ),
+    unique: bool = Query(
+        default=True,
+        description="Skip duplicate stereoisomers",
+    ),
+    try_embedding: bool = Query(
+        default=False,
+        description="Skip stereoisomers that cannot be embedded in 3D (slow)",
+    ),
+    format: Literal["json", "ndjson"] = Query(
+        default="json",
+        description="Desired output format, ndjson streams isomers as they are generated",
+    ),
 ):
     """For a given SMILES string this function enumerates all possible.
 
     stereoisomers.
 
+    Isomers are generated lazily in a stable order and at most max_isomers
+    of them are returned, starting at offset. The estimated total count is
+    returned in the X-Stereoisomer-Count header.
+
     Parameters:
     - **SMILES**: required (query parameter): The SMILES string to be enumerated.
+    - **max_isomers**: optional (int): Maximum number of stereoisomers to return. Defaults to 1024.
+    - **offset**: optional (int): Number of stereoisomers to skip, at most MAX_STEREOISOMERS. Defaults to 0.
+    - **only_unassigned**: optional (bool): Only enumerate unassigned stereo centres. Defaults to True.
+    - **unique**: optional (bool): Skip duplicate stereoisomers. Defaults to True.
+    - **try_embedding**: optional (bool): Skip stereoisomers that cannot be embedded in 3D. Defaults to False.
+    - **format**: optional (str): "json" (sorted list) or "ndjson" (one isomer per line, streamed). Defaults to "json".
 
     Returns:
     - List[str]: A list of stereoisomer SMILES strings if successful, otherwise returns an error message.
@@ -147,11 +205,28 @@ async def get_stereoisomers(
     """
     mol = parse_input(smiles, "rdkit", False)
     if mol:
-        isomers = tuple(EnumerateStereoisomers(mol))
-        smilesArray = []
-        for smi in sorted(Chem.MolToSmiles(x, isomericSmiles=True) for x in isomers):
-            smilesArray.append(smi)
-        return smilesArray
+        headers = {
+            "X-Stereoisomer-Count": str(get_stereoisomer_count(mol, only_unassigned)),
+        }
+        isomers = enumerate_stereoisomers(
+            mol,
+            offset=offset,
+            limit=max_isomers,
+            only_unassigned=only_unassigned,
+            unique=unique,
+            try_embedding=try_embedding,
+        )
+        if format == "ndjson":
+            lines = (
+                json.dumps({"index": index, "smiles": isomer}) + "\n"
+                for index, isomer in enumerate(isomers, start=offset)
+            )
+            return StreamingResponse(
+                lines,
+                media_type="application/x-ndjson",
+                headers=headers,
+            )
+        return JSONResponse(content=sorted(isomers), headers=headers)
 
 
 @router.get(
@@ -375,8 +450,8 @@ async def hose_codes(
     - ValueError: If the SMILES string is not provided or is invalid.
     """
     if toolkit == "cdk":
-        mol = parse_input(smiles, "cdk", False)
-        hose_codes = await get_CDK_HOSE_codes(mol, spheres, ringsize)
+        mol = await run_in_jvm(parse_input, smiles, "cdk", False)
+        hose_codes = await run_in_jvm(get_CDK_HOSE_codes, mol, spheres, ringsize)
     elif toolkit == "rdkit":
         mol = parse_input(smiles, "rdkit", False)
         hose_codes = await get_rdkit_HOSE_codes(mol, spheres)
@@ -615,6 +690,51 @@ async def np_likeness_score(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post(
+    "/scores",
+    summary="Calculate NP-likeness, SA and QED scores for a list of molecules",
+    responses={
+        200: {
+            "description": "Successful response",
+            "model": List[ScoresResponse],
+        },
+        400: {"description": "Bad Request", "model": BadRequestModel},
+        404: {"description": "Not Found", "model": NotFoundModel},
+        422: {"description": "Unprocessable Entity", "model": ErrorResponse},
+    },
+)
+def get_scores_batch(
+    smiles_list: str = Body(
+        embed=False,
+        media_type="text/plain",
+        openapi_examples={
+            "example1": {
+                "summary": "Example: Caffeine, Glucose",
+                "value": "CN1C=NC2=C1C(=O)N(C(=O)N2C)C\nOCC1OC(O)C(O)C(O)C1O",
+            },
+        },
+    ),
+):
+    """Calculate the NP-likeness, SA and QED scores of a list of molecules.
+
+    The Morgan environments used by the NP-likeness and the SA models are
+    computed once per molecule, and large lists are scored on the batch
+    process pool.
+
+    Parameters:
+    - **smiles_list**: required (str): Newline separated SMILES strings.
+
+    Returns:
+    - List[dict]: For each molecule, the input SMILES and its scores rounded to two decimal places,
+      null for an invalid SMILES string.
+    """
+    smiles = [line.strip() for line in smiles_list.splitlines() if line.strip()]
+    return [
+        {"smiles": item, "scores": scores}
+        for item, scores in zip(smiles, get_scores(smiles))
+    ]
+
+
 @router.get(
     "/tanimoto",
     summary="Generates the Tanimoto similarity index for a given pair of SMILES strings",
@@ -663,6 +783,16 @@ async def tanimoto_similarity(
         title="radius size - ECFP",
         description="ECFP 2/4/6 are allowed for using CDK Circular fingerprinter and for MAPC default is radius 2 and permutations 2048. The default is 6",
     ),
+    format: Literal["html", "json", "csv", "ndjson", "npy"] = Query(
+        "html",
+        description="Output format of the similarity matrix for more than two molecules, streamed row by row",
+    ),
+    threshold: Optional[float] = Query(
+        None,
+        ge=0,
+        le=1,
+        description="Return only the pairs (i, j, similarity) with at least this similarity instead of the full matrix, in json, csv or ndjson format",
+    ),
 ):
     """Calculate the Tanimoto similarity index for a pair of SMILES strings.
 
@@ -674,9 +804,11 @@ async def tanimoto_similarity(
         fingerprinter (Literal["RDKit", "Atompairs", "MACCS","Pubchem","ECFP"]): The molecule fingerprint generation algorithm to use for RDKit (supports: "RDKit", "Atompairs", "MACCS" and "ECFP") and CDK (supports: "Pubchem" and"ECFP").
         nBits (int, optional): The number of bits for fingerprint vectors in RDKit. Ignored for MACCS keys. Defaults to 2048.
         radius (int, optional): The radius size for ECFP (Circular Fingerprints) when using CDK. Defaults to 6.
+        format (Literal["html", "json", "csv", "ndjson", "npy"]): The output format of the similarity matrix for more than two molecules: an HTML table, a JSON list of rows, CSV, one {"index", "similarities"} object per line or a float32 NumPy array. Defaults to "html".
+        threshold (float, optional): For more than two molecules, return the sparse edge list of the pairs with at least this similarity, each pair once with i < j. Requires the "json", "csv" or "ndjson" format.
 
     Returns:
-        The Tanimoto similarity index as a floating-point value.
+        The Tanimoto similarity index as a floating-point value, or the similarity matrix in the requested format for more than two molecules.
 
     Raises:
         HTTPException: Raised when there is an error reading SMILES strings or invalid input.
@@ -704,9 +836,10 @@ async def tanimoto_similarity(
                     nBits,
                 )
             else:
-                mol1 = parse_input(smiles1, "cdk", False)
-                mol2 = parse_input(smiles2, "cdk", False)
-                Tanimoto = get_tanimoto_similarity_CDK(
+                mol1 = await run_in_jvm(parse_input, smiles1, "cdk", False)
+                mol2 = await run_in_jvm(parse_input, smiles2, "cdk", False)
+                Tanimoto = await run_in_jvm(
+                    get_tanimoto_similarity_CDK,
                     mol1,
                     mol2,
                     fingerprinter,
@@ -714,6 +847,8 @@ async def tanimoto_similarity(
                     nBits,
                 )
             return float(Tanimoto)
+        except ToolkitTimeoutException:
+            raise
         except Exception:
             raise HTTPException(
                 status_code=422,
@@ -721,14 +856,46 @@ async def tanimoto_similarity(
             )
 
     elif len(smiles.split(",")) > 2:
+        if threshold is not None and format not in SIMILARITY_EDGE_FORMATS:
+            raise HTTPException(
+                status_code=422,
+                detail="A threshold requires the json, csv or ndjson format.",
+            )
         try:
-            matrix = get_tanimoto_similarity(smiles, toolkit)
-            return Response(content=matrix, media_type="text/html")
+            if toolkit == "rdkit":
+                fingerprints = get_fingerprint_matrix(
+                    molecules,
+                    toolkit,
+                    fingerprinter,
+                    nBits,
+                    radius,
+                )
+            else:
+                fingerprints = await run_in_jvm(
+                    get_fingerprint_matrix,
+                    molecules,
+                    toolkit,
+                    fingerprinter,
+                    nBits,
+                    radius,
+                )
+        except ToolkitTimeoutException:
+            raise
         except Exception:
             raise HTTPException(
                 status_code=422,
                 detail="Error reading SMILES string, please check again.",
             )
+        return StreamingResponse(
+            iter_tanimoto_similarity(
+                fingerprints,
+                toolkit,
+                fingerprinter,
+                format,
+                threshold,
+            ),
+            media_type=SIMILARITY_MEDIA_TYPES[format],
+        )
     else:
         raise HTTPException(
             status_code=422,
@@ -799,6 +966,8 @@ async def coconut_preprocessing(
                 status_code=422,
                 detail="Error reading SMILES string, please check again.",
             )
+    except ToolkitTimeoutException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=422,
@@ -972,88 +1141,205 @@ async def all_filter_molecules(
         title="NPlikenessScore",
         description="Calculate NPlikenessScore in the range (e.g., 0-10)",
     ),
+    format: Literal["text", "json"] = Query(
+        default="text",
+        description="Desired output format",
+    ),
 ):
+    """Filters a list of molecules with the selected rule sets and score ranges.
+
+    The descriptors needed by the selected filters are computed once per
+    molecule and all filters are evaluated over the whole batch at once.
+
+    Parameters:
+    - **smiles_list**: required (str): Newline separated SMILES strings.
+    - **pains**, **lipinski**, **veber**, **reos**, **ghose**, **ruleofthree**: optional (bool): Filters to apply.
+    - **qedscore**, **sascore**, **nplikeness**: optional (str): Score ranges to check (e.g., 0-10).
+    - **format**: optional (str): "text" (default) or "json".
+
+    Returns:
+    - text: One "SMILES : T, F, ..." line per molecule.
+    - json: The SMILES and one boolean column per applied filter.
+    """
+    smiles = [item.strip() for item in io.StringIO(smiles_list) if item.strip()]
+    molecules = [parse_input(item, "rdkit", False) for item in smiles]
+
+    selected = {
+        "pains": pains,
+        "lipinski": lipinski,
+        "veber": veber,
+        "reos": reos,
+        "ghose": ghose,
+        "ruleofthree": ruleofthree,
+    }
+    columns = filter_molecules(
+        molecules,
+        [rule for rule, enabled in selected.items() if enabled],
+        {"qedscore": qedscore, "sascore": sascore, "nplikeness": nplikeness},
+    )
+
+    if format == "json":
+        response = {"smiles": smiles}
+        response.update({name: column.tolist() for name, column in columns.items()})
+        return JSONResponse(content=response)
+
     all_smiles = []
+    for index, item in enumerate(smiles):
+        flags = ["T" if column[index] else "F" for column in columns.values()]
+        all_smiles.append(" : ".join([item, ", ".join(flags)]) if flags else item + ":")
+    return all_smiles
+
+
+@router.post(
+    "/structural-alerts",
+    summary="Match molecules against structural alert catalogs",
+    responses={
+        200: {
+            "description": "Successful response",
+            "model": StructuralAlertsResponse,
+        },
+        400: {"description": "Bad Request", "model": BadRequestModel},
+        404: {"description": "Not Found", "model": NotFoundModel},
+        422: {"description": "Unprocessable Entity", "model": ErrorResponse},
+    },
+)
+async def structural_alerts(
+    smiles_list: str = Body(
+        embed=False,
+        media_type="text/plain",
+        openapi_examples={
+            "example1": {
+                "summary": "Example: Caffeine, Quinone",
+                "value": "CN1C=NC2=C1C(=O)N(C(=O)N2C)C\nO=C1C=CC(=O)C=C1",
+            },
+        },
+    ),
+    catalogs: str = Query(
+        default=",".join(ALERT_CATALOGS),
+        title="Alert catalogs",
+        description="Comma separated alert catalogs: PAINS_A, PAINS_B, PAINS_C, BRENK, NIH, ZINC, CHEMBL",
+    ),
+):
+    """Match a list of molecules against structural alert catalogs.
+
+    All selected catalogs are built once per process and every molecule is
+    matched against them in a single pass.
+
+    Parameters:
+    - **smiles_list**: required (str): Newline separated SMILES strings.
+    - **catalogs**: optional (str): Comma separated alert catalogs. Defaults to all.
+
+    Returns:
+    - List[dict]: For each molecule, the SMILES and the matched alerts with catalog name,
+      description, scope and matched atom indices.
+
+    Raises:
+    - HTTPException 422: If an unknown catalog is requested or a SMILES string is invalid.
+    """
+    selected = [name.strip().upper() for name in catalogs.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in ALERT_CATALOGS]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown alert catalog(s): {', '.join(unknown)}",
+        )
+
+    results = []
     for item in io.StringIO(smiles_list):
         smiles = item.strip()
+        if not smiles:
+            continue
         mol = parse_input(smiles, "rdkit", False)
-        results = []
-        results.append(smiles + ":")
-        if mol:
-            if pains:
-                pains_status = str(get_PAINS(mol))
-                if "family" in pains_status:
-                    results.append("True")
-                else:
-                    results.append("False")
-            if lipinski:
-                lipinski_violations = check_RO5_violations(mol)
-                if lipinski_violations == 0:
-                    results.append("True")
-                else:
-                    results.append("False")
-
-            if veber:
-                if get_VeberFilter(mol) == "True":
-                    results.append("True")
-                else:
-                    results.append("False")
-            if reos:
-                if get_REOSFilter(mol) == "True":
-                    results.append("True")
-                else:
-                    results.append("False")
-
-            if ghose:
-                if get_GhoseFilter(mol) == "True":
-                    results.append("True")
-                else:
-                    results.append("False")
-
-            if ruleofthree:
-                if get_RuleofThree(mol) == "True":
-                    results.append("True")
-                else:
-                    results.append("False")
-
-            if len(qedscore.split("-")) == 2:
-                range_start, range_end = float(qedscore.split("-")[0]), float(
-                    qedscore.split("-")[1],
-                )
-                qed_value = QED.qed(mol)
-                if range_start <= qed_value <= range_end:
-                    results.append("True")
-                else:
-                    results.append("False")
-
-            if len(sascore.split("-")) == 2:
-                range_start, range_end = float(sascore.split("-")[0]), float(
-                    sascore.split("-")[1],
-                )
-                sascore_value = get_sas_score(mol)
-                if range_start <= sascore_value <= range_end:
-                    results.append("True")
-                else:
-                    results.append("False")
-
-            if len(nplikeness.split("-")) == 2:
-                range_start, range_end = float(nplikeness.split("-")[0]), float(
-                    nplikeness.split("-")[1],
-                )
-                nplikeness_value = get_np_score(mol)
-                if range_start <= float(nplikeness_value) <= range_end:
-                    results.append("True")
-                else:
-                    results.append("False")
-
-            output_list = [
-                x if x != "True" and x != "False" else ("T" if x == "True" else "F")
-                for x in results
-            ]
-            final_results = ", ".join(output_list).replace(":,", " : ")
-            all_smiles.append(final_results)
+        results.append(
+            {"smiles": smiles, "alerts": get_structural_alerts(mol, selected)},
+        )
+    return results
 
-    return all_smiles
+
+@router.get(
+    "/custom-filters",
+    summary="List the named filters available to /custom-filters",
+    responses={
+        200: {"description": "Successful response"},
+    },
+)
+async def list_custom_filters():
+    """List the built-in rule sets and the filters registered on the server.
+
+    Filters are registered at startup from the JSON file given by the
+    FILTER_DEFINITIONS environment variable, mapping names to filter
+    specifications.
+
+    Returns:
+    - List[str]: The filter names.
+    """
+    return get_filter_names()
+
+
+@router.post(
+    "/custom-filters",
+    summary="Filter molecules with a declarative filter specification",
+    responses={
+        200: {
+            "description": "Successful response",
+            "model": List[CustomFilterResponse],
+        },
+        400: {"description": "Bad Request", "model": BadRequestModel},
+        404: {"description": "Not Found", "model": NotFoundModel},
+        422: {"description": "Unprocessable Entity", "model": ErrorResponse},
+    },
+)
+def custom_filters(
+    smiles: List[str] = Body(
+        embed=True,
+        title="SMILES",
+        description="SMILES strings of the molecules to filter",
+        examples=[["CN1C=NC2=C1C(=O)N(C(=O)N2C)C", "CC(=O)OC1=CC=CC=C1C(=O)O"]],
+    ),
+    filter: Union[str, Dict[str, Any]] = Body(
+        embed=True,
+        title="Filter",
+        description="A filter specification or the name of a registered filter",
+        examples=[
+            {
+                "all": [
+                    {"descriptor": "MolWt", "min": 150, "max": 350},
+                    {"descriptor": "MolLogP", "max": 3},
+                    {"not": {"smarts": "[N+](=O)[O-]"}},
+                    {"any": [{"rule": "lipinski"}, {"rule": "ruleofthree"}]},
+                ],
+            },
+        ],
+    ),
+):
+    """Filter a batch of molecules with a declarative filter specification.
+
+    A specification combines descriptor windows
+    (``{"descriptor": "MolWt", "min": 150, "max": 350}``), SMARTS patterns
+    (``{"smarts": "[N+](=O)[O-]"}``) and built-in rule sets
+    (``{"rule": "lipinski"}``) with ``all``, ``any`` and ``not``. Only the
+    descriptors it references are computed, once per molecule.
+
+    Parameters:
+    - **smiles**: required (List[str]): SMILES strings of the molecules to filter.
+    - **filter**: required (Union[str, dict]): A filter specification or the name of a registered filter.
+
+    Returns:
+    - List[dict]: For each molecule, the SMILES and whether it passed the filter.
+
+    Raises:
+    - HTTPException 422: If the filter is unknown or invalid, or a SMILES string is invalid.
+    """
+    try:
+        plan = get_filter_plan(filter)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    molecules = [parse_input(item, "rdkit", False) for item in smiles]
+    passed = plan.evaluate(molecules)
+    return [
+        {"smiles": item, "passed": bool(result)} for item, result in zip(smiles, passed)
+    ]
 
 
 @router.get(
@@ -1112,6 +1398,87 @@ async def get_functional_groups(
         )
 
 
+@router.post(
+    "/ertlfunctionalgroup/profile",
+    summary="Profile the Ertl functional groups of a compound library",
+    responses={
+        200: {
+            "description": "Successful response, newline delimited JSON",
+            "content": {"application/x-ndjson": {}},
+        },
+        400: {"description": "Bad Request", "model": BadRequestModel},
+        404: {"description": "Not Found", "model": NotFoundModel},
+        422: {"description": "Unprocessable Entity", "model": ErrorResponse},
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/plain": {
+                    "schema": {"type": "string"},
+                    "example": "CN1C=NC2=C1C(=O)N(C(=O)N2C)C\nCC(=O)OC1=CC=CC=C1C(=O)O",
+                },
+            },
+        },
+    },
+)
+async def get_functional_group_profile_batch(
+    request: Request,
+    include_molecules: bool = Query(
+        default=True,
+        description="Stream the groups of each molecule before the aggregated counts",
+    ),
+):
+    """Identify the Ertl functional groups of every molecule in a library.
+
+    The newline separated SMILES are processed in chunks on the batch
+    process pool and the results are streamed as newline delimited JSON,
+    so memory use does not grow with the size of the library. Group types
+    are normalized into canonical keys.
+
+    Parameters:
+    - **body**: required (str): Newline separated SMILES strings.
+    - **include_molecules**: optional (bool): Stream the groups of each molecule. Defaults to True.
+
+    Returns:
+    - One line per molecule with its index, SMILES and groups (key, atoms and atom indices,
+      null for an invalid SMILES string), followed by a summary line with the number of
+      molecules, the number of invalid SMILES and, per group key, the number of occurrences
+      and of molecules containing it.
+    """
+    spool = await spool_request(request)
+
+    def generate():
+        counts = {}
+        molecules = invalid = index = 0
+        with spool:
+            for chunk in iter_chunks(spool):
+                profiles = map_batch(get_functional_group_profile, chunk)
+                for smiles, groups in zip(chunk, profiles):
+                    if groups is None:
+                        invalid += 1
+                    else:
+                        molecules += 1
+                        keys = [group["key"] for group in groups]
+                        for key in keys:
+                            counts.setdefault(key, {"occurrences": 0, "molecules": 0})
+                            counts[key]["occurrences"] += 1
+                        for key in set(keys):
+                            counts[key]["molecules"] += 1
+                    if include_molecules:
+                        yield json.dumps(
+                            {"index": index, "smiles": smiles, "groups": groups},
+                        ) + "\n"
+                    index += 1
+        counts = dict(
+            sorted(counts.items(), key=lambda item: -item[1]["occurrences"]),
+        )
+        summary = {"molecules": molecules, "invalid": invalid, "counts": counts}
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.get(
     "/standarizedTautomer",
     summary="Standardize tautomeric SMILES using RDKit EnumerateStereoisomers module",
@@ -1145,3 +1512,54 @@ async def get_standardized_tautomer_smiles(
     if mol:
         standardized_smiles = get_standardized_tautomer(mol)
         return standardized_smiles
+
+
+@router.post(
+    "/standardized-tautomers",
+    summary="Standardize the tautomers of a list of molecules",
+    responses={
+        200: {
+            "description": "Successful response",
+            "model": List[StandardizedTautomersResponse],
+        },
+        400: {"description": "Bad Request", "model": BadRequestModel},
+        404: {"description": "Not Found", "model": NotFoundModel},
+        422: {"description": "Unprocessable Entity", "model": ErrorResponse},
+    },
+)
+def get_standardized_tautomers_batch(
+    smiles_list: str = Body(
+        embed=False,
+        media_type="text/plain",
+        openapi_examples={
+            "example1": {
+                "summary": "Example: 2-Hydroxypyridine, Caffeine",
+                "value": "Oc1ccccn1\nCN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+            },
+        },
+    ),
+    isomeric: bool = Query(
+        default=True,
+        description="Generate isomeric SMILES",
+    ),
+):
+    """Standardize the tautomers of a list of molecules.
+
+    Each worker reuses one tautomer enumerator, limited by
+    TAUTOMER_MAX_TAUTOMERS and TAUTOMER_MAX_TRANSFORMS, and large lists are
+    processed on the batch process pool.
+
+    Parameters:
+    - **smiles_list**: required (str): Newline separated SMILES strings.
+    - **isomeric**: optional (bool): Generate isomeric SMILES. Defaults to True.
+
+    Returns:
+    - List[dict]: For each molecule, the input SMILES and the standardized tautomer SMILES,
+      null for an invalid SMILES string.
+    """
+    smiles = [line.strip() for line in smiles_list.splitlines() if line.strip()]
+    tautomers = get_standardized_tautomers(smiles, isomeric)
+    return [
+        {"smiles": item, "tautomer": tautomer}
+        for item, tautomer in zip(smiles, tautomers)
+    ]
@@ -17,12 +17,14 @@ from rdkit import Chem
 from STOUT import translate_forward
 from STOUT import translate_reverse
 
+from app.exception_handlers import ToolkitTimeoutException
 from app.modules.toolkits.cdk_wrapper import get_canonical_SMILES
 from app.modules.toolkits.cdk_wrapper import get_CDK_SDG_mol
 from app.modules.toolkits.cdk_wrapper import get_CXSMILES
 from app.modules.toolkits.cdk_wrapper import get_InChI
 from app.modules.toolkits.cdk_wrapper import get_smiles_opsin
 from app.modules.toolkits.helpers import parse_input
+from app.modules.toolkits.jvm_executor import run_in_jvm
 from app.modules.toolkits.openbabel_wrapper import get_ob_canonical_SMILES
 from app.modules.toolkits.openbabel_wrapper import get_ob_InChI
 from app.modules.toolkits.openbabel_wrapper import get_ob_mol
@@ -141,9 +143,9 @@ async def create2d_coordinates(
     - ValueError: If the SMILES string is not provided or is invalid.
     """
     if toolkit == "cdk":
-        mol = parse_input(smiles, "cdk", False)
+        mol = await run_in_jvm(parse_input, smiles, "cdk", False)
         return Response(
-            content=get_CDK_SDG_mol(mol).replace("$$$$\n", ""),
+            content=(await run_in_jvm(get_CDK_SDG_mol, mol)).replace("$$$$\n", ""),
             media_type="text/plain",
         )
     elif toolkit == "rdkit":
@@ -288,7 +290,7 @@ async def iupac_name_or_selfies_to_smiles(
     try:
         if representation == "iupac":
             if converter == "opsin":
-                iupac_name = get_smiles_opsin(input_text)
+                iupac_name = await run_in_jvm(get_smiles_opsin, input_text)
             else:
                 iupac_name = translate_reverse(input_text)
             if iupac_name:
@@ -302,6 +304,8 @@ async def iupac_name_or_selfies_to_smiles(
                 status_code=422,
                 detail="Error reading input text, please check again.",
             )
+    except ToolkitTimeoutException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=422, detail=str(e))
 
@@ -354,8 +358,8 @@ async def smiles_canonicalise(
     - ValueError: If an unsupported toolkit option is provided.
     """
     if toolkit == "cdk":
-        mol = parse_input(smiles, "cdk", False)
-        return str(get_canonical_SMILES(mol))
+        mol = await run_in_jvm(parse_input, smiles, "cdk", False)
+        return str(await run_in_jvm(get_canonical_SMILES, mol))
     elif toolkit == "rdkit":
         mol = parse_input(smiles, "rdkit", False)
         return str(Chem.MolToSmiles(mol, kekuleSmiles=True))
@@ -418,8 +422,8 @@ async def smiles_to_cxsmiles(
     - CXSMILES is a Chemaxon Extended SMILES which is used for storing special features of the molecules after the SMILES string.
     """
     if toolkit == "cdk":
-        mol = parse_input(smiles, "cdk", False)
-        cxsmiles = get_CXSMILES(mol)
+        mol = await run_in_jvm(parse_input, smiles, "cdk", False)
+        cxsmiles = await run_in_jvm(get_CXSMILES, mol)
         if cxsmiles:
             return str(cxsmiles)
     else:
@@ -477,8 +481,8 @@ async def smiles_to_inchi(
     - ValueError: If an unsupported toolkit option is provided.
     """
     if toolkit == "cdk":
-        mol = parse_input(smiles, "cdk", False)
-        inchi = get_InChI(mol)
+        mol = await run_in_jvm(parse_input, smiles, "cdk", False)
+        inchi = await run_in_jvm(get_InChI, mol)
         if inchi:
             return str(inchi)
     elif toolkit == "rdkit":
@@ -541,8 +545,8 @@ async def smiles_to_inchikey(
     - ValueError: If an unsupported toolkit option is provided.
     """
     if toolkit == "cdk":
-        mol = parse_input(smiles, "cdk", False)
-        inchikey = get_InChI(mol, InChIKey=True)
+        mol = await run_in_jvm(parse_input, smiles, "cdk", False)
+        inchikey = await run_in_jvm(get_InChI, mol, InChIKey=True)
         if inchikey:
             return str(inchikey)
 
@@ -733,11 +737,15 @@ async def smiles_convert_to_formats(
     try:
         if toolkit == "cdk":
             response = {}
-            mol = parse_input(smiles, "cdk", False)
-            response["mol"] = get_CDK_SDG_mol(mol).replace("$$$$\n", "")
-            response["canonicalsmiles"] = str(get_canonical_SMILES(mol))
-            response["inchi"] = str(get_InChI(mol))
-            response["inchikey"] = str(get_InChI(mol, InChIKey=True))
+            mol = await run_in_jvm(parse_input, smiles, "cdk", False)
+            response["mol"] = (await run_in_jvm(get_CDK_SDG_mol, mol)).replace(
+                "$$$$\n", ""
+            )
+            response["canonicalsmiles"] = str(
+                await run_in_jvm(get_canonical_SMILES, mol)
+            )
+            response["inchi"] = str(await run_in_jvm(get_InChI, mol))
+            response["inchikey"] = str(await run_in_jvm(get_InChI, mol, InChIKey=True))
             return response
 
         elif toolkit == "rdkit":
@@ -764,6 +772,8 @@ async def smiles_convert_to_formats(
                 status_code=422,
                 detail="Error reading SMILES string, please check again.",
             )
+    except ToolkitTimeoutException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=422,
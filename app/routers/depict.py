@@ -15,9 +15,11 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
+from app.exception_handlers import ToolkitTimeoutException
 from app.modules.depiction import get_cdk_depiction
 from app.modules.depiction import get_rdkit_depiction
 from app.modules.toolkits.helpers import parse_input
+from app.modules.toolkits.jvm_executor import run_in_jvm
 from app.modules.toolkits.openbabel_wrapper import get_ob_mol
 from app.modules.toolkits.rdkit_wrapper import get_3d_conformers
 from app.schemas import HealthCheck
@@ -169,8 +171,9 @@ async def depict_2d_molecule(
     """
     try:
         if toolkit == "cdk":
-            mol = parse_input(smiles, "cdk", False)
-            depiction = get_cdk_depiction(
+            mol = await run_in_jvm(parse_input, smiles, "cdk", False)
+            depiction = await run_in_jvm(
+                get_cdk_depiction,
                 mol,
                 [width, height],
                 rotate,
@@ -189,6 +192,8 @@ async def depict_2d_molecule(
                 detail="Error reading SMILES string, please check again.",
             )
         return Response(content=depiction, media_type="image/svg+xml")
+    except ToolkitTimeoutException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=422, detail=str(e))
 
@@ -261,5 +266,7 @@ async def depict_3d_molecule(
                 detail="Error reading SMILES string, please check again.",
             )
         return templates.TemplateResponse("mol.html", content)
+    except ToolkitTimeoutException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=422, detail=str(e))
@@ -5,7 +5,9 @@ from fastapi import HTTPException
 from fastapi import Query
 from fastapi import status
 
+from app.exception_handlers import ToolkitTimeoutException
 from app.modules.toolkits.helpers import parse_input
+from app.modules.toolkits.jvm_executor import run_in_jvm
 from app.modules.tools.sugar_removal import get_sugar_info
 from app.modules.tools.sugar_removal import remove_circular_sugar
 from app.modules.tools.sugar_removal import remove_linear_and_circular_sugar
@@ -165,9 +167,9 @@ async def get_sugar_information(
         - If only circular sugars are present, it returns "The molecule contains only Circular sugar."
         - If no sugars are found, it returns "The molecule contains no sugar."
     """
-    mol = parse_input(smiles, "cdk", False)
+    mol = await run_in_jvm(parse_input, smiles, "cdk", False)
     try:
-        hasLinearSugar, hasCircularSugars = get_sugar_info(mol)
+        hasLinearSugar, hasCircularSugars = await run_in_jvm(get_sugar_info, mol)
         if hasLinearSugar and hasCircularSugars:
             return "The molecule contains Linear and Circular sugars"
         if hasLinearSugar and not hasCircularSugars:
@@ -176,6 +178,8 @@ async def get_sugar_information(
             return "The molecule contains only Circular sugar"
         else:
             return "The molecule contains no sugar"
+    except ToolkitTimeoutException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=422, detail=str(e))
 
@@ -216,9 +220,9 @@ async def remove_linear_sugars(
     Returns:
     - str: The modified SMILES string with linear sugars removed.
     """
-    mol = parse_input(smiles, "cdk", False)
+    mol = await run_in_jvm(parse_input, smiles, "cdk", False)
     try:
-        removed_smiles = remove_linear_sugar(mol)
+        removed_smiles = await run_in_jvm(remove_linear_sugar, mol)
         if removed_smiles:
             return removed_smiles
         else:
@@ -226,6 +230,8 @@ async def remove_linear_sugars(
                 status_code=422,
                 detail="Error reading SMILES string, please check again.",
             )
+    except ToolkitTimeoutException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=422, detail=str(e))
 
@@ -266,9 +272,9 @@ async def remove_circular_sugars(
     Returns:
     - str: The modified SMILES string with circular sugars removed.
     """
-    mol = parse_input(smiles, "cdk", False)
+    mol = await run_in_jvm(parse_input, smiles, "cdk", False)
     try:
-        removed_smiles = remove_circular_sugar(mol)
+        removed_smiles = await run_in_jvm(remove_circular_sugar, mol)
         if removed_smiles:
             return removed_smiles
         else:
@@ -276,6 +282,8 @@ async def remove_circular_sugars(
                 status_code=422,
                 detail="Error processing SMILES string.",
             )
+    except ToolkitTimeoutException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=422, detail=str(e))
 
@@ -319,9 +327,9 @@ async def remove_linear_and_circular_sugars(
     Returns:
     - str: The modified SMILES string with linear and circular sugars removed.
     """
-    mol = parse_input(smiles, "cdk", False)
+    mol = await run_in_jvm(parse_input, smiles, "cdk", False)
     try:
-        removed_smiles = remove_linear_and_circular_sugar(mol)
+        removed_smiles = await run_in_jvm(remove_linear_and_circular_sugar, mol)
         if removed_smiles:
             return removed_smiles
         else:
@@ -329,5 +337,7 @@ async def remove_linear_and_circular_sugars(
                 status_code=422,
                 detail="Error processing SMILES string, please check again.",
             )
+    except ToolkitTimeoutException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=422, detail=str(e))
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Optional
 
 from pydantic import BaseModel
 from pydantic import Field
@@ -322,6 +323,85 @@ class FilteredMoleculesResponse(BaseModel):
         }
 
 
+class StructuralAlertsResponse(BaseModel):
+    """Represents a response containing the structural alerts of a molecule.
+
+    Properties:
+    - smiles (str): The SMILES representation of the molecule.
+    - alerts (List[dict]): Matched alerts with catalog, description, scope and atom indices.
+    """
+
+    smiles: str = Field(
+        ...,
+        title="SMILES",
+        description="The SMILES representation of the molecule.",
+    )
+    alerts: List[Dict[str, Any]] = Field(
+        ...,
+        title="Alerts",
+        description="Matched alerts with catalog, description, scope and atom indices.",
+    )
+
+    class Config:
+        """Pydantic model configuration.
+
+        JSON Schema Extra:
+        - Includes examples of the response structure.
+        """
+
+        json_schema_extra = {
+            "examples": [
+                {
+                    "smiles": "O=C1C=CC(=O)C=C1",
+                    "alerts": [
+                        {
+                            "catalog": "PAINS_A",
+                            "description": "quinone_A(370)",
+                            "scope": "PAINS filters (family A)",
+                            "atoms": [0, 1, 2, 3, 4, 5, 6, 7],
+                        },
+                    ],
+                },
+            ],
+        }
+
+
+class CustomFilterResponse(BaseModel):
+    """Represents a response indicating whether a molecule passed a filter.
+
+    Properties:
+    - smiles (str): The SMILES representation of the molecule.
+    - passed (bool): True if the molecule passed the filter.
+    """
+
+    smiles: str = Field(
+        ...,
+        title="SMILES",
+        description="The SMILES representation of the molecule.",
+    )
+    passed: bool = Field(
+        ...,
+        title="Passed",
+        description="True if the molecule passed the filter.",
+    )
+
+    class Config:
+        """Pydantic model configuration.
+
+        JSON Schema Extra:
+        - Includes examples of the response structure.
+        """
+
+        json_schema_extra = {
+            "examples": [
+                {
+                    "smiles": "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+                    "passed": True,
+                },
+            ],
+        }
+
+
 class GenerateFunctionalGroupResponse(BaseModel):
     """Represents a response containing a list of identified functional groups.
 
@@ -391,3 +471,80 @@ class StandarizedTautomerResponse(BaseModel):
                 },
             ],
         }
+
+
+class StandardizedTautomersResponse(BaseModel):
+    """Represents a response containing one standardized tautomer of a batch.
+
+    Properties:
+    - smiles (str): The input SMILES string.
+    - tautomer (str): The standardized tautomer SMILES, null for an invalid SMILES string.
+    """
+
+    smiles: str = Field(
+        ...,
+        title="SMILES",
+        description="The input SMILES string.",
+    )
+    tautomer: Optional[str] = Field(
+        None,
+        title="Tautomer",
+        description="The standardized tautomer SMILES, null for an invalid SMILES string.",
+    )
+
+    class Config:
+        """Pydantic model configuration.
+
+        JSON Schema Extra:
+        - Includes examples of the response structure.
+        """
+
+        json_schema_extra = {
+            "examples": [
+                {
+                    "smiles": "Oc1ccccn1",
+                    "tautomer": "O=C1C=CC=CN1",
+                },
+            ],
+        }
+
+
+class ScoresResponse(BaseModel):
+    """Represents a response containing the NP, SA and QED scores of a molecule.
+
+    Properties:
+    - smiles (str): The input SMILES string.
+    - scores (dict): NP-likeness with confidence, SA score and QED, null for an invalid SMILES string.
+    """
+
+    smiles: str = Field(
+        ...,
+        title="SMILES",
+        description="The input SMILES string.",
+    )
+    scores: Optional[Dict[str, Optional[float]]] = Field(
+        None,
+        title="Scores",
+        description="NP-likeness with confidence, SA score and QED, null for an invalid SMILES string.",
+    )
+
+    class Config:
+        """Pydantic model configuration.
+
+        JSON Schema Extra:
+        - Includes examples of the response structure.
+        """
+
+        json_schema_extra = {
+            "examples": [
+                {
+                    "smiles": "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+                    "scores": {
+                        "nplikeness": -1.09,
+                        "confidence": 1.0,
+                        "sascore": 2.3,
+                        "qed": 0.54,
+                    },
+                },
+            ],
+        }
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import json
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -58,6 +61,39 @@ def test_smiles_to_stereo_isomers(smiles, response_text, response_code):
         assert response.text == response_text
 
 
+def test_stereoisomers_ndjson_pages():
+    smiles = "CC(O)C(O)C(O)C(O)C"
+    response = client.get(f"/latest/chem/stereoisomers?smiles={smiles}")
+    assert response.headers["X-Stereoisomer-Count"] == "16"
+    isomers = response.json()
+
+    pages = []
+    for offset in (0, 3, 6, 9):
+        response = client.get(
+            f"/latest/chem/stereoisomers?smiles={smiles}&format=ndjson"
+            f"&max_isomers=3&offset={offset}",
+        )
+        assert response.status_code == 200
+        pages.extend(json.loads(line) for line in response.text.splitlines())
+    assert [item["index"] for item in pages] == list(range(len(pages)))
+    assert sorted(item["smiles"] for item in pages) == isomers
+
+
+def test_stereoisomers_offset_bounds():
+    # an offset past the estimated count returns an empty page
+    response = client.get(
+        "/latest/chem/stereoisomers?smiles=CC(O)C(O)C(O)C(O)C&offset=16",
+    )
+    assert response.status_code == 200
+    assert response.json() == []
+    # offsets are capped, so no request enumerates without limit
+    smiles = "C" + "C(O)" * 40 + "C"
+    response = client.get(
+        f"/latest/chem/stereoisomers?smiles={smiles}&offset={10**9}",
+    )
+    assert response.status_code == 422
+
+
 @pytest.mark.parametrize(
     "smiles, format, response_code",
     [
@@ -171,6 +207,16 @@ def test_successful_tanimoto_similarity(
         assert response.text == expected
 
 
+def test_tanimoto_similarity_timeout(monkeypatch):
+    monkeypatch.setattr("app.modules.toolkits.jvm_executor.CDK_TIMEOUT", 0.01)
+    monkeypatch.setattr(
+        "app.routers.chem.get_tanimoto_similarity_CDK",
+        lambda *args, **kwargs: time.sleep(1),
+    )
+    response = client.get("/latest/chem/tanimoto?smiles=CC,CCO&toolkit=cdk")
+    assert response.status_code == 504
+
+
 @pytest.mark.parametrize(
     "smiles, fix, expected, response_code",
     [
@@ -360,6 +406,117 @@ def test_all_filter_molecules(test_smiles):
     assert response.status_code == 200
 
 
+def test_all_filter_molecules_json():
+    response = client.post(
+        "/latest/chem/all_filters?format=json&sascore=&nplikeness=",
+        data="CCO\nCN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+        headers={"Content-Type": "text/plain"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["smiles"] == ["CCO", "CN1C=NC2=C1C(=O)N(C(=O)N2C)C"]
+    assert result["lipinski"] == [True, True]
+    assert "sascore" not in result
+
+
+def test_structural_alerts():
+    response = client.post(
+        "/latest/chem/structural-alerts?catalogs=PAINS_A,BRENK",
+        data="CCO\nO=C1C=CC(=O)C=C1",
+        headers={"Content-Type": "text/plain"},
+    )
+    assert response.status_code == 200
+    ethanol, quinone = response.json()
+    assert ethanol["alerts"] == []
+    assert {alert["catalog"] for alert in quinone["alerts"]} == {"PAINS_A", "BRENK"}
+    assert all(alert["atoms"] for alert in quinone["alerts"])
+
+
+def test_structural_alerts_unknown_catalog():
+    response = client.post(
+        "/latest/chem/structural-alerts?catalogs=UNKNOWN",
+        data="CCO",
+        headers={"Content-Type": "text/plain"},
+    )
+    assert response.status_code == 422
+
+
+def test_custom_filters():
+    response = client.post(
+        "/latest/chem/custom-filters",
+        json={
+            "smiles": [
+                "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+                "CCCCCCCCCCCCCCCCCCCCCCCCCCCCCC",
+            ],
+            "filter": {
+                "all": [
+                    {"descriptor": "MolWt", "max": 350},
+                    {"not": {"smarts": "[N+](=O)[O-]"}},
+                ],
+            },
+        },
+    )
+    assert response.status_code == 200
+    assert [item["passed"] for item in response.json()] == [True, False]
+
+
+def test_custom_filters_named():
+    assert "lipinski" in client.get("/latest/chem/custom-filters").json()
+    response = client.post(
+        "/latest/chem/custom-filters",
+        json={"smiles": ["CCO"], "filter": "unknown"},
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        {"smarts": 5},
+        {"descriptor": ["MolWt"], "min": 1},
+        {"descriptor": "MolWt", "min": [1]},
+        {"rule": ["lipinski"]},
+    ],
+)
+def test_custom_filters_malformed(spec):
+    response = client.post(
+        "/latest/chem/custom-filters",
+        json={"smiles": ["CCO"], "filter": spec},
+    )
+    assert response.status_code == 422
+
+
+def test_standardized_tautomers_batch():
+    response = client.post(
+        "/latest/chem/standardized-tautomers",
+        data="Oc1ccccn1\nINVALID\nCN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+        headers={"Content-Type": "text/plain"},
+    )
+    assert response.status_code == 200
+    pyridone, invalid, caffeine = response.json()
+    single = client.get("/latest/chem/standarizedTautomer?smiles=Oc1ccccn1")
+    assert pyridone["tautomer"] == single.json()
+    assert invalid["tautomer"] is None
+    assert caffeine["tautomer"] == "CN1C(=O)C2=C(N=CN2C)N(C)C1=O"
+
+
+def test_scores():
+    response = client.post(
+        "/latest/chem/scores",
+        data="CN1C=NC2=C1C(=O)N(C(=O)N2C)C\nINVALID",
+        headers={"Content-Type": "text/plain"},
+    )
+    assert response.status_code == 200
+    caffeine, invalid = response.json()
+    nplikeness = client.get(
+        "/latest/chem/nplikeness/score?smiles=CN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+    )
+    assert caffeine["scores"]["nplikeness"] == nplikeness.json()
+    assert caffeine["scores"]["sascore"] == 2.3
+    assert invalid["scores"] is None
+
+
 def test_get_ertl_functional_groups_invalid_molecule():
     response = client.get("/latest/chem/ertlfunctionalgroup?smiles=CN1C=NC2=C1C(=O)N(")
     assert response.status_code == 422
@@ -374,6 +531,24 @@ def test_get_functional_groups_endpoint(test_smiles):
     assert isinstance(data, list)
 
 
+def test_functional_group_profile():
+    response = client.post(
+        "/latest/chem/ertlfunctionalgroup/profile",
+        data="CC(=O)O\nINVALID\nOCC(=O)O",
+        headers={"Content-Type": "text/plain"},
+    )
+    assert response.status_code == 200
+    acetic, invalid, glycolic, summary = [
+        json.loads(line) for line in response.text.splitlines()
+    ]
+    assert invalid["groups"] is None
+    acid = acetic["groups"][0]["key"]
+    summary = summary["summary"]
+    assert summary["molecules"] == 2
+    assert summary["invalid"] == 1
+    assert summary["counts"][acid] == {"occurrences": 2, "molecules": 2}
+
+
 def test_get_functional_groups_endpoint_invalid_input():
     response = client.get("/latest/chem/ertlfunctionalgroup?smiles=invalid_smiles")
     assert response.status_code == 422
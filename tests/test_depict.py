@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 
+from app.exception_handlers import ToolkitTimeoutException
 from app.main import app
 
 
@@ -52,3 +55,22 @@ def test_depict3D_molecule(smiles, toolkit, response_code):
         f"/latest/depict/3D?smiles={smiles}&toolkit={toolkit}",
     )
     assert response.status_code == response_code
+
+
+def test_depict_2d_timeout(monkeypatch):
+    monkeypatch.setattr("app.modules.toolkits.jvm_executor.CDK_TIMEOUT", 0.01)
+    monkeypatch.setattr(
+        "app.routers.depict.get_cdk_depiction",
+        lambda *args, **kwargs: time.sleep(1),
+    )
+    response = client.get("/latest/depict/2D?smiles=CCO&toolkit=cdk")
+    assert response.status_code == 504
+
+
+def test_depict_3d_timeout(monkeypatch):
+    def timeout(mol):
+        raise ToolkitTimeoutException("rdkit", 0.01)
+
+    monkeypatch.setattr("app.routers.depict.get_3d_conformers", timeout)
+    response = client.get("/latest/depict/3D?smiles=CCO&toolkit=rdkit")
+    assert response.status_code == 504
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import pytest
 
+from app.modules.filters import filter_molecules
+from app.modules.filters import FilterPlan
+from app.modules.filters import get_filter_plan
 from app.modules.toolkits.helpers import parse_input
 from app.modules.toolkits.rdkit_wrapper import check_RO5_violations
 from app.modules.toolkits.rdkit_wrapper import get_GhoseFilter
@@ -77,3 +80,44 @@ def test_get_REOSFilter(molecule1, molecule2):
 def test_get_RuleofThree(molecule3, molecule2):
     assert get_RuleofThree(molecule3) is True
     assert get_RuleofThree(molecule2) is False
+
+
+def test_filter_molecules_matches_single_filters(molecule1, molecule2, molecule3):
+    molecules = [molecule1, molecule2, molecule3]
+    columns = filter_molecules(
+        molecules,
+        ["pains", "lipinski", "veber", "reos", "ghose", "ruleofthree"],
+        {"sascore": "0-10"},
+    )
+    for index, mol in enumerate(molecules):
+        assert columns["pains"][index] == bool(get_PAINS(mol))
+        assert columns["lipinski"][index] == (check_RO5_violations(mol) == 0)
+        assert columns["veber"][index] == get_VeberFilter(mol)
+        assert columns["reos"][index] == get_REOSFilter(mol)
+        assert columns["ghose"][index] == get_GhoseFilter(mol)
+        assert columns["ruleofthree"][index] == get_RuleofThree(mol)
+    assert columns["sascore"].all()
+
+
+def test_filter_plan(molecule1, molecule2, molecule3):
+    plan = FilterPlan(
+        {
+            "all": [
+                {"descriptor": "MolWt", "max": 500},
+                {"not": {"smarts": "[CH2][CH2][CH2][CH2][CH2][CH2]"}},
+                {"any": [{"rule": "ruleofthree"}, {"rule": "veber"}]},
+            ],
+        },
+    )
+    assert "QED" not in plan.descriptors
+    passed = plan.evaluate([molecule1, molecule2, molecule3])
+    assert passed.tolist() == [True, False, True]
+
+
+def test_filter_plan_invalid():
+    with pytest.raises(ValueError):
+        FilterPlan({"descriptor": "Unknown", "max": 1})
+    with pytest.raises(ValueError):
+        FilterPlan({"smarts": "[C"})
+    with pytest.raises(ValueError):
+        get_filter_plan("unknown")
@@ -1,5 +1,11 @@
 from __future__ import annotations
 
+import io
+import json
+import math
+from pathlib import Path
+
+import numpy as np
 import pytest
 import selfies as sf
 from rdkit import Chem
@@ -7,16 +13,33 @@ from rdkit import Chem
 from app.modules.all_descriptors import get_all_cdk_descriptors
 from app.modules.all_descriptors import get_all_rdkit_descriptors
 from app.modules.all_descriptors import get_cdk_rdkit_combined_descriptors
-from app.modules.all_descriptors import get_tanimoto_similarity
+from app.modules.all_descriptors import iter_tanimoto_similarity
+from app.modules.conformers import conformer_cache
+from app.modules.conformers import get_conformer
 from app.modules.depiction import get_cdk_depiction
 from app.modules.depiction import get_rdkit_depiction
+from app.modules.npscorer import download_np_model
+from app.modules.npscorer import get_morgan_environments
+from app.modules.npscorer import get_np_model
+from app.modules.npscorer import get_np_model_arrays
 from app.modules.npscorer import get_np_score
+from app.modules.npscorer import score_mols_with_confidence
+from app.modules.scores import score_molecules
+from app.modules.similarity import get_fingerprint_matrix
+from app.modules.similarity import iter_similarity_edges
+from app.modules.similarity import iter_similarity_rows
+from app.modules.toolkits.cdk_wrapper import fingerprint_cache
+from app.modules.toolkits.cdk_wrapper import get_CDK_descriptor_values
+from app.modules.toolkits.cdk_wrapper import get_CDK_fingerprint
+from app.modules.toolkits.cdk_wrapper import get_jvm_options
+from app.modules.toolkits.cdk_wrapper import get_vander_waals_volume
 from app.modules.toolkits.cdk_wrapper import JVMNotFoundException
 from app.modules.toolkits.cdk_wrapper import setup_jvm
 from app.modules.toolkits.helpers import parse_input
 from app.modules.toolkits.rdkit_wrapper import check_RO5_violations
 from app.modules.toolkits.rdkit_wrapper import get_3d_conformers
 from app.modules.toolkits.rdkit_wrapper import get_ertl_functional_groups
+from app.modules.toolkits.rdkit_wrapper import get_MolVolume
 from app.modules.toolkits.rdkit_wrapper import get_tanimoto_similarity_rdkit
 
 
@@ -65,6 +88,53 @@ def test_npscore(test_RDKit_Mol):
     assert expected_result == actual_result
 
 
+def test_np_model_loaded_once():
+    keys, values = get_np_model_arrays()
+    assert get_np_model_arrays()[0] is keys
+    assert len(keys) == len(values)
+    assert (keys[1:] > keys[:-1]).all()
+
+
+def reference_np_score(model: dict, molecule: Chem.Mol) -> dict:
+    # The original scoring loop over the pickled model dictionary
+    bits = get_morgan_environments(molecule)
+    found = [bit for bit in bits if bit in model]
+    score = sum(model[bit] for bit in found) / molecule.GetNumAtoms()
+    if score > 4:
+        score = 4.0 + math.log10(score - 4.0 + 1.0)
+    elif score < -4:
+        score = -4.0 - math.log10(-4.0 - score + 1.0)
+    return {"nplikeness": score, "confidence": len(found) / len(bits)}
+
+
+def test_np_score_batch(test_RDKit_Mol):
+    model = get_np_model(Path(download_np_model()))
+    molecules = [test_RDKit_Mol] + [
+        Chem.MolFromSmiles(smiles)
+        for smiles in (
+            "OCC1OC(O)C(O)C(O)C1O",
+            "CC(=O)OC1=CC=CC=C1C(=O)O",
+            "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+            "C[Si](C)(C)Cl",
+        )
+    ]
+    batch = score_mols_with_confidence(molecules)
+    for molecule, result in zip(molecules, batch):
+        expected = reference_np_score(model, molecule)
+        assert result["nplikeness"] == pytest.approx(expected["nplikeness"], abs=1e-5)
+        assert result["confidence"] == pytest.approx(expected["confidence"])
+    assert batch[1]["nplikeness"] > batch[0]["nplikeness"]
+
+
+def test_scores_without_atoms():
+    scores = score_molecules([Chem.Mol(), Chem.MolFromSmiles("CCO")])
+    assert scores[0]["nplikeness"] is None
+    assert scores[0]["confidence"] is None
+    assert scores[0]["sascore"] is None
+    assert scores[1]["nplikeness"] is not None
+    assert get_np_score(Chem.Mol()) == "invalid"
+
+
 # RDKit Depiction tests
 def test_get_rdkit_depiction(test_RDKit_Mol):
     svg = get_rdkit_depiction(test_RDKit_Mol)
@@ -158,7 +228,7 @@ def test_all_rdkit_descriptors(test_smiles_descriptors):
         0,
         1.0,
         0,
-        62.12,
+        60.44,
     )
     assert expected_result == descriptors
 
@@ -189,6 +259,47 @@ def test_all_cdk_descriptors(test_CDK_Mol):
     assert expected_result == descriptors
 
 
+def test_cdk_descriptor_values(test_CDK_Mol):
+    values = get_CDK_descriptor_values(test_CDK_Mol)
+    assert values["AtomCount"] == 24
+    assert values["HBondDonorCount"] == 0
+    assert values["AromaticRingCount"] == 2
+    assert all(isinstance(value, (int, float)) for value in values.values())
+    # the input molecule is left untouched
+    assert test_CDK_Mol.getAtom(0).getPoint2d() is None
+
+
+def test_cdk_descriptor_donors_and_acceptors():
+    values = get_CDK_descriptor_values(
+        parse_input("CC(=O)OC1=CC=CC=C1C(=O)O", "cdk", False),
+    )
+    assert values["HBondDonorCount"] == 1
+    assert values["HBondAcceptorCount"] != values["HBondDonorCount"]
+
+
+def test_cdk_fingerprint_cache(test_CDK_Mol):
+    fingerprint_cache.clear()
+    atom_count = test_CDK_Mol.getAtomCount()
+    fingerprint = get_CDK_fingerprint(test_CDK_Mol, "PubChem")
+    assert get_CDK_fingerprint(test_CDK_Mol.clone(), "PubChem") == fingerprint
+    assert fingerprint_cache.stats()["hits"] == 1
+    # hydrogens are only made explicit on a private copy
+    assert test_CDK_Mol.getAtomCount() == atom_count
+
+
+def test_mol_volume_methods(test_smiles_descriptors):
+    mol = parse_input(test_smiles_descriptors, "rdkit", False)
+    assert get_MolVolume(mol) == pytest.approx(60.444, abs=1e-3)
+    assert get_MolVolume(mol, method="grid") == get_MolVolume(mol, method="grid")
+
+
+def test_boron_volume_matches_cdk():
+    smiles = "OB(O)c1ccccc1"
+    volume = get_MolVolume(parse_input(smiles, "rdkit", False))
+    cdk_volume = get_vander_waals_volume(parse_input(smiles, "cdk", False))
+    assert volume == pytest.approx(cdk_volume, abs=0.1)
+
+
 def test_all_combined_descriptors(test_smiles_descriptors):
     descriptors = get_cdk_rdkit_combined_descriptors(test_smiles_descriptors)
     expected_result = {
@@ -210,11 +321,22 @@ def test_all_combined_descriptors(test_smiles_descriptors):
         "Formal Charge": (0, 0),
         "FractionCSP3": (1.0, 1.0),
         "Number of Minimal Rings": (0, 0),
-        "Van der Waals Volume": (62.01, 60.444412578400105),
+        "Van der Waals Volume": (60.44, 60.444412578400105),
     }
     assert expected_result == descriptors
 
 
+def get_tanimoto_similarity(smileslist: str, toolkit: str, format: str = "html"):
+    fingerprinter = "PubChem" if toolkit == "cdk" else "ECFP"
+    fingerprints = get_fingerprint_matrix(smileslist.split(","), toolkit, fingerprinter)
+    chunks = iter_tanimoto_similarity(fingerprints, toolkit, fingerprinter, format)
+    return b"".join(chunks) if format == "npy" else "".join(chunks)
+
+
+def get_similarity_matrix(fingerprints, fingerprinter="ECFP", tile_size=None):
+    return np.array(list(iter_similarity_rows(fingerprints, fingerprinter, tile_size)))
+
+
 def test_tanimoto_similarity_rdkit(tanimoto_smiles):
     matrix = get_tanimoto_similarity(tanimoto_smiles, toolkit="rdkit")
     assert len(matrix) == 260
@@ -229,9 +351,88 @@ def test_tanimoto_similarity_cdk(tanimoto_smiles):
     assert expected_result == matrix
 
 
+def test_similarity_edges_match_matrix():
+    smiles_list = ["CCO", "CCN", "c1ccccc1O", "c1ccccc1N", "CC(=O)O", "CC(=O)N"]
+    fingerprints = get_fingerprint_matrix(smiles_list, "rdkit", "ECFP", 2048, 4)
+    matrix = get_similarity_matrix(fingerprints)
+    edges = [
+        (i, j, similarity)
+        for tile in iter_similarity_edges(fingerprints, threshold=0.2, tile_size=2)
+        for i, j, similarity in zip(*(array.tolist() for array in tile))
+    ]
+    assert edges == [
+        (i, j, matrix[i, j])
+        for i in range(len(smiles_list))
+        for j in range(i + 1, len(smiles_list))
+        if matrix[i, j] >= 0.2
+    ]
+
+
+def test_similarity_tiles_on_process_pool(monkeypatch):
+    smiles_list = ["CCO", "CCN", "c1ccccc1O", "c1ccccc1N", "CC(=O)O", "CC(=O)N"]
+    fingerprints = get_fingerprint_matrix(smiles_list, "rdkit", "ECFP", 2048, 4)
+    matrix = get_similarity_matrix(fingerprints)
+    monkeypatch.setattr("app.modules.similarity.BATCH_PARALLEL_THRESHOLD", 2)
+    monkeypatch.setattr("app.modules.similarity.BATCH_WORKERS", 2)
+    rows = list(iter_similarity_rows(fingerprints, tile_size=4))
+    assert np.array_equal(np.array(rows), matrix)
+    edges = [
+        (i, j, similarity)
+        for tile in iter_similarity_edges(fingerprints, threshold=0.2, tile_size=4)
+        for i, j, similarity in zip(*(array.tolist() for array in tile))
+    ]
+    assert edges == [
+        (i, j, matrix[i, j])
+        for i in range(len(smiles_list))
+        for j in range(i + 1, len(smiles_list))
+        if matrix[i, j] >= 0.2
+    ]
+
+
+def test_tanimoto_similarity_formats(tanimoto_smiles):
+    expected = [
+        [1.0, 0.14285714285714285, 0.0],
+        [0.14285714285714285, 1.0, 0.0],
+        [0.0, 0.0, 1.0],
+    ]
+    matrix = get_tanimoto_similarity(tanimoto_smiles, toolkit="rdkit", format="json")
+    assert json.loads(matrix) == expected
+    matrix = get_tanimoto_similarity(tanimoto_smiles, toolkit="rdkit", format="csv")
+    assert [
+        [float(cell) for cell in row.split(",")] for row in matrix.splitlines()
+    ] == expected
+    matrix = get_tanimoto_similarity(tanimoto_smiles, toolkit="rdkit", format="ndjson")
+    assert [
+        json.loads(line)["similarities"] for line in matrix.splitlines()
+    ] == expected
+    matrix = get_tanimoto_similarity(tanimoto_smiles, toolkit="rdkit", format="npy")
+    array = np.load(io.BytesIO(matrix))
+    assert array.dtype == np.float32
+    assert np.array_equal(array, np.array(expected, dtype=np.float32))
+
+
 def test_invalid_toolkit(tanimoto_smiles):
     with pytest.raises(ValueError):
-        get_tanimoto_similarity(tanimoto_smiles, toolkit="invalid_toolkit")
+        get_fingerprint_matrix(tanimoto_smiles.split(","), "invalid_toolkit")
+
+
+@pytest.mark.parametrize(
+    "fingerprinter", ["ECFP", "RDKit", "Atompairs", "MACCS", "MAPC"]
+)
+def test_similarity_matrix_matches_pairwise(fingerprinter):
+    smiles_list = ["CCO", "c1ccccc1O", "C[C@H](N)C(=O)O", "CC(=O)Oc1ccccc1C(=O)O", "C"]
+    fingerprints = get_fingerprint_matrix(smiles_list, "rdkit", fingerprinter, 1024, 4)
+    matrix = get_similarity_matrix(fingerprints, fingerprinter, tile_size=2)
+    molecules = [parse_input(smiles, "rdkit", False) for smiles in smiles_list]
+    for i, mol_a in enumerate(molecules):
+        for j, mol_b in enumerate(molecules):
+            assert matrix[i, j] == get_tanimoto_similarity_rdkit(
+                mol_a,
+                mol_b,
+                fingerprinter,
+                4,
+                1024,
+            )
 
 
 def test_valid_ecfp_similarity():
@@ -302,6 +503,31 @@ def test_check_RO5_violations():
     assert violations == 0
 
 
+def test_conformer_cache():
+    conformer_cache.clear()
+    first = get_conformer(Chem.MolFromSmiles("OCC(=O)N"))
+    # the same structure in a different atom order hits the cache
+    second = get_conformer(Chem.MolFromSmiles("NC(=O)CO"))
+    assert conformer_cache.stats()["hits"] == 1
+    assert first.GetNumConformers() == 1
+    # each result keeps its input atom order and shares the cached geometry
+    assert first.GetAtomWithIdx(0).GetSymbol() == "O"
+    assert second.GetAtomWithIdx(0).GetSymbol() == "N"
+    match = list(second.GetSubstructMatch(first))
+    assert np.allclose(
+        Chem.Get3DDistanceMatrix(first),
+        Chem.Get3DDistanceMatrix(second)[np.ix_(match, match)],
+        atol=1e-4,
+    )
+
+
+def test_conformer_keeps_properties():
+    molecule = parse_input("CCC(R1)C", "rdkit", False)
+    conformer = get_conformer(molecule, optimize=False)
+    assert conformer.GetNumConformers() == 1
+    assert "M  RGP" in Chem.MolToMolBlock(conformer)
+
+
 def test_get_3d_conformers():
     mol_with_hydrogens = get_3d_conformers(mol_with_violations, depict=False)
     assert mol_with_hydrogens is not None
@@ -371,3 +597,18 @@ def test_setup_jvm_exception(monkeypatch, capsys):
         in captured.out
     )
     assert "You can set it or set it manually in the code" in captured.out
+
+
+def test_get_jvm_options(monkeypatch):
+    monkeypatch.setattr("app.modules.toolkits.cdk_wrapper.JVM_HEAP", "1g")
+    monkeypatch.setattr("app.modules.toolkits.cdk_wrapper.JVM_GC", "G1")
+    monkeypatch.setattr(
+        "app.modules.toolkits.cdk_wrapper.JVM_OPTS", "-Xss4m -Djava.awt.headless=true"
+    )
+    assert get_jvm_options() == [
+        "-ea",
+        "-Xmx1g",
+        "-XX:+UseG1GC",
+        "-Xss4m",
+        "-Djava.awt.headless=true",
+    ]
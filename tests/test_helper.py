@@ -1,7 +1,18 @@
+import asyncio
+import time
+
 import pytest
+from rdkit import Chem
 
+from app.exception_handlers import ToolkitTimeoutException
+from app.modules.toolkits.context import MoleculeContext
+from app.modules.toolkits.helpers import detect_format
+from app.modules.toolkits.helpers import find_R_groups
+from app.modules.toolkits.helpers import invalid_cache
 from app.modules.toolkits.helpers import InvalidInputException
+from app.modules.toolkits.helpers import parse_cache
 from app.modules.toolkits.helpers import parse_input
+from app.modules.toolkits.jvm_executor import run_in_jvm
 
 
 @pytest.fixture
@@ -61,3 +72,128 @@ def test_smiles_with_spaces():
     mol = parse_input(smiles)
     assert mol is not None
     assert mol.GetNumAtoms() == 1
+
+
+def test_parse_input_cache_returns_copies(test_smiles):
+    parse_cache.clear()
+    mol = parse_input(test_smiles)
+    mol.GetAtomWithIdx(0).SetAtomicNum(7)
+    cached = parse_input(test_smiles)
+    assert cached.GetAtomWithIdx(0).GetAtomicNum() == 6
+    assert parse_cache.stats()["hits"] == 1
+    assert parse_cache.stats()["misses"] == 1
+
+    # a cache hit keeps atom properties such as R-group labels
+    miss = Chem.MolToMolBlock(parse_input("CCC(R1)C"))
+    hit = Chem.MolToMolBlock(parse_input("CCC(R1)C"))
+    assert "M  RGP" in hit
+    assert hit == miss
+
+
+def test_molecule_context_memoizes(test_smiles):
+    context = MoleculeContext(test_smiles)
+    assert context.rdkit_mol is context.rdkit_mol
+    assert context.cdk_mol is context.cdk_mol
+    assert context.rdkit_mol.GetNumAtoms() == 6
+    assert "M  END" in context.molblock
+
+
+@pytest.mark.parametrize(
+    "input_text, expected",
+    [
+        ("CN1C=NC2=C1C(=O)N(C(=O)N2C)C", "SMILES"),
+        ("[Na+].[Cl-]", "SMILES"),
+        ("CC(=O)O |$;;_R1;$|", "CXSMILES"),
+        ("[C][N][C][=N][C][=C][Ring1][Branch1]", "SELFIES"),
+        ("[CH3][CH2][OH]", "SMILES"),
+        ("[13CH3][OH]", "SMILES"),
+        ("[C][C][O]", "SMILES"),
+        ("[C@@H][NH3+]", "SMILES"),
+        ("[C][C][=Branch1][C][=O][O]", "SELFIES"),
+        ("InChI=1S/CH4/h1H4", "InChI"),
+        ("\n  CDK\n\n  1  0  0  0  0  0  0  0  0  0999 V2000\nM  END", "MOL"),
+        ("\n  CDK\n\n  1  0  0  0  0  0  0  0  0  0999 V2000\nM  END\n$$$$", "SDF"),
+    ],
+)
+def test_detect_format(input_text, expected):
+    assert detect_format(input_text) == expected
+
+
+def test_parse_input_inchi():
+    mol = parse_input("InChI=1S/C2H6O/c1-2-3/h3H,2H2,1H3")
+    assert mol.GetNumAtoms() == 3
+
+
+def test_parse_input_inchi_query_string():
+    # "+" in a query string arrives as a space
+    mol = parse_input("InChI=1S/C2H7N/c1-2-3/h2-3H2,1H3/p 1")
+    assert Chem.MolToSmiles(mol) == "CC[NH3+]"
+
+
+def test_parse_input_bracketed_smiles():
+    mol = parse_input("[13CH3][OH]")
+    assert Chem.MolToSmiles(mol) == "[13CH3]O"
+
+
+def test_parse_input_selfies():
+    mol = parse_input("[C][C][=Branch1][C][=O][O]")
+    assert Chem.MolToSmiles(mol) == "CC(=O)O"
+
+
+def test_parse_input_radical_smiles():
+    mol = parse_input("[C][C][O]")
+    assert Chem.MolToSmiles(mol) == "[C][C][O]"
+
+
+@pytest.mark.parametrize(
+    "smiles, labels",
+    [
+        ("C1=CC=C[R]C=C1", ["R"]),
+        ("[R1]CC[R2]", ["R1", "R2"]),
+        ("Cl[Ru](Cl)[Rh][Rb]", []),
+    ],
+)
+def test_find_R_groups(smiles, labels):
+    assert [label for _, _, label in find_R_groups(smiles)] == labels
+
+
+def test_smiles_with_numbered_r_groups():
+    mol = parse_input("[R1]CC(=O)O[R2]")
+    assert mol.GetNumAtoms() == 6
+    assert mol.GetAtomWithIdx(0).GetProp("dummyLabel") == "R1"
+
+
+def test_invalid_smiles_negative_cache():
+    invalid_cache.clear()
+    smiles = "invalid_smiles_cached"
+    for _ in range(2):
+        with pytest.raises(InvalidInputException) as exc_info:
+            parse_input(smiles)
+        assert exc_info.value.name == "smiles"
+    assert invalid_cache.stats()["hits"] == 1
+
+
+def test_toolkit_error_not_cached(monkeypatch):
+    def fail(smiles):
+        raise RuntimeError("JVM failure")
+
+    parse_cache.clear()
+    invalid_cache.clear()
+    monkeypatch.setattr("app.modules.toolkits.helpers.get_CDK_IAtomContainer", fail)
+    with pytest.raises(InvalidInputException) as exc_info:
+        parse_input("CCCO", "cdk")
+    assert not exc_info.value.cacheable
+    assert len(invalid_cache) == 0
+    monkeypatch.undo()
+    assert parse_input("CCCO", "cdk") is not None
+
+
+def test_run_in_jvm(test_smiles):
+    mol = parse_input(test_smiles, framework="cdk")
+    count = asyncio.run(run_in_jvm(lambda m: m.getAtomCount(), mol))
+    assert count == 6
+
+
+def test_run_in_jvm_timeout():
+    with pytest.raises(ToolkitTimeoutException):
+        asyncio.run(run_in_jvm(time.sleep, 1, timeout=0.01))
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import os
+import threading
 
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.modules.warmup import run_warmup
 
 client = TestClient(app)
 
@@ -26,3 +28,21 @@ def test_get_health():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "OK"}
+
+
+def test_get_ready():
+    with TestClient(app) as startup_client:
+        response = startup_client.get("/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "OK"}
+
+
+def test_get_ready_while_warming_up(monkeypatch):
+    monkeypatch.setattr("app.modules.warmup._ready", threading.Event())
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "WARMING UP"
+    run_warmup([])
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "OK"}
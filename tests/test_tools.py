@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -125,3 +127,10 @@ def test_remove_sugars(input, response_text, response_code):
     assert response.headers["content-type"] == "application/json"
     if input != "INVALID_INPUT":
         assert response.text == response_text
+
+
+def test_sugar_info_timeout(monkeypatch):
+    monkeypatch.setattr("app.modules.toolkits.jvm_executor.CDK_TIMEOUT", 0.01)
+    monkeypatch.setattr("app.routers.tools.get_sugar_info", lambda mol: time.sleep(1))
+    response = client.get("/latest/tools/sugars-info?smiles=CCO")
+    assert response.status_code == 504